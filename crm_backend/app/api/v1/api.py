@@ -1,8 +1,25 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import tenants, crm,admin_tenant,admin_user
+from app.api.v1.endpoints import tenants, crm,admin_tenant,admin_user, stats
+from app.core.config import settings
+
+def with_overrides(base: APIRouter, overrides: APIRouter) -> APIRouter:
+    """Copy of `base` where routes also defined in `overrides` (same path and
+    methods) are swapped in place, so route matching order is unchanged"""
+    replacements = {(route.path, frozenset(route.methods)): route for route in overrides.routes}
+    router = APIRouter()
+    router.routes = [replacements.get((route.path, frozenset(route.methods)), route) for route in base.routes]
+    return router
+
+crm_router, admin_tenant_router, admin_user_router = crm.router, admin_tenant.router, admin_user.router
+if settings.DB_ASYNC:
+    from app.api.v1.endpoints import crm_async, admin_tenant_async, admin_user_async
+    crm_router = with_overrides(crm.router, crm_async.router)
+    admin_tenant_router = with_overrides(admin_tenant.router, admin_tenant_async.router)
+    admin_user_router = with_overrides(admin_user.router, admin_user_async.router)
 
 api_router = APIRouter()
 api_router.include_router(tenants.router, prefix="/auth", tags=["authentication"])
-api_router.include_router(crm.router, prefix="/crm", tags=["crm"])
-api_router.include_router(admin_tenant.router, prefix="/admin", tags=["AdminTenant"])
-api_router.include_router(admin_user.router, prefix="/admin_users", tags=["Admin Users"])
+api_router.include_router(crm_router, prefix="/crm", tags=["crm"])
+api_router.include_router(stats.router, prefix="/crm/stats", tags=["crm"])
+api_router.include_router(admin_tenant_router, prefix="/admin", tags=["AdminTenant"])
+api_router.include_router(admin_user_router, prefix="/admin_users", tags=["Admin Users"])
@@ -1,28 +1,152 @@
-from fastapi import Header, HTTPException, Depends
+from datetime import datetime
+from typing import Optional
+from fastapi import Header, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.db.tenant import tenant_manager
+from app.db.session import get_async_db, get_db
+from app.db.tenant import tenant_manager, TenantCapacityError, TenantNotReady
 
 def get_tenant_id(x_tenant_id: str = Header(...)):
     if not x_tenant_id:
         raise HTTPException(status_code=400, detail="X-Tenant-ID header required")
     return x_tenant_id
 
-def get_tenant_db(tenant_id: str = Depends(get_tenant_id), db: Session = Depends(get_db)):
+def get_tenant_schema(tenant_id: str = Depends(get_tenant_id), db: Session = Depends(get_db)) -> str:
+    """Resolve the X-Tenant-ID header to the tenant's schema name"""
+    try:
+        # Use public schema session to get tenant info
+        return tenant_manager.get_schema_name_by_tenant_id(db, tenant_id)
+    except TenantNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Tenant error: {str(e)}")
+
+def get_tenant_db(schema_name: str = Depends(get_tenant_schema)):
     """
     Get database session for tenant-specific CRM data
     Uses public schema session to lookup tenant, then switches to tenant schema
     """
     try:
-        # Use public schema session to get tenant info
-        schema_name = tenant_manager.get_schema_name_by_tenant_id(db, tenant_id)
-        
         # Get database session for the specific tenant schema
         tenant_db = tenant_manager.get_tenant_session(schema_name)
-        try:
-            yield tenant_db
-        finally:
-            tenant_db.close()
-            
+    except TenantCapacityError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Tenant error: {str(e)}")
+
+    # Errors raised by the endpoint itself (404s etc.) pass through untouched
+    try:
+        yield tenant_db
+    finally:
+        tenant_db.close()
+
+async def get_async_tenant_db(tenant_id: str = Depends(get_tenant_id), db: AsyncSession = Depends(get_async_db)):
+    """
+    Async counterpart of get_tenant_db (DB_ASYNC): yields an AsyncSession
+    whose transactions run with the tenant's search_path
+    """
+    try:
+        schema_name = await tenant_manager.get_schema_name_by_tenant_id_async(db, tenant_id)
+        tenant_db = await tenant_manager.get_async_tenant_session(schema_name)
+    except TenantNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Tenant error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=f"Tenant error: {str(e)}")
+    try:
+        yield tenant_db
+    finally:
+        await tenant_db.close()
+
+
+# ---------------------- CRM LIST FILTERS ----------------------
+# Server-side filters for the CRM list endpoints, as consumed by
+# app.services.pagination.apply_filters (`_from`/`_to` are inclusive bounds).
+
+def contact_filters(
+    company: Optional[str] = None,
+    email: Optional[str] = None,
+    created_at_from: Optional[datetime] = None,
+    created_at_to: Optional[datetime] = None,
+) -> dict:
+    return {
+        "company": company,
+        "email": email,
+        "created_at_from": created_at_from,
+        "created_at_to": created_at_to,
+    }
+
+def lead_filters(
+    status: Optional[str] = None,
+    source: Optional[str] = None,
+    contact_id: Optional[int] = None,
+    created_at_from: Optional[datetime] = None,
+    created_at_to: Optional[datetime] = None,
+) -> dict:
+    return {
+        "status": status,
+        "source": source,
+        "contact_id": contact_id,
+        "created_at_from": created_at_from,
+        "created_at_to": created_at_to,
+    }
+
+def opportunity_filters(
+    stage: Optional[str] = None,
+    contact_id: Optional[int] = None,
+    lead_id: Optional[int] = None,
+    close_date_from: Optional[datetime] = None,
+    close_date_to: Optional[datetime] = None,
+    amount_from: Optional[float] = None,
+    amount_to: Optional[float] = None,
+    created_at_from: Optional[datetime] = None,
+    created_at_to: Optional[datetime] = None,
+) -> dict:
+    return {
+        "stage": stage,
+        "contact_id": contact_id,
+        "lead_id": lead_id,
+        "close_date_from": close_date_from,
+        "close_date_to": close_date_to,
+        "amount_from": amount_from,
+        "amount_to": amount_to,
+        "created_at_from": created_at_from,
+        "created_at_to": created_at_to,
+    }
+
+
+# ---------------------- RELATIONSHIP EXPANSION ----------------------
+
+def includes(allowed):
+    """Dependency parsing `?include=a,b` into a tuple of relationship names from `allowed`"""
+    def parse_include(
+        include: Optional[str] = Query(None, description=f"Comma-separated relationships to embed: {', '.join(allowed) or 'none'}"),
+    ) -> tuple:
+        names = tuple(dict.fromkeys(name.strip() for name in (include or "").split(",") if name.strip()))
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Cannot include: {', '.join(unknown)}")
+        return names
+    return parse_include
+
+def sparse_fields(allowed):
+    """Dependency parsing `?fields=a,b` into a tuple of column names from `allowed` (None if absent)"""
+    def parse_fields(
+        fields: Optional[str] = Query(None, description=f"Comma-separated columns to return (id is always included): {', '.join(allowed)}"),
+    ) -> Optional[tuple]:
+        if fields is None:
+            return None
+        names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        return names
+    return parse_fields
+
+def row_fields(fields: Optional[tuple], include: tuple, all_fields: tuple) -> Optional[tuple]:
+    """Columns for the tuple fast path of a list endpoint, or None when
+    ?include= needs ORM objects instead"""
+    if include:
+        if fields is not None:
+            raise HTTPException(status_code=400, detail="fields= cannot be combined with include=")
+        return None
+    return fields or all_fields
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.session import get_db
-from app.schemas.tenant import Tenant
+from app.schemas.tenant import Tenant, TeardownStatus
+from app.schemas.stats import CacheMetrics
 from app.services.tenant import tenant_service
+from app.services.response_cache import response_cache
+from app.services.teardown import teardown_service
+from app.services.fanout import tenant_fanout_service
 from app.core.security import get_current_user
 
 router = APIRouter()
@@ -18,9 +23,36 @@ def list_tenants(db: Session = Depends(get_db), current_user=Depends(get_current
     tenants = tenant_service.get_all_tenants(db)
     return tenants
 
+@router.get("/tenants/teardown", response_model=TeardownStatus)
+def read_teardown_status(db: Session = Depends(get_db), current_user=Depends(get_current_admin_user)):
+    """Deleted tenants whose schemas the reaper has not dropped yet"""
+    return teardown_service.pending(db)
+
+@router.get("/tenants/report")
+def read_tenant_report(db: Session = Depends(get_db), current_user=Depends(get_current_admin_user)):
+    """Per-tenant CRM counts and pipeline totals, streamed as NDJSON.
+
+    One line per tenant as its query finishes (status ok, timeout or error),
+    then a line with type "total" summing the tenants that answered.
+    """
+    tenants = tenant_fanout_service.report_tenants(db)
+    return StreamingResponse(tenant_fanout_service.stream(tenants), media_type="application/x-ndjson")
+
+@router.put("/tenants/{tenant_id}", response_model=Tenant)
+def update_tenant(tenant_id: int, updates: dict, db: Session = Depends(get_db), current_user=Depends(get_current_admin_user)):
+    tenant = tenant_service.update_tenant(db, tenant_id, updates)
+    if not tenant:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tenant not found")
+    return tenant
+
 @router.delete("/tenants/{tenant_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_tenant(tenant_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_admin_user)):
     deleted = tenant_service.delete_tenant(db, tenant_id)
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tenant not found")
     return None
+
+@router.get("/cache", response_model=CacheMetrics)
+def read_cache_metrics(current_user=Depends(get_current_admin_user)):
+    """Hit/miss counters and size of this process' CRM response cache"""
+    return response_cache.metrics()
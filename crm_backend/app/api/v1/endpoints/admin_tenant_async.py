@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.db.session import get_async_db
+from app.schemas.tenant import Tenant
+from app.services.tenant_async import async_tenant_service
+from app.core.security import get_current_admin_user
+
+# Swapped in for the matching admin_tenant.router routes when DB_ASYNC is
+# enabled (see app/api/v1/api.py); routes not defined here stay sync.
+router = APIRouter()
+
+@router.get("/tenants/", response_model=List[Tenant])
+async def list_tenants(db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_admin_user)):
+    return await async_tenant_service.get_all_tenants(db)
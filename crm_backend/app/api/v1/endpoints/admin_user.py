@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, contains_eager
 from typing import List, Optional
 from app.db.session import get_db
-from app.schemas.tenant import UserCreate, User as UserSchema
-from app.services.tenant import tenant_service
-from app.core.security import get_current_admin_user
+from app.schemas.tenant import UserCreate, User as UserSchema, USER_INCLUDES
+from app.services.tenant import NameTaken, TeardownPending, tenant_service
+from app.core.security import get_current_admin_user, password_hasher
+from app.api.v1.dependencies import includes
 from app.models.tenant import User, Tenant
 
 router = APIRouter()
@@ -12,33 +14,41 @@ router = APIRouter()
 @router.get("/users/", response_model=List[UserSchema])
 def list_users(
     tenant_name: Optional[str] = None,
+    include: tuple = Depends(includes(USER_INCLUDES)),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_admin_user)
 ):
-    """List all users, optionally filtered by tenant name."""
+    """List all users, optionally filtered by tenant name.
+
+    Tenant names come from the same (outer-joined) query; ?include=tenant
+    fills the embedded tenant from that join as well.
+    """
+    query = db.query(User, Tenant.name).outerjoin(User.tenant)
+    if "tenant" in include:
+        query = query.options(contains_eager(User.tenant))
     if tenant_name:
         tenant = db.query(Tenant).filter(Tenant.name.ilike(tenant_name)).first()
         if not tenant:
             raise HTTPException(status_code=404, detail=f"Tenant '{tenant_name}' not found")
-        users = db.query(User).filter(User.tenant_id == tenant.id).all()
-    else:
-        users = db.query(User).all()
-
-    for u in users:
-        if u.tenant_id:
-            tenant = db.query(Tenant).filter(Tenant.id == u.tenant_id).first()
-            u.tenant_name = tenant.name if tenant else None
-        else:
-            u.tenant_name = "—"
+        query = query.filter(User.tenant_id == tenant.id)
+
+    users = []
+    for u, name in query.order_by(User.id).all():
+        u.tenant_name = name if u.tenant_id else "—"
+        users.append(u)
     return users
 
 
 @router.post("/users/", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, db: Session = Depends(get_db), current_user=Depends(get_current_admin_user)):
-    db_user = tenant_service.get_user_by_email(db, user.email)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    return tenant_service.create_user(db, user)
+async def create_user(user: UserCreate, db: Session = Depends(get_db), current_user=Depends(get_current_admin_user)):
+    try:
+        await run_in_threadpool(tenant_service.check_email_free, db, user.email)
+        hashed_password = await password_hasher.hash(user.password)
+        return await run_in_threadpool(tenant_service.create_user, db, user, hashed_password)
+    except TeardownPending as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except NameTaken as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/users/{user_id}", response_model=UserSchema)
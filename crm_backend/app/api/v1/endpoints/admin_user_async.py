@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.db.session import get_async_db
+from app.schemas.tenant import User as UserSchema, USER_INCLUDES
+from app.services.tenant_async import async_tenant_service
+from app.core.security import get_current_admin_user
+from app.api.v1.dependencies import includes
+
+# Swapped in for the matching admin_user.router routes when DB_ASYNC is
+# enabled (see app/api/v1/api.py); routes not defined here stay sync.
+router = APIRouter()
+
+@router.get("/users/", response_model=List[UserSchema])
+async def list_users(
+    tenant_name: Optional[str] = None,
+    include: tuple = Depends(includes(USER_INCLUDES)),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_admin_user)
+):
+    """List all users, optionally filtered by tenant name (see admin_user.list_users)"""
+    tenant_id = None
+    if tenant_name:
+        tenant = await async_tenant_service.get_tenant_by_name(db, tenant_name)
+        if not tenant:
+            raise HTTPException(status_code=404, detail=f"Tenant '{tenant_name}' not found")
+        tenant_id = tenant.id
+
+    users = []
+    for u, name in await async_tenant_service.get_users(db, tenant_id, include_tenant="tenant" in include):
+        u.tenant_name = name if u.tenant_id else "—"
+        users.append(u)
+    return users
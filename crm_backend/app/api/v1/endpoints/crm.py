@@ -1,30 +1,212 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.schemas.crm import (
     Contact, ContactCreate, Lead, LeadCreate,
-    Opportunity, OpportunityCreate
+    Opportunity, OpportunityCreate, Page, SortOrder, DataFormat, ImportReport,
+    SearchEntity, SearchResults, BatchRequest, BatchResponse,
+    ContactFilter, LeadFilter, OpportunityFilter, ContactUpdate, LeadUpdate, OpportunityUpdate,
+    BulkUpdate, BulkDelete, BulkResult,
+    ContactSortField, LeadSortField, OpportunitySortField, LEAD_INCLUDES, OPPORTUNITY_INCLUDES,
+    CONTACT_FIELDS, LEAD_FIELDS, OPPORTUNITY_FIELDS
+)
+from app.schemas.stats import StageChange
+from app.services.pagination import InvalidCursor
+from app.api.v1.responses import RowJSONResponse, cached_response, etag
+from app.services.crm import crm_service, VersionConflict
+from app.services.bulk_import import bulk_import_service, spool_request_body, detect_format, UnsupportedContentType
+from app.services.export import export_service
+from app.services.search import search_service
+from app.services.history import history_service
+from app.services.batch import batch_service, BatchError
+from app.services.response_cache import response_cache, CachedBody
+from app.core.config import settings
+from app.models import crm as models
+from app.api.v1.dependencies import (
+    get_tenant_db, get_tenant_schema, contact_filters, lead_filters, opportunity_filters, includes,
+    sparse_fields, row_fields
 )
-from app.services.crm import crm_service
-from app.api.v1.dependencies import get_tenant_db
 
 router = APIRouter()
 
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def _export(schema_name: str, model, fmt: str) -> StreamingResponse:
+    return StreamingResponse(
+        export_service.stream(schema_name, model, fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{model.__tablename__}.{fmt}"'},
+    )
+
+async def _bulk_import(request: Request, fmt: Optional[str], db: Session, model, create_schema):
+    """Spool the raw CSV/NDJSON body, then COPY it in chunks on a worker thread"""
+    try:
+        fmt = fmt or detect_format(request.headers.get("content-type"))
+    except UnsupportedContentType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    upload = await spool_request_body(request)
+    try:
+        return await run_in_threadpool(bulk_import_service.import_rows, db, model, create_schema, upload, fmt)
+    finally:
+        upload.close()
+
+def _bulk_filters(request) -> dict:
+    filters = request.filter.model_dump(exclude_none=True)
+    if not filters:
+        raise HTTPException(status_code=400, detail="filter must set at least one condition")
+    return filters
+
+def _bulk_update(db: Session, model, request) -> dict:
+    filters = _bulk_filters(request)
+    patch = request.patch.model_dump(exclude_unset=True)
+    if not patch:
+        raise HTTPException(status_code=400, detail="patch must set at least one field")
+    try:
+        return crm_service.bulk_update(db, model, filters, patch, request.dry_run)
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e.orig).strip())
+
+def _bulk_delete(db: Session, model, request) -> dict:
+    filters = _bulk_filters(request)
+    try:
+        return crm_service.bulk_delete(db, model, filters, request.dry_run)
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e.orig).strip())
+
+def _if_match(value: Optional[str]) -> Optional[int]:
+    """If-Match header ('"3"', 'W/"3"' or '3') -> expected row version"""
+    if value is None or value.strip() == "*":
+        return None
+    tag = value.strip().removeprefix("W/").strip('"')
+    if not tag.isdigit():
+        raise HTTPException(status_code=400, detail="If-Match must be a row version ETag")
+    return int(tag)
+
+def _patch(db: Session, model, obj_id: int, request, if_match: Optional[str], name: str):
+    """Write only the fields sent, in one UPDATE ... RETURNING; 412 if If-Match is stale"""
+    values = request.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="PATCH body must set at least one field")
+    try:
+        row = crm_service.patch(db, model, obj_id, values, _if_match(if_match))
+    except VersionConflict as e:
+        raise HTTPException(
+            status_code=412,
+            detail={"error": f"{name} was modified", "current_version": e.current_version},
+            headers={"ETag": etag(e.current_version)},
+        )
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e.orig).strip())
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"{name} not found")
+    return RowJSONResponse(row, headers={"ETag": etag(row["version"])})
+
+def _cached_page(db: Session, schema_name: str, entity: str, schema, get_page, **params) -> Response:
+    """List page through the response cache; params are get_page's keyword arguments"""
+    def load():
+        page = get_page(db, **params)
+        if params.get("fields") is None:
+            return CachedBody(Page[schema].model_validate(page).model_dump_json().encode(), None)
+        return CachedBody(RowJSONResponse(page).body, None)
+    return cached_response(response_cache.get_or_load(db, schema_name, entity, params, params.get("include", ()), load))
+
+def _cached_one(db: Session, schema_name: str, entity: str, schema, get_one, obj_id: int, name: str, **params) -> Response:
+    """Single record through the response cache, with its version as ETag"""
+    def load():
+        obj = get_one(db, obj_id, **params)
+        if obj is None:
+            return None
+        return CachedBody(schema.model_validate(obj).model_dump_json().encode(), etag(obj.version))
+    cached = response_cache.get_or_load(db, schema_name, entity, {"id": obj_id, **params}, params.get("include", ()), load)
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"{name} not found")
+    return cached_response(cached)
+
+# ---------------------- SEARCH ----------------------
+@router.get("/search", response_model=SearchResults)
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: List[SearchEntity] = Query(["contacts", "leads", "opportunities"]),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_tenant_db),
+):
+    """Ranked full-text + fuzzy search, grouped by entity"""
+    return search_service.search(db, q, types, limit)
+
+
+# ---------------------- BATCH ----------------------
+@router.post("/batch", response_model=BatchResponse)
+def batch(request: BatchRequest, db: Session = Depends(get_tenant_db)):
+    """Ordered creates/updates/deletes across contacts, leads and opportunities
+    in one transaction; "$<ref>" refers to the id created by an earlier op"""
+    if len(request.operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BATCH_MAX_OPERATIONS} operations per batch")
+    try:
+        results = batch_service.run(db, request.operations)
+    except BatchError as e:
+        headers = {"Retry-After": str(e.retry_after)} if e.retry_after is not None else None
+        raise HTTPException(status_code=e.status_code, detail={"index": e.index, "error": e.message}, headers=headers)
+    return RowJSONResponse({"results": results})
+
+
 # ---------------------- CONTACTS ----------------------
-@router.get("/contacts/", response_model=List[Contact])
-def read_contacts(skip: int = 0, limit: int = 100, db: Session = Depends(get_tenant_db)):
-    return crm_service.get_contacts(db, skip=skip, limit=limit)
+@router.get("/contacts/", response_model=Page[Contact])
+def read_contacts(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    sort: ContactSortField = "id",
+    order: SortOrder = "asc",
+    filters: dict = Depends(contact_filters),
+    fields: Optional[tuple] = Depends(sparse_fields(CONTACT_FIELDS)),
+    schema_name: str = Depends(get_tenant_schema),
+    db: Session = Depends(get_tenant_db),
+):
+    try:
+        columns = row_fields(fields, (), CONTACT_FIELDS)
+        return _cached_page(
+            db, schema_name, "contacts", Contact, crm_service.get_contacts,
+            cursor=cursor, limit=limit, sort=sort, order=order, filters=filters, fields=columns,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/contacts/", response_model=Contact)
 def create_contact(contact: ContactCreate, db: Session = Depends(get_tenant_db)):
     return crm_service.create_contact(db, contact)
 
+@router.post("/contacts/import", response_model=ImportReport)
+async def import_contacts(request: Request, format: Optional[DataFormat] = None, db: Session = Depends(get_tenant_db)):
+    """Bulk load a CSV (with header) or NDJSON request body"""
+    return await _bulk_import(request, format, db, models.Contact, ContactCreate)
+
+@router.post("/contacts/bulk-update", response_model=BulkResult)
+def bulk_update_contacts(request: BulkUpdate[ContactFilter, ContactUpdate], db: Session = Depends(get_tenant_db)):
+    """Apply `patch` to every contact matching `filter` in a single UPDATE"""
+    return _bulk_update(db, models.Contact, request)
+
+@router.post("/contacts/bulk-delete", response_model=BulkResult)
+def bulk_delete_contacts(request: BulkDelete[ContactFilter], db: Session = Depends(get_tenant_db)):
+    """Delete every contact matching `filter` in a single DELETE"""
+    return _bulk_delete(db, models.Contact, request)
+
+@router.get("/contacts/export")
+def export_contacts(format: DataFormat = "csv", schema_name: str = Depends(get_tenant_schema)):
+    """Stream every contact as CSV or NDJSON"""
+    return _export(schema_name, models.Contact, format)
+
 @router.get("/contacts/{contact_id}", response_model=Contact)
-def read_contact(contact_id: int, db: Session = Depends(get_tenant_db)):
-    contact = crm_service.get_contact(db, contact_id)
-    if not contact:
-        raise HTTPException(status_code=404, detail="Contact not found")
-    return contact
+def read_contact(
+    contact_id: int,
+    schema_name: str = Depends(get_tenant_schema),
+    db: Session = Depends(get_tenant_db),
+):
+    return _cached_one(db, schema_name, "contacts", Contact, crm_service.get_contact, contact_id, "Contact")
 
 @router.put("/contacts/{contact_id}", response_model=Contact)
 def update_contact(contact_id: int, contact_data: ContactCreate, db: Session = Depends(get_tenant_db)):
@@ -33,6 +215,17 @@ def update_contact(contact_id: int, contact_data: ContactCreate, db: Session = D
         raise HTTPException(status_code=404, detail="Contact not found")
     return contact
 
+@router.patch("/contacts/{contact_id}", response_model=Contact)
+def patch_contact(
+    contact_id: int,
+    contact_data: ContactUpdate,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_tenant_db),
+):
+    """Partial update; send the ETag from a read as If-Match to fail with 412
+    instead of overwriting a concurrent change"""
+    return _patch(db, models.Contact, contact_id, contact_data, if_match, "Contact")
+
 @router.delete("/contacts/{contact_id}", status_code=204)
 def delete_contact(contact_id: int, db: Session = Depends(get_tenant_db)):
     deleted = crm_service.delete_contact(db, contact_id)
@@ -42,20 +235,59 @@ def delete_contact(contact_id: int, db: Session = Depends(get_tenant_db)):
 
 
 # ---------------------- LEADS ----------------------
-@router.get("/leads/", response_model=List[Lead])
-def read_leads(skip: int = 0, limit: int = 100, db: Session = Depends(get_tenant_db)):
-    return crm_service.get_leads(db, skip=skip, limit=limit)
+@router.get("/leads/", response_model=Page[Lead])
+def read_leads(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    sort: LeadSortField = "id",
+    order: SortOrder = "asc",
+    filters: dict = Depends(lead_filters),
+    include: tuple = Depends(includes(LEAD_INCLUDES)),
+    fields: Optional[tuple] = Depends(sparse_fields(LEAD_FIELDS)),
+    schema_name: str = Depends(get_tenant_schema),
+    db: Session = Depends(get_tenant_db),
+):
+    try:
+        columns = row_fields(fields, include, LEAD_FIELDS)
+        return _cached_page(
+            db, schema_name, "leads", Lead, crm_service.get_leads,
+            cursor=cursor, limit=limit, sort=sort, order=order, filters=filters, include=include, fields=columns,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/leads/", response_model=Lead)
 def create_lead(lead: LeadCreate, db: Session = Depends(get_tenant_db)):
     return crm_service.create_lead(db, lead)
 
+@router.post("/leads/import", response_model=ImportReport)
+async def import_leads(request: Request, format: Optional[DataFormat] = None, db: Session = Depends(get_tenant_db)):
+    """Bulk load a CSV (with header) or NDJSON request body"""
+    return await _bulk_import(request, format, db, models.Lead, LeadCreate)
+
+@router.post("/leads/bulk-update", response_model=BulkResult)
+def bulk_update_leads(request: BulkUpdate[LeadFilter, LeadUpdate], db: Session = Depends(get_tenant_db)):
+    """Apply `patch` to every lead matching `filter` in a single UPDATE"""
+    return _bulk_update(db, models.Lead, request)
+
+@router.post("/leads/bulk-delete", response_model=BulkResult)
+def bulk_delete_leads(request: BulkDelete[LeadFilter], db: Session = Depends(get_tenant_db)):
+    """Delete every lead matching `filter` in a single DELETE"""
+    return _bulk_delete(db, models.Lead, request)
+
+@router.get("/leads/export")
+def export_leads(format: DataFormat = "csv", schema_name: str = Depends(get_tenant_schema)):
+    """Stream every lead as CSV or NDJSON"""
+    return _export(schema_name, models.Lead, format)
+
 @router.get("/leads/{lead_id}", response_model=Lead)
-def read_lead(lead_id: int, db: Session = Depends(get_tenant_db)):
-    lead = crm_service.get_lead(db, lead_id)
-    if not lead:
-        raise HTTPException(status_code=404, detail="Lead not found")
-    return lead
+def read_lead(
+    lead_id: int,
+    include: tuple = Depends(includes(LEAD_INCLUDES)),
+    schema_name: str = Depends(get_tenant_schema),
+    db: Session = Depends(get_tenant_db),
+):
+    return _cached_one(db, schema_name, "leads", Lead, crm_service.get_lead, lead_id, "Lead", include=include)
 
 @router.put("/leads/{lead_id}", response_model=Lead)
 def update_lead(lead_id: int, lead_data: LeadCreate, db: Session = Depends(get_tenant_db)):
@@ -64,6 +296,17 @@ def update_lead(lead_id: int, lead_data: LeadCreate, db: Session = Depends(get_t
         raise HTTPException(status_code=404, detail="Lead not found")
     return lead
 
+@router.patch("/leads/{lead_id}", response_model=Lead)
+def patch_lead(
+    lead_id: int,
+    lead_data: LeadUpdate,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_tenant_db),
+):
+    """Partial update; send the ETag from a read as If-Match to fail with 412
+    instead of overwriting a concurrent change"""
+    return _patch(db, models.Lead, lead_id, lead_data, if_match, "Lead")
+
 @router.delete("/leads/{lead_id}", status_code=204)
 def delete_lead(lead_id: int, db: Session = Depends(get_tenant_db)):
     deleted = crm_service.delete_lead(db, lead_id)
@@ -71,22 +314,66 @@ def delete_lead(lead_id: int, db: Session = Depends(get_tenant_db)):
         raise HTTPException(status_code=404, detail="Lead not found")
     return None
 
+@router.get("/leads/{lead_id}/history", response_model=List[StageChange])
+def read_lead_history(lead_id: int, db: Session = Depends(get_tenant_db)):
+    """Status transitions, oldest first (kept after the lead is deleted)"""
+    return history_service.get_history(db, "leads", lead_id)
+
 
 # ---------------------- OPPORTUNITIES ----------------------
-@router.get("/opportunities/", response_model=List[Opportunity])
-def read_opportunities(skip: int = 0, limit: int = 100, db: Session = Depends(get_tenant_db)):
-    return crm_service.get_opportunities(db, skip=skip, limit=limit)
+@router.get("/opportunities/", response_model=Page[Opportunity])
+def read_opportunities(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    sort: OpportunitySortField = "id",
+    order: SortOrder = "asc",
+    filters: dict = Depends(opportunity_filters),
+    include: tuple = Depends(includes(OPPORTUNITY_INCLUDES)),
+    fields: Optional[tuple] = Depends(sparse_fields(OPPORTUNITY_FIELDS)),
+    schema_name: str = Depends(get_tenant_schema),
+    db: Session = Depends(get_tenant_db),
+):
+    try:
+        columns = row_fields(fields, include, OPPORTUNITY_FIELDS)
+        return _cached_page(
+            db, schema_name, "opportunities", Opportunity, crm_service.get_opportunities,
+            cursor=cursor, limit=limit, sort=sort, order=order, filters=filters, include=include, fields=columns,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/opportunities/", response_model=Opportunity)
 def create_opportunity(opportunity: OpportunityCreate, db: Session = Depends(get_tenant_db)):
     return crm_service.create_opportunity(db, opportunity)
 
+@router.post("/opportunities/import", response_model=ImportReport)
+async def import_opportunities(request: Request, format: Optional[DataFormat] = None, db: Session = Depends(get_tenant_db)):
+    """Bulk load a CSV (with header) or NDJSON request body"""
+    return await _bulk_import(request, format, db, models.Opportunity, OpportunityCreate)
+
+@router.post("/opportunities/bulk-update", response_model=BulkResult)
+def bulk_update_opportunities(request: BulkUpdate[OpportunityFilter, OpportunityUpdate], db: Session = Depends(get_tenant_db)):
+    """Apply `patch` to every opportunity matching `filter` in a single UPDATE"""
+    return _bulk_update(db, models.Opportunity, request)
+
+@router.post("/opportunities/bulk-delete", response_model=BulkResult)
+def bulk_delete_opportunities(request: BulkDelete[OpportunityFilter], db: Session = Depends(get_tenant_db)):
+    """Delete every opportunity matching `filter` in a single DELETE"""
+    return _bulk_delete(db, models.Opportunity, request)
+
+@router.get("/opportunities/export")
+def export_opportunities(format: DataFormat = "csv", schema_name: str = Depends(get_tenant_schema)):
+    """Stream every opportunity as CSV or NDJSON"""
+    return _export(schema_name, models.Opportunity, format)
+
 @router.get("/opportunities/{opportunity_id}", response_model=Opportunity)
-def read_opportunity(opportunity_id: int, db: Session = Depends(get_tenant_db)):
-    opp = crm_service.get_opportunity(db, opportunity_id)
-    if not opp:
-        raise HTTPException(status_code=404, detail="Opportunity not found")
-    return opp
+def read_opportunity(
+    opportunity_id: int,
+    include: tuple = Depends(includes(OPPORTUNITY_INCLUDES)),
+    schema_name: str = Depends(get_tenant_schema),
+    db: Session = Depends(get_tenant_db),
+):
+    return _cached_one(db, schema_name, "opportunities", Opportunity, crm_service.get_opportunity, opportunity_id, "Opportunity", include=include)
 
 @router.put("/opportunities/{opportunity_id}", response_model=Opportunity)
 def update_opportunity(opportunity_id: int, opportunity_data: OpportunityCreate, db: Session = Depends(get_tenant_db)):
@@ -95,9 +382,25 @@ def update_opportunity(opportunity_id: int, opportunity_data: OpportunityCreate,
         raise HTTPException(status_code=404, detail="Opportunity not found")
     return opp
 
+@router.patch("/opportunities/{opportunity_id}", response_model=Opportunity)
+def patch_opportunity(
+    opportunity_id: int,
+    opportunity_data: OpportunityUpdate,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_tenant_db),
+):
+    """Partial update; send the ETag from a read as If-Match to fail with 412
+    instead of overwriting a concurrent change"""
+    return _patch(db, models.Opportunity, opportunity_id, opportunity_data, if_match, "Opportunity")
+
 @router.delete("/opportunities/{opportunity_id}", status_code=204)
 def delete_opportunity(opportunity_id: int, db: Session = Depends(get_tenant_db)):
     deleted = crm_service.delete_opportunity(db, opportunity_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Opportunity not found")
     return None
+
+@router.get("/opportunities/{opportunity_id}/history", response_model=List[StageChange])
+def read_opportunity_history(opportunity_id: int, db: Session = Depends(get_tenant_db)):
+    """Stage transitions, oldest first (kept after the opportunity is deleted)"""
+    return history_service.get_history(db, "opportunities", opportunity_id)
@@ -0,0 +1,177 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.schemas.crm import (
+    Contact, ContactCreate, Lead, LeadCreate,
+    Opportunity, OpportunityCreate, Page, SortOrder,
+    ContactSortField, LeadSortField, OpportunitySortField, LEAD_INCLUDES, OPPORTUNITY_INCLUDES,
+    CONTACT_FIELDS, LEAD_FIELDS, OPPORTUNITY_FIELDS
+)
+from app.services.pagination import InvalidCursor
+from app.api.v1.responses import RowJSONResponse, cached_response, etag
+from app.services.crm_async import async_crm_service
+from app.services.response_cache import response_cache, CachedBody
+from app.api.v1.dependencies import (
+    get_async_tenant_db, contact_filters, lead_filters, opportunity_filters, includes,
+    sparse_fields, row_fields
+)
+
+# Swapped in for the matching crm.router routes when DB_ASYNC is enabled
+# (see app/api/v1/api.py); routes not defined here stay sync.
+router = APIRouter()
+
+# Same cache keys and bodies as crm._cached_page / crm._cached_one, so the
+# sync and async stacks share entries
+
+async def _cached_page(db: AsyncSession, entity: str, schema, get_page, **params) -> Response:
+    async def load():
+        page = await get_page(db, **params)
+        if params.get("fields") is None:
+            return CachedBody(Page[schema].model_validate(page).model_dump_json().encode(), None)
+        return CachedBody(RowJSONResponse(page).body, None)
+    schema_name = db.info["tenant_schema"]
+    return cached_response(await response_cache.get_or_load_async(db, schema_name, entity, params, params.get("include", ()), load))
+
+async def _cached_one(db: AsyncSession, entity: str, schema, get_one, obj_id: int, name: str, **params) -> Response:
+    async def load():
+        obj = await get_one(db, obj_id, **params)
+        if obj is None:
+            return None
+        return CachedBody(schema.model_validate(obj).model_dump_json().encode(), etag(obj.version))
+    schema_name = db.info["tenant_schema"]
+    cached = await response_cache.get_or_load_async(db, schema_name, entity, {"id": obj_id, **params}, params.get("include", ()), load)
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"{name} not found")
+    return cached_response(cached)
+
+# ---------------------- CONTACTS ----------------------
+@router.get("/contacts/", response_model=Page[Contact])
+async def read_contacts(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    sort: ContactSortField = "id",
+    order: SortOrder = "asc",
+    filters: dict = Depends(contact_filters),
+    fields: Optional[tuple] = Depends(sparse_fields(CONTACT_FIELDS)),
+    db: AsyncSession = Depends(get_async_tenant_db),
+):
+    try:
+        columns = row_fields(fields, (), CONTACT_FIELDS)
+        return await _cached_page(
+            db, "contacts", Contact, async_crm_service.get_contacts,
+            cursor=cursor, limit=limit, sort=sort, order=order, filters=filters, fields=columns,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/contacts/", response_model=Contact)
+async def create_contact(contact: ContactCreate, db: AsyncSession = Depends(get_async_tenant_db)):
+    return await async_crm_service.create_contact(db, contact)
+
+@router.get("/contacts/{contact_id}", response_model=Contact)
+async def read_contact(contact_id: int, db: AsyncSession = Depends(get_async_tenant_db)):
+    return await _cached_one(db, "contacts", Contact, async_crm_service.get_contact, contact_id, "Contact")
+
+@router.put("/contacts/{contact_id}", response_model=Contact)
+async def update_contact(contact_id: int, contact_data: ContactCreate, db: AsyncSession = Depends(get_async_tenant_db)):
+    contact = await async_crm_service.update_contact(db, contact_id, contact_data)
+    if not contact:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return contact
+
+@router.delete("/contacts/{contact_id}", status_code=204)
+async def delete_contact(contact_id: int, db: AsyncSession = Depends(get_async_tenant_db)):
+    deleted = await async_crm_service.delete_contact(db, contact_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return None
+
+
+# ---------------------- LEADS ----------------------
+@router.get("/leads/", response_model=Page[Lead])
+async def read_leads(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    sort: LeadSortField = "id",
+    order: SortOrder = "asc",
+    filters: dict = Depends(lead_filters),
+    include: tuple = Depends(includes(LEAD_INCLUDES)),
+    fields: Optional[tuple] = Depends(sparse_fields(LEAD_FIELDS)),
+    db: AsyncSession = Depends(get_async_tenant_db),
+):
+    try:
+        columns = row_fields(fields, include, LEAD_FIELDS)
+        return await _cached_page(
+            db, "leads", Lead, async_crm_service.get_leads,
+            cursor=cursor, limit=limit, sort=sort, order=order, filters=filters, include=include, fields=columns,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/leads/", response_model=Lead)
+async def create_lead(lead: LeadCreate, db: AsyncSession = Depends(get_async_tenant_db)):
+    return await async_crm_service.create_lead(db, lead)
+
+@router.get("/leads/{lead_id}", response_model=Lead)
+async def read_lead(lead_id: int, include: tuple = Depends(includes(LEAD_INCLUDES)), db: AsyncSession = Depends(get_async_tenant_db)):
+    return await _cached_one(db, "leads", Lead, async_crm_service.get_lead, lead_id, "Lead", include=include)
+
+@router.put("/leads/{lead_id}", response_model=Lead)
+async def update_lead(lead_id: int, lead_data: LeadCreate, db: AsyncSession = Depends(get_async_tenant_db)):
+    lead = await async_crm_service.update_lead(db, lead_id, lead_data)
+    if not lead:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    return lead
+
+@router.delete("/leads/{lead_id}", status_code=204)
+async def delete_lead(lead_id: int, db: AsyncSession = Depends(get_async_tenant_db)):
+    deleted = await async_crm_service.delete_lead(db, lead_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    return None
+
+
+# ---------------------- OPPORTUNITIES ----------------------
+@router.get("/opportunities/", response_model=Page[Opportunity])
+async def read_opportunities(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    sort: OpportunitySortField = "id",
+    order: SortOrder = "asc",
+    filters: dict = Depends(opportunity_filters),
+    include: tuple = Depends(includes(OPPORTUNITY_INCLUDES)),
+    fields: Optional[tuple] = Depends(sparse_fields(OPPORTUNITY_FIELDS)),
+    db: AsyncSession = Depends(get_async_tenant_db),
+):
+    try:
+        columns = row_fields(fields, include, OPPORTUNITY_FIELDS)
+        return await _cached_page(
+            db, "opportunities", Opportunity, async_crm_service.get_opportunities,
+            cursor=cursor, limit=limit, sort=sort, order=order, filters=filters, include=include, fields=columns,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/opportunities/", response_model=Opportunity)
+async def create_opportunity(opportunity: OpportunityCreate, db: AsyncSession = Depends(get_async_tenant_db)):
+    return await async_crm_service.create_opportunity(db, opportunity)
+
+@router.get("/opportunities/{opportunity_id}", response_model=Opportunity)
+async def read_opportunity(opportunity_id: int, include: tuple = Depends(includes(OPPORTUNITY_INCLUDES)), db: AsyncSession = Depends(get_async_tenant_db)):
+    return await _cached_one(
+        db, "opportunities", Opportunity, async_crm_service.get_opportunity, opportunity_id, "Opportunity", include=include,
+    )
+
+@router.put("/opportunities/{opportunity_id}", response_model=Opportunity)
+async def update_opportunity(opportunity_id: int, opportunity_data: OpportunityCreate, db: AsyncSession = Depends(get_async_tenant_db)):
+    opp = await async_crm_service.update_opportunity(db, opportunity_id, opportunity_data)
+    if not opp:
+        raise HTTPException(status_code=404, detail="Opportunity not found")
+    return opp
+
+@router.delete("/opportunities/{opportunity_id}", status_code=204)
+async def delete_opportunity(opportunity_id: int, db: AsyncSession = Depends(get_async_tenant_db)):
+    deleted = await async_crm_service.delete_opportunity(db, opportunity_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Opportunity not found")
+    return None
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from app.schemas.stats import (
+    LeadStatusCount, Pipeline, MonthlyClose, StatsSnapshot, StatsRecompute, PipelineAnalytics, AnalyticsPeriod,
+    HistoryEntity, Funnel, Velocity, StuckRecord
+)
+from app.services.stats import stats_service
+from app.services.analytics import analytics_service
+from app.services.history import history_service
+from app.api.v1.dependencies import get_tenant_db, get_tenant_schema
+from app.core.security import get_current_admin_user
+
+router = APIRouter()
+
+@router.get("/", response_model=StatsSnapshot)
+def read_stats(db: Session = Depends(get_tenant_db)):
+    return stats_service.snapshot(db)
+
+@router.get("/leads", response_model=List[LeadStatusCount])
+def read_lead_stats(db: Session = Depends(get_tenant_db)):
+    return stats_service.get_lead_status_counts(db)
+
+@router.get("/pipeline", response_model=Pipeline)
+def read_pipeline(db: Session = Depends(get_tenant_db)):
+    return stats_service.get_pipeline(db)
+
+@router.get("/closes", response_model=List[MonthlyClose])
+def read_expected_closes(db: Session = Depends(get_tenant_db)):
+    return stats_service.get_expected_closes(db)
+
+@router.get("/analytics", response_model=PipelineAnalytics)
+def read_pipeline_analytics(
+    period: AnalyticsPeriod = Query("month"),
+    schema_name: str = Depends(get_tenant_schema),
+    db: Session = Depends(get_tenant_db),
+):
+    """Stage conversion, time in stage, win rate and forecast by close_date period"""
+    return analytics_service.get_pipeline_analytics(db, schema_name, period)
+
+@router.get("/funnel", response_model=Funnel)
+def read_funnel(
+    entity: HistoryEntity = "opportunities",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_tenant_db),
+):
+    """Records entering each stage between since and until (default: last 90 days)"""
+    return history_service.funnel(db, entity, since, until)
+
+@router.get("/velocity", response_model=Velocity)
+def read_velocity(
+    entity: HistoryEntity = "opportunities",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_tenant_db),
+):
+    """Average time in each stage for stints that ended in the window"""
+    return history_service.velocity(db, entity, since, until)
+
+@router.get("/stuck", response_model=List[StuckRecord])
+def read_stuck(
+    entity: HistoryEntity = "opportunities",
+    days: int = Query(30, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_tenant_db),
+):
+    """Open records whose stage has not changed for at least `days`"""
+    return history_service.stuck(db, entity, days, limit)
+
+@router.post("/recompute", response_model=StatsRecompute)
+def recompute_stats(
+    schema_name: str = Depends(get_tenant_schema),
+    db: Session = Depends(get_tenant_db),
+    current_user=Depends(get_current_admin_user),
+):
+    """Admin: rebuild the aggregates from the base tables and report drift"""
+    return stats_service.recompute(db, schema_name)
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.schemas.tenant import Tenant, TenantCreate, User, UserCreate, Token
-from app.services.tenant import tenant_service
-from app.core.security import verify_password, create_access_token
+from app.schemas.tenant import Tenant, TenantCreate, ProvisioningJob, User, UserCreate, Token
+from app.services.tenant import NameTaken, TeardownPending, tenant_service
+from app.services.provisioning import provisioning_service
+from app.core.security import password_hasher, create_access_token
 
 router = APIRouter()
 @staticmethod
@@ -11,22 +13,49 @@ def get_tenant_by_name(db: Session, name: str):
     """Fetch tenant object by name (case-insensitive)."""
     return db.query(Tenant).filter(Tenant.name.ilike(name)).first()
 
-@router.post("/tenants/", response_model=Tenant)
+@router.post("/tenants/", response_model=Tenant, status_code=202)
 def create_tenant(tenant: TenantCreate, db: Session = Depends(get_db)):
-    return tenant_service.create_tenant(db, tenant)
+    """Register a tenant; its schema is created in the background"""
+    try:
+        return tenant_service.create_tenant(db, tenant)
+    except TeardownPending as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except NameTaken as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/tenants/{tenant_id}/provisioning", response_model=ProvisioningJob)
+def read_provisioning_status(tenant_id: int, db: Session = Depends(get_db)):
+    """Progress of the tenant's schema provisioning; a failed job means the
+    tenant was rolled back"""
+    job = provisioning_service.get_job(db, tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No provisioning job for this tenant")
+    return job
+
+# Password hashing runs on password_hasher's own pool; these handlers are
+# async so a login burst doesn't hold FastAPI threadpool workers while waiting.
 @router.post("/users/", response_model=User)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = tenant_service.get_user_by_email(db, email=user.email)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    return tenant_service.create_user(db, user)
+async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+    try:
+        await run_in_threadpool(tenant_service.check_email_free, db, user.email)
+        hashed_password = await password_hasher.hash(user.password)
+        return await run_in_threadpool(tenant_service.create_user, db, user, hashed_password)
+    except TeardownPending as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except NameTaken as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/login/", response_model=Token)
-def login(email: str, password: str, db: Session = Depends(get_db)):
-    user = tenant_service.get_user_by_email(db, email=email)
-    if not user or not verify_password(password, user.hashed_password):
+async def login(email: str, password: str, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(tenant_service.get_user_by_email, db, email)
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
+    if new_hash:
+        # Stored hash used an old bcrypt cost; upgrade it now we know the password
+        await run_in_threadpool(tenant_service.update_user, db, user.id, {"hashed_password": new_hash})
     
     access_token = create_access_token(data={"sub": user.email})
     
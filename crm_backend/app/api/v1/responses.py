@@ -0,0 +1,26 @@
+from decimal import Decimal
+import orjson
+from fastapi.responses import Response
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+class RowJSONResponse(Response):
+    """JSON straight from plain dicts/row values with orjson, skipping
+    response_model validation. Output matches the pydantic schemas: Numeric
+    as float, UTC datetimes with a Z suffix."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+def etag(version: int) -> str:
+    """ETag header value for a row version"""
+    return f'"{version}"'
+
+def cached_response(cached) -> Response:
+    """Response for a response_cache CachedBody"""
+    headers = {"ETag": cached.etag} if cached.etag else None
+    return Response(cached.body, media_type="application/json", headers=headers)
@@ -1,13 +1,103 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Password hashing: bcrypt cost and the dedicated worker pool
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Authenticated-principal cache for get_current_user.
+    # AUTH_STRICT_USER_LOOKUP=True queries the users table on every request.
+    AUTH_STRICT_USER_LOOKUP: bool = False
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+
+    # Main (public schema) connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+
+    # Serve CRM endpoints from the asyncio stack (asyncpg + AsyncSession)
+    DB_ASYNC: bool = False
+
+    # "per_tenant": one pool per tenant schema (search_path baked into the URL)
+    # "shared": all tenants share the main pool, search_path is set per transaction
+    TENANT_POOL_MODE: str = "per_tenant"
+
+    # Per-tenant connection pools (see TenantManager)
+    TENANT_POOL_SIZE: int = 5
+    TENANT_MAX_OVERFLOW: int = 5
+    TENANT_POOL_RECYCLE: int = 1800
+    TENANT_ENGINE_CACHE_SIZE: int = 50
+    TENANT_MAX_TOTAL_CONNECTIONS: int = 200
+
+    # Bulk import: rows per COPY/transaction and max row errors reported
+    BULK_IMPORT_CHUNK_SIZE: int = 5000
+    BULK_IMPORT_MAX_ERRORS: int = 1000
+
+    # Streaming export: rows fetched per server-side cursor round trip
+    EXPORT_BATCH_SIZE: int = 2000
+
+    # /crm/batch: most operations accepted in one request
+    BATCH_MAX_OPERATIONS: int = 500
+
+    # /crm/search: total latency budget and pg_trgm word-similarity cutoff
+    SEARCH_TIMEOUT_MS: int = 500
+    SEARCH_SIMILARITY_THRESHOLD: float = 0.4
+
+    # Pipeline analytics results kept in memory (one entry per tenant and period)
+    ANALYTICS_CACHE_SIZE: int = 200
+
+    # Read-through cache of CRM list/detail responses, invalidated by the
+    # per-table write counters. "memory" is per process (LRU bounded by
+    # RESPONSE_CACHE_MAX_BYTES); "redis" is shared and needs the redis package.
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024
+    RESPONSE_CACHE_REDIS_URL: Optional[str] = None
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+
+    # Extra Postgres databases for tenant schemas, {"shard name": url} (JSON in
+    # the environment). DATABASE_URL keeps the tenant catalog and is itself the
+    # "default" shard. New tenants go where TENANT_PLACEMENT_STRATEGY says:
+    # "least_loaded" (fewest tenants) or "hashed" (by schema name).
+    TENANT_SHARDS: Dict[str, str] = {}
+    TENANT_PLACEMENT_STRATEGY: str = "least_loaded"
+
+    # How long a tenant ID -> schema resolution is trusted without re-reading
+    # it, and how many are kept (least recently used dropped first)
+    TENANT_CACHE_TTL_SECONDS: int = 60
+    TENANT_CACHE_MAX_SIZE: int = 10000
+
+    # Background tenant schema provisioning: worker threads, and how long a
+    # job may sit in "running" before another process may take it over
+    PROVISIONING_WORKERS: int = 4
+    PROVISIONING_STALE_SECONDS: int = 300
+
+    # Deleted tenants: schemas are dropped by a background reaper once the
+    # grace period (longer than TENANT_CACHE_TTL_SECONDS, so no process still
+    # routes requests there) has passed. At most BATCH_SIZE schemas per run,
+    # one table per transaction with a pause in between; a DROP that can't get
+    # its locks within LOCK_TIMEOUT_MS is retried on a later run.
+    TENANT_TEARDOWN_GRACE_SECONDS: int = 300
+    TENANT_REAPER_INTERVAL_SECONDS: int = 60
+    TENANT_REAPER_BATCH_SIZE: int = 5
+    TENANT_REAPER_TABLE_PAUSE_SECONDS: float = 0.2
+    TENANT_REAPER_LOCK_TIMEOUT_MS: int = 5000
+
+    # Cross-tenant admin report: tenant schemas queried at once (each worker
+    # has its own connection, outside the request pool) and the statement
+    # timeout per tenant; a tenant over it is reported as "timeout"
+    ADMIN_FANOUT_WORKERS: int = 8
+    ADMIN_FANOUT_TIMEOUT_MS: int = 2000
     
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -1,23 +1,109 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, namedtuple
 from typing import Optional
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.models.tenant import User
+from app.db.session import SessionLocal
+from sqlalchemy import or_
+from app.models.tenant import Tenant, User
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost are flagged by needs_update and
+# transparently rehashed on the next successful login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 security = HTTPBearer()  # replaces OAuth2PasswordBearer
 
+# What authenticated endpoints need to know about the caller
+Principal = namedtuple("Principal", ["id", "email", "tenant_id", "is_superuser", "is_active"])
+
+class PrincipalCache:
+    """Bounded LRU of token subject -> Principal with a short TTL"""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # email -> (expires_at, Principal)
+        self._lock = threading.Lock()
+
+    def get(self, email: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[email]
+                return None
+            self._entries.move_to_end(email)
+            return entry[1]
+
+    def set(self, principal: Principal):
+        with self._lock:
+            self._entries[principal.email] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(principal.email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email: str):
+        with self._lock:
+            self._entries.pop(email, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, size-limited thread pool.
+
+    Keeps login bursts off FastAPI's shared threadpool. At most
+    workers + max_pending jobs are accepted; beyond that callers get a 429
+    immediately instead of queueing.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent password operations, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(pwd_context.hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str):
+        """Return (valid, new_hash); new_hash is set when the stored hash needs upgrading"""
+        return await self._submit(pwd_context.verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
@@ -25,10 +111,25 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def load_principal(email: str) -> Optional[Principal]:
+    """Look the user up in the public schema (users of a deleted tenant don't count)"""
+    db = SessionLocal()
+    try:
+        user = (
+            db.query(User)
+            .outerjoin(Tenant, User.tenant_id == Tenant.id)
+            .filter(User.email == email, or_(Tenant.id.is_(None), Tenant.status != "deleting"))
+            .first()
+        )
+        if user is None:
+            return None
+        return Principal(user.id, user.email, user.tenant_id, bool(user.is_superuser), bool(user.is_active))
+    finally:
+        db.close()
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+) -> Principal:
     """Extract current user from JWT Bearer token"""
     token = credentials.credentials
     try:
@@ -47,7 +148,11 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.email == email).first()
+    user = None if settings.AUTH_STRICT_USER_LOOKUP else principal_cache.get(email)
+    if user is None:
+        user = load_principal(email)
+        if user is not None and not settings.AUTH_STRICT_USER_LOOKUP:
+            principal_cache.set(user)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,7 +161,7 @@ def get_current_user(
         )
     return user
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_admin_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Ensure the current user is an admin"""
     if not current_user.is_superuser:
         raise HTTPException(
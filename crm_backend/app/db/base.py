@@ -1,5 +1,5 @@
 from app.db.base_class import Base
-from app.models import tenant, crm
+from app.models import tenant, crm, stats, history
 
 # Import all models here to ensure they are registered with Base
 __all__ = ["Base"]
\ No newline at end of file
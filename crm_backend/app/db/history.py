@@ -0,0 +1,46 @@
+from sqlalchemy import text
+
+# Triggers that append to the stage/status history tables (models in
+# app/models/history.py). Statement-level with transition tables, like the
+# summary triggers, so ORM updates, COPY imports and bulk SQL are all recorded
+# in the writing transaction. Templates take {schema}.
+
+# table -> (history table, key column, tracked column)
+HISTORY_TABLES = {
+    "leads": ("lead_status_history", "lead_id", "status"),
+    "opportunities": ("opportunity_stage_history", "opportunity_id", "stage"),
+}
+
+def _history_triggers(table: str, history: str, key: str, column: str) -> list:
+    function = f"crm_{table}_history"
+    body = f"""
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO {history} ({key}, from_value, to_value, changed_at)
+            SELECT id, NULL, {column}, coalesce(created_at, now()) FROM new_rows;
+        ELSE
+            INSERT INTO {history} ({key}, from_value, to_value)
+            SELECT n.id, o.{column}, n.{column}
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.{column} IS DISTINCT FROM o.{column};
+        END IF;
+        RETURN NULL;"""
+    return [
+        f"CREATE OR REPLACE FUNCTION {{schema}}.{function}() RETURNS trigger LANGUAGE plpgsql "
+        f"SET search_path = {{schema}} AS $fn$ BEGIN {body} END $fn$",
+        f"DROP TRIGGER IF EXISTS {table}_history_insert ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_history_insert AFTER INSERT ON {{schema}}.{table} "
+        f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.{function}()",
+        f"DROP TRIGGER IF EXISTS {table}_history_update ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_history_update AFTER UPDATE ON {{schema}}.{table} "
+        f"REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.{function}()",
+    ]
+
+HISTORY_TRIGGERS_DDL = [
+    statement
+    for table, (history, key, column) in HISTORY_TABLES.items()
+    for statement in _history_triggers(table, history, key, column)
+]
+
+def install_history_triggers(conn, schema_name: str):
+    for statement in HISTORY_TRIGGERS_DDL:
+        conn.execute(text(statement.format(schema=schema_name)))
@@ -0,0 +1,126 @@
+import os
+from typing import Optional
+from sqlalchemy import text
+
+# Helpers for Alembic revisions that change CRM tables. Those tables live in
+# one schema per tenant (see TenantManager), plus the copies in public that
+# the initial migration created.
+#
+# A tenant schema with its own alembic_version table is "tracked": it is
+# upgraded separately, one schema per run (`alembic -x schema=<name> upgrade`,
+# normally driven in parallel by app/db/tenant_migrations.py). Schemas without
+# one are still migrated inline by the main run, as before.
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations")
+
+SCHEMA_VERSION_DDL = [
+    """CREATE TABLE IF NOT EXISTS {schema}.alembic_version (
+        version_num varchar(32) NOT NULL,
+        CONSTRAINT alembic_version_pkc PRIMARY KEY (version_num))""",
+]
+
+def stamp_statement(revision: str) -> str:
+    """Record `revision` in a schema's version table unless it already has one"""
+    return (
+        f"INSERT INTO {{schema}}.alembic_version (version_num) SELECT '{revision}' "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {{schema}}.alembic_version)"
+    )
+
+def head_revision() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory(MIGRATIONS_DIR).get_current_head()
+
+def migration_schema(op) -> Optional[str]:
+    """Tenant schema of a per-schema run, None for the main run"""
+    return op.get_context().opts.get("crm_schema")
+
+def tenant_columns(bind) -> set:
+    """Columns of public.tenants (empty before the initial migration).
+
+    Code that runs at any revision -- older migrations, the tenant migration
+    runner before it upgrades public -- filters only on columns that exist.
+    """
+    return set(bind.execute(text("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'tenants'
+    """)).scalars())
+
+def crm_schemas(bind, schema_name: Optional[str] = None) -> list:
+    """Schemas a CRM migration applies to in this run.
+
+    A per-schema run touches only its schema; the main run touches public
+    and every untracked tenant schema (all in the main database: schemas on
+    other shards are created tracked).
+    """
+    if schema_name is not None:
+        return [schema_name]
+    columns = tenant_columns(bind)
+    conditions = ["to_regclass(quote_ident(t.schema_name) || '.alembic_version') IS NULL"]
+    if "status" in columns:
+        conditions.append("t.status != 'deleting'")
+    if "shard" in columns:
+        # Before the shard column every schema is in the main database
+        conditions.append("t.shard = 'default'")
+    rows = bind.execute(text(f"""
+        SELECT t.schema_name
+        FROM tenants t
+        JOIN pg_namespace n ON n.nspname = t.schema_name
+        WHERE {" AND ".join(conditions)}
+        ORDER BY t.id
+    """))
+    return ["public"] + [row[0] for row in rows]
+
+def execute_in_crm_schemas(op, statements):
+    """Run each statement once per CRM schema; `{schema}` is substituted"""
+    for schema_name in crm_schemas(op.get_bind(), migration_schema(op)):
+        for statement in statements:
+            op.execute(statement.format(schema=schema_name))
+
+def _index_is_invalid(bind, schema_name: str, name: str) -> bool:
+    return bool(bind.execute(text("""
+        SELECT NOT i.indisvalid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = :schema AND c.relname = :name
+    """), {"schema": schema_name, "name": name}).scalar())
+
+def _concurrently_in_crm_schemas(op, build):
+    """Run build(bind, schema_name) for each CRM schema outside the migration
+    transaction, so every statement commits on its own"""
+    bind = op.get_bind()
+    schema = migration_schema(op)
+    schemas = crm_schemas(bind, schema)
+    with op.get_context().autocommit_block():
+        for schema_name in schemas:
+            build(bind, schema_name)
+    if schema is not None:
+        # The block committed the per-schema run's transaction: take its lock
+        # and search_path back for the revisions after this one (see env.py)
+        bind.execute(text("SELECT pg_advisory_xact_lock(hashtext(:schema))"), {"schema": schema})
+        bind.execute(text(f"SET LOCAL search_path TO {schema}"))
+
+def create_indexes_concurrently(op, indexes):
+    """CREATE INDEX CONCURRENTLY for each (name, table, columns) in every CRM schema.
+
+    A plain CREATE INDEX holds a SHARE lock, which blocks writes, on its table
+    until the migration transaction commits, i.e. on every tenant's table for
+    the whole run. Concurrent builds let writes through.
+    """
+    def build(bind, schema_name):
+        for name, table, columns in indexes:
+            # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+            if _index_is_invalid(bind, schema_name, name):
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema_name}.{name}")
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {schema_name}.{table} ({columns})")
+
+    _concurrently_in_crm_schemas(op, build)
+
+def drop_indexes_concurrently(op, names):
+    """DROP INDEX CONCURRENTLY for each index name in every CRM schema"""
+    def drop(bind, schema_name):
+        for name in names:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema_name}.{name}")
+
+    _concurrently_in_crm_schemas(op, drop)
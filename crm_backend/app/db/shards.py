@@ -0,0 +1,107 @@
+import threading
+import zlib
+from sqlalchemy import create_engine, func
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+from app.db.session import async_engine as main_async_engine, engine as main_engine, get_async_database_url
+
+# Tenant schemas may live in several Postgres databases ("shards"). The tenant
+# catalog (tenants, users, provisioning jobs) always stays in DATABASE_URL,
+# which is also the "default" shard; TENANT_SHARDS names the others. Schema
+# names are unique across shards, and Tenant.shard records where each lives.
+
+DEFAULT_SHARD = "default"
+
+class UnknownShardError(Exception):
+    """A tenant refers to a shard that is not configured"""
+    pass
+
+def shard_urls() -> dict:
+    return {DEFAULT_SHARD: settings.DATABASE_URL, **settings.TENANT_SHARDS}
+
+def shard_url(shard: str) -> str:
+    try:
+        return shard_urls()[shard]
+    except KeyError:
+        raise UnknownShardError(f"Shard {shard!r} is not configured (TENANT_SHARDS)")
+
+class ShardRegistry:
+    """One shared pool per shard; the default shard reuses the main engines"""
+
+    def __init__(self):
+        self._engines = {DEFAULT_SHARD: main_engine}
+        self._async_engines = {DEFAULT_SHARD: main_async_engine}
+        self._lock = threading.Lock()
+
+    def engine(self, shard: str):
+        with self._lock:
+            engine = self._engines.get(shard)
+            if engine is None:
+                engine = self._engines[shard] = create_engine(
+                    shard_url(shard),
+                    pool_size=settings.DB_POOL_SIZE,
+                    max_overflow=settings.DB_MAX_OVERFLOW,
+                    pool_pre_ping=True,
+                )
+            return engine
+
+    def async_engine(self, shard: str):
+        with self._lock:
+            engine = self._async_engines.get(shard)
+            if engine is None:
+                engine = self._async_engines[shard] = create_async_engine(
+                    get_async_database_url(shard_url(shard)),
+                    pool_size=settings.DB_POOL_SIZE,
+                    max_overflow=settings.DB_MAX_OVERFLOW,
+                    pool_pre_ping=True,
+                )
+            return engine
+
+    def dispose_all(self):
+        """Close the extra shards' pools (the main engines are disposed elsewhere)"""
+        with self._lock:
+            engines = [engine for shard, engine in self._engines.items() if shard != DEFAULT_SHARD]
+            self._engines = {DEFAULT_SHARD: main_engine}
+        for engine in engines:
+            engine.dispose()
+
+    async def dispose_all_async(self):
+        with self._lock:
+            engines = [engine for shard, engine in self._async_engines.items() if shard != DEFAULT_SHARD]
+            self._async_engines = {DEFAULT_SHARD: main_async_engine}
+        for engine in engines:
+            await engine.dispose()
+
+shard_registry = ShardRegistry()
+
+# ---------------------- PLACEMENT ----------------------
+# A strategy picks the shard for a new tenant: (catalog session, shard names,
+# schema name) -> shard name. Register others in PLACEMENT_STRATEGIES.
+
+def least_loaded(db, shards, schema_name: str) -> str:
+    """Shard holding the fewest tenants (first listed on a tie)"""
+    from app.models.tenant import Tenant
+
+    counts = dict(
+        db.query(Tenant.shard, func.count(Tenant.id))
+        .filter(Tenant.status != "deleting")
+        .group_by(Tenant.shard)
+        .all()
+    )
+    return min(shards, key=lambda shard: counts.get(shard, 0))
+
+def hashed(db, shards, schema_name: str) -> str:
+    """Stable shard by schema name (crc32, so the same in every process)"""
+    return shards[zlib.crc32(schema_name.encode()) % len(shards)]
+
+PLACEMENT_STRATEGIES = {
+    "least_loaded": least_loaded,
+    "hashed": hashed,
+}
+
+def place_tenant(db, schema_name: str) -> str:
+    """Shard for a new tenant schema, per TENANT_PLACEMENT_STRATEGY"""
+    strategy = PLACEMENT_STRATEGIES.get(settings.TENANT_PLACEMENT_STRATEGY)
+    if strategy is None:
+        raise ValueError(f"Unknown TENANT_PLACEMENT_STRATEGY {settings.TENANT_PLACEMENT_STRATEGY!r}")
+    return strategy(db, list(shard_urls()), schema_name)
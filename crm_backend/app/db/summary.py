@@ -0,0 +1,196 @@
+from sqlalchemy import text
+
+# Trigger-maintained aggregate tables for /crm/stats (models in
+# app/models/stats.py). Statement-level triggers with transition tables fold a
+# whole INSERT / UPDATE / DELETE -- including a bulk COPY -- into one delta row
+# per affected group, adding the new rows and subtracting the old ones.
+#
+# The deltas (and the tables written, for table_versions) go to unlogged
+# buffer tables, which only ever hold uncommitted rows: each transaction sees
+# just its own. A deferred trigger applies them at commit, one upsert per
+# shared table in a fixed table and key order. So writers don't hold the
+# shared summary / counter rows for their whole transaction, and two
+# transactions writing several tables in different orders can't deadlock on
+# them.
+#
+# Templates take {schema}; functions pin their search_path to it so they work
+# the same in per-tenant and shared-pool modes.
+
+_WEIGHTED = "coalesce(amount, 0) * coalesce(probability, 0) / 100"
+
+def _delta(source: str, sign: str) -> dict:
+    return {
+        "lead_status": f"""
+            INSERT INTO lead_status_deltas (status, lead_count)
+            SELECT coalesce(status, ''), {sign}count(*) FROM {source} GROUP BY 1;""",
+        "stage": f"""
+            INSERT INTO opportunity_stage_deltas (stage, opportunity_count, amount_total, weighted_total)
+            SELECT coalesce(stage, ''), {sign}count(*), {sign}coalesce(sum(amount), 0), {sign}coalesce(sum({_WEIGHTED}), 0)
+            FROM {source} GROUP BY 1;""",
+        "monthly": f"""
+            INSERT INTO opportunity_monthly_deltas (month, stage, opportunity_count, amount_total, weighted_total)
+            SELECT date_trunc('month', close_date)::date, coalesce(stage, ''), {sign}count(*),
+                   {sign}coalesce(sum(amount), 0), {sign}coalesce(sum({_WEIGHTED}), 0)
+            FROM {source} WHERE close_date IS NOT NULL GROUP BY 1, 2;""",
+    }
+
+_ADD, _SUB = _delta("new_rows", ""), _delta("old_rows", "-")
+
+# ---------------------- COMMIT-TIME FLUSH ----------------------
+
+# Set (transaction-locally) once the flush is queued for the transaction
+FLUSH_PENDING = "crm.flush_pending"
+
+WRITE_BUFFERS_DDL = [
+    """CREATE UNLOGGED TABLE IF NOT EXISTS {schema}.lead_status_deltas (
+        status varchar(50) NOT NULL,
+        lead_count integer NOT NULL)""",
+    """CREATE UNLOGGED TABLE IF NOT EXISTS {schema}.opportunity_stage_deltas (
+        stage varchar(50) NOT NULL,
+        opportunity_count integer NOT NULL,
+        amount_total numeric(18, 2) NOT NULL,
+        weighted_total numeric(18, 2) NOT NULL)""",
+    """CREATE UNLOGGED TABLE IF NOT EXISTS {schema}.opportunity_monthly_deltas (
+        month date NOT NULL,
+        stage varchar(50) NOT NULL,
+        opportunity_count integer NOT NULL,
+        amount_total numeric(18, 2) NOT NULL,
+        weighted_total numeric(18, 2) NOT NULL)""",
+    """CREATE UNLOGGED TABLE IF NOT EXISTS {schema}.table_version_deltas (
+        table_name varchar(63) NOT NULL)""",
+    # One row per writing transaction; inserting it queues the flush
+    "CREATE UNLOGGED TABLE IF NOT EXISTS {schema}.pending_flushes (queued boolean NOT NULL DEFAULT true)",
+]
+
+FLUSH_DDL = [
+    f"""CREATE OR REPLACE FUNCTION {{schema}}.crm_queue_flush() RETURNS void LANGUAGE plpgsql
+       SET search_path = {{schema}} AS $fn$ BEGIN
+           IF current_setting('{FLUSH_PENDING}', true) IS DISTINCT FROM 'on' THEN
+               INSERT INTO pending_flushes DEFAULT VALUES;
+               PERFORM set_config('{FLUSH_PENDING}', 'on', true);
+           END IF;
+       END $fn$""",
+    # Every upsert locks its rows in key order, and the tables always in this order
+    f"""CREATE OR REPLACE FUNCTION {{schema}}.crm_flush_writes() RETURNS trigger LANGUAGE plpgsql
+       SET search_path = {{schema}} AS $fn$ BEGIN
+           INSERT INTO lead_status_counts AS s (status, lead_count)
+           SELECT status, sum(lead_count) FROM lead_status_deltas GROUP BY 1 ORDER BY 1
+           ON CONFLICT (status) DO UPDATE SET lead_count = s.lead_count + EXCLUDED.lead_count;
+           INSERT INTO opportunity_stage_totals AS s (stage, opportunity_count, amount_total, weighted_total)
+           SELECT stage, sum(opportunity_count), sum(amount_total), sum(weighted_total)
+           FROM opportunity_stage_deltas GROUP BY 1 ORDER BY 1
+           ON CONFLICT (stage) DO UPDATE SET
+               opportunity_count = s.opportunity_count + EXCLUDED.opportunity_count,
+               amount_total = s.amount_total + EXCLUDED.amount_total,
+               weighted_total = s.weighted_total + EXCLUDED.weighted_total;
+           INSERT INTO opportunity_monthly_closes AS s (month, stage, opportunity_count, amount_total, weighted_total)
+           SELECT month, stage, sum(opportunity_count), sum(amount_total), sum(weighted_total)
+           FROM opportunity_monthly_deltas GROUP BY 1, 2 ORDER BY 1, 2
+           ON CONFLICT (month, stage) DO UPDATE SET
+               opportunity_count = s.opportunity_count + EXCLUDED.opportunity_count,
+               amount_total = s.amount_total + EXCLUDED.amount_total,
+               weighted_total = s.weighted_total + EXCLUDED.weighted_total;
+           INSERT INTO table_versions AS v (table_name, version)
+           SELECT DISTINCT table_name, 1 FROM table_version_deltas ORDER BY 1
+           ON CONFLICT (table_name) DO UPDATE SET version = v.version + 1;
+           DELETE FROM lead_status_deltas;
+           DELETE FROM opportunity_stage_deltas;
+           DELETE FROM opportunity_monthly_deltas;
+           DELETE FROM table_version_deltas;
+           DELETE FROM pending_flushes;
+           -- SET CONSTRAINTS ... IMMEDIATE flushes early; later writes queue again
+           PERFORM set_config('{FLUSH_PENDING}', '', true);
+           RETURN NULL;
+       END $fn$""",
+    "DROP TRIGGER IF EXISTS pending_flushes_flush ON {schema}.pending_flushes",
+    "CREATE CONSTRAINT TRIGGER pending_flushes_flush AFTER INSERT ON {schema}.pending_flushes "
+    "DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE PROCEDURE {schema}.crm_flush_writes()",
+]
+
+def _trigger_function(name: str, add: str, subtract: str) -> str:
+    body = f"""
+        PERFORM crm_queue_flush();
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN {add}
+        END IF;
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN {subtract}
+        END IF;
+        RETURN NULL;"""
+    return (
+        f"CREATE OR REPLACE FUNCTION {{schema}}.{name}() RETURNS trigger LANGUAGE plpgsql "
+        f"SET search_path = {{schema}} AS $fn$ BEGIN {body.replace('{', '{{').replace('}', '}}')} END $fn$"
+    )
+
+def _statement_triggers(table: str, function: str) -> list:
+    return [
+        f"DROP TRIGGER IF EXISTS {table}_summary_insert ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_summary_insert AFTER INSERT ON {{schema}}.{table} "
+        f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.{function}()",
+        f"DROP TRIGGER IF EXISTS {table}_summary_update ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_summary_update AFTER UPDATE ON {{schema}}.{table} "
+        f"REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.{function}()",
+        f"DROP TRIGGER IF EXISTS {table}_summary_delete ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_summary_delete AFTER DELETE ON {{schema}}.{table} "
+        f"REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.{function}()",
+    ]
+
+SUMMARY_TRIGGERS_DDL = [
+    _trigger_function("crm_leads_summary", _ADD["lead_status"], _SUB["lead_status"]),
+    _trigger_function(
+        "crm_opportunities_summary",
+        _ADD["stage"] + _ADD["monthly"],
+        _SUB["stage"] + _SUB["monthly"],
+    ),
+    *_statement_triggers("leads", "crm_leads_summary"),
+    *_statement_triggers("opportunities", "crm_opportunities_summary"),
+]
+
+# Write counters (TableVersion): one bump per writing transaction, applied
+# at commit, so cached results derived from a table can be validated with a
+# primary-key lookup.
+VERSIONED_TABLES = ("contacts", "leads", "opportunities")
+
+VERSION_TRIGGERS_DDL = [
+    """CREATE OR REPLACE FUNCTION {schema}.crm_bump_table_version() RETURNS trigger LANGUAGE plpgsql
+       SET search_path = {schema} AS $fn$ BEGIN
+           PERFORM crm_queue_flush();
+           INSERT INTO table_version_deltas (table_name) VALUES (TG_TABLE_NAME);
+           RETURN NULL;
+       END $fn$""",
+] + [
+    statement
+    for table in VERSIONED_TABLES
+    for statement in (
+        f"DROP TRIGGER IF EXISTS {table}_version ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {{schema}}.{table} "
+        f"FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.crm_bump_table_version()",
+    )
+]
+
+# Rebuild every aggregate from the base tables. SHARE locks block concurrent
+# writes (and so trigger updates) for the duration of the rebuild.
+SUMMARY_LOCK = "LOCK TABLE {schema}.leads, {schema}.opportunities IN SHARE MODE"
+
+SUMMARY_REBUILD = [
+    SUMMARY_LOCK,
+    "DELETE FROM {schema}.lead_status_counts",
+    """INSERT INTO {schema}.lead_status_counts (status, lead_count)
+       SELECT coalesce(status, ''), count(*) FROM {schema}.leads GROUP BY 1""",
+    "DELETE FROM {schema}.opportunity_stage_totals",
+    f"""INSERT INTO {{schema}}.opportunity_stage_totals (stage, opportunity_count, amount_total, weighted_total)
+       SELECT coalesce(stage, ''), count(*), coalesce(sum(amount), 0), coalesce(sum({_WEIGHTED}), 0)
+       FROM {{schema}}.opportunities GROUP BY 1""",
+    "DELETE FROM {schema}.opportunity_monthly_closes",
+    f"""INSERT INTO {{schema}}.opportunity_monthly_closes (month, stage, opportunity_count, amount_total, weighted_total)
+       SELECT date_trunc('month', close_date)::date, coalesce(stage, ''), count(*),
+              coalesce(sum(amount), 0), coalesce(sum({_WEIGHTED}), 0)
+       FROM {{schema}}.opportunities WHERE close_date IS NOT NULL GROUP BY 1, 2""",
+]
+
+def install_summary_triggers(conn, schema_name: str):
+    """Create the trigger functions/triggers and backfill the aggregates"""
+    for statement in WRITE_BUFFERS_DDL + FLUSH_DDL + SUMMARY_TRIGGERS_DDL + VERSION_TRIGGERS_DDL + SUMMARY_REBUILD:
+        conn.execute(text(statement.format(schema=schema_name)))
+
+def rebuild_summaries(conn, schema_name: str):
+    for statement in SUMMARY_REBUILD:
+        conn.execute(text(statement.format(schema=schema_name)))
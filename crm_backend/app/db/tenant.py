@@ -1,80 +1,378 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+import threading
+import time
+import weakref
+from collections import OrderedDict, namedtuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
-from app.db.base import Base
-from app.models.crm import Contact, Lead, Opportunity
+from app.db.session import async_engine, engine as main_engine
+from app.db.shards import DEFAULT_SHARD, shard_registry, shard_url
+from app.db.template import render_schema_template
+
+# Cached result of resolving an X-Tenant-ID header
+TenantInfo = namedtuple("TenantInfo", ["id", "schema_name", "is_active", "status", "shard"])
+
+class TenantCapacityError(Exception):
+    """Raised when a new tenant pool would exceed the global connection cap"""
+    pass
+
+class TenantNotReady(Exception):
+    """The tenant's schema is still being provisioned"""
+    pass
+
+# Sessions for TENANT_POOL_MODE="shared": bound to the shard's shared pool, the
+# tenant schema travels in session.info and is applied to every transaction.
+SharedTenantSession = sessionmaker(autocommit=False, autoflush=False, bind=main_engine)
+
+@event.listens_for(SharedTenantSession, "after_begin")
+def _set_tenant_search_path(session, transaction, connection):
+    schema_name = session.info.get("tenant_schema")
+    if schema_name:
+        # is_local=true is SET LOCAL: the setting ends with the transaction, and
+        # the rollback the pool performs on checkin resets it before reuse
+        connection.execute(
+            text("SELECT set_config('search_path', :schema, true)"),
+            {"schema": schema_name},
+        )
+
+# Async tenant sessions (DB_ASYNC) always use the shared async pool and the
+# same per-transaction search_path as SharedTenantSession.
+class AsyncTenantSyncSession(Session):
+    pass
+
+event.listen(AsyncTenantSyncSession, "after_begin", _set_tenant_search_path)
+
+AsyncTenantSession = None
+if async_engine is not None:
+    AsyncTenantSession = async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        sync_session_class=AsyncTenantSyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+class TenantPool:
+    """A tenant's engine and sessionmaker, with the number of open sessions
+    leasing it. A leased pool is never evicted, so no session's engine is
+    disposed (and silently re-pooled outside the registry) under it."""
+
+    def __init__(self, engine, session_factory):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.leases = 0
+
+class TenantSession(Session):
+    """Session on a per-tenant pool; closing it returns its lease"""
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            release = self.info.pop("tenant_lease", None)
+            if release is not None:
+                release()
 
 class TenantManager:
     def __init__(self):
-        self.main_engine = create_engine(settings.DATABASE_URL)
-    
-    def create_tenant_schema(self, schema_name: str):
-        """Create a new schema for a tenant and set up all tables"""
-        print(f"Creating schema: {schema_name}")
-        
-        with self.main_engine.connect() as conn:
-            # Create schema
-            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema_name}"))
-            
-            # Switch to tenant schema and create tables
-            conn.execute(text(f"SET search_path TO {schema_name}"))
-            
-            # Create all CRM tables in the tenant schema (but NOT users/tenants)
-            try:
-                # Only create CRM tables in tenant schema
-                Contact.metadata.create_all(bind=conn)
-                Lead.metadata.create_all(bind=conn)
-                Opportunity.metadata.create_all(bind=conn)
-                print(f"✅ CRM tables created in schema: {schema_name}")
-            except Exception as e:
-                print(f"❌ Error creating tables in {schema_name}: {e}")
-                raise
-            
-            conn.commit()
-    
+        self.main_engine = main_engine
+        # schema_name -> TenantPool, least recently used first
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+        # tenant_id -> (expires_at, TenantInfo), least recently used first
+        self._resolution_cache = OrderedDict()
+        # Schemas known to have their CRM tables; checked once per process
+        self._provisioned_schemas = set()
+        # schema_name -> shard, refreshed by every tenant resolution
+        self._schema_shards = {}
+        self._extension_shards = set()
+
+    def shard_of(self, schema_name: str) -> str:
+        """Shard holding a schema, looked up in the tenant catalog on first use"""
+        shard = self._schema_shards.get(schema_name)
+        if shard is None:
+            with self.main_engine.connect() as conn:
+                shard = conn.execute(
+                    text("SELECT shard FROM tenants WHERE schema_name = :schema"), {"schema": schema_name}
+                ).scalar() or DEFAULT_SHARD
+            self._schema_shards[schema_name] = shard
+        return shard
+
+    def set_shard(self, schema_name: str, shard: str):
+        previous = self._schema_shards.get(schema_name)
+        self._schema_shards[schema_name] = shard
+        if previous is not None and previous != shard:
+            # Moved (app/db/tenant_move.py): stop using the old shard's pool
+            print(f"Schema {schema_name} moved from shard {previous} to {shard}")
+            self.dispose_tenant_engine(schema_name)
+            self._provisioned_schemas.discard(schema_name)
+
+    def create_tenant_schema(self, schema_name: str, shard: str = None):
+        """Create a tenant schema with every CRM table, index and trigger.
+
+        Runs the prebuilt template (app/db/template.py) as one script in one
+        transaction, so a failure leaves no half-built schema behind.
+        """
+        shard = shard or self.shard_of(schema_name)
+        engine = shard_registry.engine(shard)
+        print(f"Creating schema: {schema_name} (shard {shard})")
+        if shard not in self._extension_shards:
+            # Trigram operator class used by the search indexes
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public"))
+            self._extension_shards.add(shard)
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(render_schema_template(schema_name)))
+        except Exception as e:
+            print(f"❌ Error creating tables in {schema_name}: {e}")
+            raise
+        print(f"✅ CRM tables created in schema: {schema_name}")
+
+    def drop_tenant_schema(self, schema_name: str, pause_seconds: float = 0.0, shard: str = None):
+        """Drop a tenant schema, one table per transaction, then the schema.
+
+        Each DROP holds its exclusive locks only briefly, and lock_timeout makes
+        it give up instead of queueing behind (and stalling) other sessions.
+        """
+        engine = shard_registry.engine(shard or self.shard_of(schema_name))
+        self.dispose_tenant_engine(schema_name)
+        self._provisioned_schemas.discard(schema_name)
+        with engine.connect() as conn:
+            tables = conn.execute(
+                text("SELECT tablename FROM pg_tables WHERE schemaname = :schema"), {"schema": schema_name}
+            ).scalars().all()
+        for table in tables:
+            with engine.begin() as conn:
+                conn.execute(text(f"SET LOCAL lock_timeout = {int(settings.TENANT_REAPER_LOCK_TIMEOUT_MS)}"))
+                conn.execute(text(f'DROP TABLE IF EXISTS {schema_name}."{table}" CASCADE'))
+            time.sleep(pause_seconds)
+        with engine.begin() as conn:
+            conn.execute(text(f"SET LOCAL lock_timeout = {int(settings.TENANT_REAPER_LOCK_TIMEOUT_MS)}"))
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema_name} CASCADE"))
+        print(f"✅ Dropped schema: {schema_name}")
+
     def ensure_tables_exist(self, schema_name: str):
         """Ensure tables exist in tenant schema, create them if they don't"""
-        with self.main_engine.connect() as conn:
+        with shard_registry.engine(self.shard_of(schema_name)).connect() as conn:
             # Check if contacts table exists
             result = conn.execute(text(f"""
                 SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = '{schema_name}' 
+                    SELECT FROM information_schema.tables
+                    WHERE table_schema = '{schema_name}'
                     AND table_name = 'contacts'
                 )
             """))
             tables_exist = result.scalar()
-            
+
             if not tables_exist:
                 print(f"CRM tables don't exist in {schema_name}, creating them...")
                 self.create_tenant_schema(schema_name)
-    
-    def get_tenant_engine(self, schema_name: str):
-        """Get engine for specific tenant schema"""
-        # First ensure tables exist
+
+    def ensure_provisioned(self, schema_name: str):
+        """Run ensure_tables_exist the first time a schema is seen, then remember it"""
+        if schema_name in self._provisioned_schemas:
+            return
         self.ensure_tables_exist(schema_name)
-        
-        db_url = settings.DATABASE_URL
+        self._provisioned_schemas.add(schema_name)
+
+    def mark_provisioned(self, schema_name: str):
+        self._provisioned_schemas.add(schema_name)
+
+    def _connections_per_engine(self) -> int:
+        return settings.TENANT_POOL_SIZE + settings.TENANT_MAX_OVERFLOW
+
+    def _max_engines(self) -> int:
+        """Number of tenant pools allowed by both the LRU size and the global connection cap"""
+        by_connections = settings.TENANT_MAX_TOTAL_CONNECTIONS // self._connections_per_engine()
+        return max(1, min(settings.TENANT_ENGINE_CACHE_SIZE, by_connections))
+
+    def _evict_idle(self, keep: int):
+        """Dispose least recently used tenant pools with no open sessions and no
+        checked-out connections until at most `keep` engines remain. Must be
+        called with the lock held."""
+        for schema_name in list(self._engines.keys()):
+            if len(self._engines) <= keep:
+                return
+            pool = self._engines[schema_name]
+            if pool.leases == 0 and pool.engine.pool.checkedout() == 0:
+                del self._engines[schema_name]
+                pool.engine.dispose()
+        if len(self._engines) > keep:
+            raise TenantCapacityError(
+                f"All {len(self._engines)} tenant connection pools are busy "
+                f"(limit {settings.TENANT_MAX_TOTAL_CONNECTIONS} connections)"
+            )
+
+    def _build_tenant_engine(self, schema_name: str):
+        db_url = shard_url(self.shard_of(schema_name))
         if "?" in db_url:
             db_url = db_url.replace("?", f"?options=-csearch_path={schema_name}&")
         else:
             db_url = f"{db_url}?options=-csearch_path={schema_name}"
-        return create_engine(db_url)
-    
+        return create_engine(
+            db_url,
+            pool_size=settings.TENANT_POOL_SIZE,
+            max_overflow=settings.TENANT_MAX_OVERFLOW,
+            pool_recycle=settings.TENANT_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+
+    def _get_registered(self, schema_name: str, lease: bool = False) -> TenantPool:
+        """Return the cached TenantPool for a schema, creating it on first use.
+
+        With `lease` the pool's lease count is raised under the same lock, so
+        it can't be evicted before the caller's session is open.
+        """
+        with self._lock:
+            pool = self._engines.get(schema_name)
+            if pool is not None:
+                self._engines.move_to_end(schema_name)
+                pool.leases += int(lease)
+                return pool
+
+        # First ensure tables exist (outside the lock, this may hit the database)
+        self.ensure_provisioned(schema_name)
+
+        with self._lock:
+            # Another request may have registered it in the meantime
+            pool = self._engines.get(schema_name)
+            if pool is None:
+                self._evict_idle(keep=self._max_engines() - 1)
+                engine = self._build_tenant_engine(schema_name)
+                pool = TenantPool(engine, sessionmaker(class_=TenantSession, autocommit=False, autoflush=False, bind=engine))
+                self._engines[schema_name] = pool
+            else:
+                self._engines.move_to_end(schema_name)
+            pool.leases += int(lease)
+            return pool
+
+    def _release(self, pool: TenantPool):
+        with self._lock:
+            pool.leases -= 1
+
+    def get_tenant_engine(self, schema_name: str):
+        """Get the long-lived pooled engine for a specific tenant schema.
+
+        The engine is not leased: it is only safe from eviction while one of
+        its connections is checked out. Prefer get_tenant_session.
+        """
+        return self._get_registered(schema_name).engine
+
     def get_tenant_session(self, schema_name: str):
         """Get session for specific tenant schema"""
-        engine = self.get_tenant_engine(schema_name)
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        return SessionLocal()
-    
-    def get_schema_name_by_tenant_id(self, db, tenant_id: str):
-        """Get schema name from tenant ID using public schema"""
+        if settings.TENANT_POOL_MODE == "shared":
+            return self.get_shared_tenant_session(schema_name)
+        pool = self._get_registered(schema_name, lease=True)
+        session = pool.session_factory()
+        # Released by close(), or when a session that was never closed is collected
+        session.info["tenant_lease"] = weakref.finalize(session, self._release, pool)
+        return session
+
+    def get_shared_tenant_session(self, schema_name: str):
+        """Get a session on the shard's shared pool scoped to a tenant schema"""
+        self.ensure_provisioned(schema_name)
+        engine = shard_registry.engine(self.shard_of(schema_name))
+        return SharedTenantSession(bind=engine, info={"tenant_schema": schema_name})
+
+    async def get_async_tenant_session(self, schema_name: str):
+        """Get an AsyncSession on the shared async pool scoped to a tenant schema"""
+        if schema_name not in self._provisioned_schemas:
+            await run_in_threadpool(self.ensure_provisioned, schema_name)
+        shard = self._schema_shards.get(schema_name) or await run_in_threadpool(self.shard_of, schema_name)
+        return AsyncTenantSession(bind=shard_registry.async_engine(shard), info={"tenant_schema": schema_name})
+
+    def dispose_tenant_engine(self, schema_name: str):
+        """Drop a tenant's pool from the registry and close its connections"""
+        with self._lock:
+            pool = self._engines.pop(schema_name, None)
+        if pool is not None:
+            pool.engine.dispose()
+
+    def dispose_all(self):
+        """Close every cached tenant pool (used on application shutdown)"""
+        with self._lock:
+            pools = list(self._engines.values())
+            self._engines.clear()
+        for pool in pools:
+            pool.engine.dispose()
+        shard_registry.dispose_all()
+
+    def _cached_resolution(self, tenant_id: int):
+        with self._lock:
+            cached = self._resolution_cache.get(tenant_id)
+            if cached is None:
+                return None
+            if cached[0] <= time.monotonic():
+                del self._resolution_cache[tenant_id]
+                return None
+            self._resolution_cache.move_to_end(tenant_id)
+            return cached[1]
+
+    def _store_resolution(self, tenant_id: str, tenant) -> TenantInfo:
+        if not tenant:
+            raise Exception(f"Tenant with ID {tenant_id} not found")
+        info = TenantInfo(tenant.id, tenant.schema_name, bool(tenant.is_active), tenant.status, tenant.shard)
+        self.set_shard(info.schema_name, info.shard)
+        if info.status == "ready":
+            # Provisioning finishes in another process; don't remember it as pending
+            expires_at = time.monotonic() + settings.TENANT_CACHE_TTL_SECONDS
+            with self._lock:
+                self._resolution_cache[tenant.id] = (expires_at, info)
+                self._resolution_cache.move_to_end(tenant.id)
+                while len(self._resolution_cache) > settings.TENANT_CACHE_MAX_SIZE:
+                    self._resolution_cache.popitem(last=False)
+        return info
+
+    def resolve_tenant(self, db, tenant_id: str) -> TenantInfo:
+        """Resolve a tenant ID to its schema, served from a TTL cache when possible"""
         from app.models.tenant import Tenant
-        
+
+        cached = self._cached_resolution(int(tenant_id))
+        if cached is not None:
+            return cached
+
         # Use the public schema session to query tenants table
         tenant = db.query(Tenant).filter(Tenant.id == int(tenant_id)).first()
-        if not tenant:
-            raise Exception(f"Tenant with ID {tenant_id} not found")
-        return tenant.schema_name
+        return self._store_resolution(tenant_id, tenant)
+
+    async def resolve_tenant_async(self, db, tenant_id: str) -> TenantInfo:
+        """Async variant of resolve_tenant for an AsyncSession on the public schema"""
+        from app.models.tenant import Tenant
+
+        cached = self._cached_resolution(int(tenant_id))
+        if cached is not None:
+            return cached
+
+        result = await db.execute(select(Tenant).where(Tenant.id == int(tenant_id)))
+        return self._store_resolution(tenant_id, result.scalar_one_or_none())
+
+    def invalidate_tenant(self, tenant_id: int, schema_name: str = None):
+        """Forget cached resolution (and provisioning state) after a tenant changes"""
+        with self._lock:
+            cached = self._resolution_cache.pop(int(tenant_id), None)
+        if schema_name is None and cached is not None:
+            schema_name = cached[1].schema_name
+        if schema_name is not None:
+            self._provisioned_schemas.discard(schema_name)
+
+    def get_schema_name_by_tenant_id(self, db, tenant_id: str):
+        """Get schema name from tenant ID using public schema"""
+        return self._active_schema(self.resolve_tenant(db, tenant_id))
+
+    async def get_schema_name_by_tenant_id_async(self, db, tenant_id: str):
+        return self._active_schema(await self.resolve_tenant_async(db, tenant_id))
+
+    def _active_schema(self, info: TenantInfo):
+        if info.status == "deleting":
+            raise Exception(f"Tenant with ID {info.id} has been deleted")
+        if not info.is_active:
+            raise Exception(f"Tenant with ID {info.id} is inactive")
+        if info.status != "ready":
+            raise TenantNotReady(f"Tenant with ID {info.id} is still being provisioned")
+        return info.schema_name
 
-tenant_manager = TenantManager()
\ No newline at end of file
+tenant_manager = TenantManager()
@@ -0,0 +1,157 @@
+"""Upgrade every tenant schema in parallel.
+
+    python -m app.db.tenant_migrations [--workers 8] [--revision head] [--schema tenant_a ...]
+
+1. Tenant schemas without their own alembic_version ("untracked") have so
+   far been migrated inline by the main run, so they are stamped at the
+   main run's current revision.
+2. The main run (`alembic upgrade`) migrates public.
+3. Every tenant schema that is not yet at the target is upgraded with
+   `alembic -x schema=<name> [-x shard=<shard>] upgrade`, on a pool of
+   worker processes. Schemas are found on whichever shard the catalog says.
+
+Each schema upgrades in its own transaction and records its revision in its
+own version table, so a failed schema is left where it was. Running the
+command again resumes: schemas already at the target are skipped.
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from app.db.migration_utils import MIGRATIONS_DIR, SCHEMA_VERSION_DDL, head_revision, stamp_statement, tenant_columns
+from app.db.session import engine
+from app.db.shards import DEFAULT_SHARD, shard_url
+
+def alembic_config(schema_name: str = None, shard: str = DEFAULT_SHARD) -> Config:
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    x = [f"schema={schema_name}"] if schema_name else []
+    if shard != DEFAULT_SHARD:
+        x.append(f"shard={shard}")
+    config.cmd_opts = argparse.Namespace(x=x)
+    return config
+
+def _version(conn, schema_name: str):
+    if conn.execute(text("SELECT to_regclass(:table)"), {"table": f"{schema_name}.alembic_version"}).scalar() is None:
+        return None
+    return conn.execute(text(f"SELECT version_num FROM {schema_name}.alembic_version")).scalar()
+
+def tenant_shards(conn) -> dict:
+    """Tenant schema -> shard, from the catalog (read before public is
+    upgraded, so it may be at any revision)"""
+    columns = tenant_columns(conn)
+    if not columns:
+        return {}
+    shard = "shard" if "shard" in columns else f"'{DEFAULT_SHARD}'"
+    where = "WHERE status != 'deleting'" if "status" in columns else ""
+    rows = conn.execute(text(f"SELECT schema_name, {shard} FROM tenants {where} ORDER BY id"))
+    return dict(rows.all())
+
+def schema_versions(conn, schemas) -> dict:
+    """Those of `schemas` present in this database -> revision in their own
+    version table (None: untracked)"""
+    existing = set(conn.execute(
+        text("SELECT nspname FROM pg_namespace WHERE nspname = ANY(:schemas)"), {"schemas": list(schemas)}
+    ).scalars())
+    return {schema_name: _version(conn, schema_name) for schema_name in schemas if schema_name in existing}
+
+def track_schemas(conn, schemas, revision: str):
+    """Give untracked schemas a version table at `revision`"""
+    for schema_name in schemas:
+        for statement in SCHEMA_VERSION_DDL + [stamp_statement(revision)]:
+            conn.execute(text(statement.format(schema=schema_name)))
+    conn.commit()
+
+def upgrade_schema(schema_name: str, shard: str, revision: str):
+    """Worker process: (schema, error or None, seconds)"""
+    started = time.perf_counter()
+    try:
+        command.upgrade(alembic_config(schema_name, shard), revision)
+    except Exception as e:
+        return schema_name, f"{type(e).__name__}: {e}".strip(), time.perf_counter() - started
+    return schema_name, None, time.perf_counter() - started
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def print_report(results, skipped: int, wall_seconds: float):
+    failed = [(schema_name, error) for schema_name, error, _ in results if error]
+    durations = [seconds for _, _, seconds in results]
+    print("\n---------------- tenant migration report ----------------")
+    print(f"upgraded: {len(results) - len(failed)}  failed: {len(failed)}  already current: {skipped}")
+    print(f"wall time: {wall_seconds:.1f}s", end="")
+    if durations:
+        print(
+            f"  schema time: {sum(durations):.1f}s total, p50 {_percentile(durations, 0.5):.2f}s, "
+            f"p95 {_percentile(durations, 0.95):.2f}s, max {max(durations):.2f}s"
+        )
+        slowest = sorted(results, key=lambda result: result[2], reverse=True)[:5]
+        print("slowest: " + ", ".join(f"{schema_name} {seconds:.2f}s" for schema_name, _, seconds in slowest))
+    else:
+        print()
+    for schema_name, error in failed:
+        print(f"FAILED {schema_name}: {error}")
+    if failed:
+        print("Re-run to resume; the failed schemas are still at their previous revision.")
+
+def run(workers: int, revision: str = "head", only=None, skip_main: bool = False) -> int:
+    """Upgrade public and the tenant schemas; returns the number of failures"""
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        main_revision = _version(conn, "public")
+        shards = tenant_shards(conn)
+    engine.dispose()
+
+    found = {}
+    for shard in dict.fromkeys(shards.values()):
+        shard_engine = create_engine(shard_url(shard), poolclass=NullPool)
+        with shard_engine.connect() as conn:
+            shard_versions = schema_versions(conn, [schema_name for schema_name in shards if shards[schema_name] == shard])
+            untracked = [schema_name for schema_name, version in shard_versions.items() if version is None]
+            if untracked and main_revision:
+                print(f"Tracking {len(untracked)} schema(s) on shard {shard} at {main_revision}")
+                track_schemas(conn, untracked, main_revision)
+                shard_versions.update(dict.fromkeys(untracked, main_revision))
+        found.update(shard_versions)
+    versions = {schema_name: found[schema_name] for schema_name in shards if schema_name in found}
+
+    if not skip_main:
+        print(f"Upgrading public to {revision}")
+        command.upgrade(alembic_config(), revision)
+
+    target = head_revision() if revision == "head" else revision
+    selected = [schema_name for schema_name in versions if not only or schema_name in only]
+    pending = [schema_name for schema_name in selected if versions[schema_name] != target]
+    skipped = len(selected) - len(pending)
+    print(f"{len(selected)} tenant schema(s): {len(pending)} to upgrade to {target} with {workers} worker(s)")
+
+    results = []
+    if pending:
+        width = len(str(len(pending)))
+        # spawn: workers must not share the parent's pooled connections
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(upgrade_schema, schema_name, shards[schema_name], revision) for schema_name in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                schema_name, error, seconds = future.result()
+                results.append((schema_name, error, seconds))
+                status = "ok" if error is None else f"FAILED {error.splitlines()[0]}"
+                elapsed = time.perf_counter() - started
+                print(f"[{done:>{width}}/{len(pending)}] {elapsed:7.1f}s  {schema_name}: {status} ({seconds:.2f}s)")
+
+    print_report(results, skipped, time.perf_counter() - started)
+    return sum(1 for _, error, _ in results if error)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upgrade every tenant schema in parallel")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent schema upgrades")
+    parser.add_argument("--revision", default="head")
+    parser.add_argument("--schema", action="append", dest="only", help="only these tenant schemas (repeatable)")
+    parser.add_argument("--skip-main", action="store_true", help="don't upgrade the public schema first")
+    args = parser.parse_args()
+    sys.exit(1 if run(args.workers, args.revision, args.only, args.skip_main) else 0)
@@ -0,0 +1,294 @@
+"""Move a tenant's schema to another shard while it keeps serving requests.
+
+    python -m app.db.tenant_move <tenant_id> <shard> [--drop-source]
+
+1. The schema is built on the target from the template, with its user
+   triggers disabled so copied rows are not counted twice by the summary,
+   version and history triggers.
+2. A capture trigger on every source table with an id records the ids
+   written from then on in {schema}._tenant_move_changes.
+3. Every table is copied (COPY) from one consistent snapshot while the
+   tenant keeps taking writes.
+4. Catch-up rounds bring the captured rows over (upsert, or delete where the
+   row is gone) until at most --threshold are left.
+5. Cutover: the source tables are locked against writes (reads go on), the
+   last captured rows, the summary tables and the sequences are copied, the
+   target triggers are enabled and the source capture trigger is replaced by
+   one that rejects writes. Then Tenant.shard is switched in the catalog.
+
+Writes wait only during step 5. Other API processes pick up the new shard
+when their resolution cache expires (TENANT_CACHE_TTL_SECONDS); until then
+their writes to the old schema fail instead of being lost. --drop-source
+waits that long and drops the old schema.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.migration_utils import head_revision
+from app.db.shards import shard_registry
+from app.db.template import crm_tables
+from app.db.tenant import tenant_manager
+from app.models.tenant import Tenant
+
+CHANGES_TABLE = "_tenant_move_changes"
+CAPTURE = "_tenant_move_capture"
+# COPY data kept in memory per table before spilling to a temporary file
+SPOOL_BYTES = 64 * 1024 * 1024
+CUTOVER_LOCK_TIMEOUT_MS = 5000
+CUTOVER_ATTEMPTS = 5
+
+class TenantMoveError(Exception):
+    pass
+
+def _columns(table) -> list:
+    # Generated search columns are recomputed by the target
+    return [column.name for column in table.columns if column.computed is None]
+
+def _id_tables() -> list:
+    """Tables tracked row by row, parents before children"""
+    return [table for table in crm_tables() if "id" in table.c]
+
+def _copy_out(conn, query: str, spool):
+    with conn.connection.driver_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY ({query}) TO STDOUT", spool)
+    spool.seek(0)
+
+def _copy_in(conn, table_name: str, columns, spool):
+    with conn.connection.driver_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table_name} ({', '.join(columns)}) FROM STDIN", spool)
+
+def _copy_table(src, dst, schema_name: str, table, where: str = "", into: str = None) -> None:
+    columns = _columns(table)
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as spool:
+        _copy_out(src, f"SELECT {', '.join(columns)} FROM {schema_name}.{table.name} {where}", spool)
+        _copy_in(dst, into or f"{schema_name}.{table.name}", columns, spool)
+
+def _schema_revision(conn, schema_name: str):
+    version_table = f"{schema_name}.alembic_version"
+    if conn.execute(text("SELECT to_regclass(:table)"), {"table": version_table}).scalar() is None:
+        return None
+    return conn.execute(text(f"SELECT version_num FROM {version_table}")).scalar()
+
+# ---------------------- CHANGE CAPTURE (source) ----------------------
+
+def _capture_function(schema_name: str, body: str) -> str:
+    return (
+        f"CREATE OR REPLACE FUNCTION {schema_name}.{CAPTURE}() RETURNS trigger LANGUAGE plpgsql "
+        f"AS $fn$ BEGIN {body} END $fn$"
+    )
+
+def install_capture(conn, schema_name: str):
+    conn.execute(text(
+        f"CREATE TABLE {schema_name}.{CHANGES_TABLE} ("
+        f"seq bigserial PRIMARY KEY, table_name text NOT NULL, row_id bigint NOT NULL)"
+    ))
+    conn.execute(text(_capture_function(schema_name, f"""
+        INSERT INTO {schema_name}.{CHANGES_TABLE} (table_name, row_id)
+        VALUES (TG_TABLE_NAME, CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END);
+        RETURN NULL;""")))
+    for table in _id_tables():
+        conn.execute(text(
+            f"CREATE TRIGGER {CAPTURE} AFTER INSERT OR UPDATE OR DELETE ON {schema_name}.{table.name} "
+            f"FOR EACH ROW EXECUTE PROCEDURE {schema_name}.{CAPTURE}()"
+        ))
+
+def freeze_source(conn, schema_name: str, target_shard: str):
+    """From now on every write to the source schema fails"""
+    conn.execute(text(_capture_function(schema_name, f"""
+        RAISE EXCEPTION 'tenant schema {schema_name} has moved to shard {target_shard}'
+            USING ERRCODE = 'read_only_sql_transaction';""")))
+
+def remove_capture(conn, schema_name: str):
+    for table in _id_tables():
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {CAPTURE} ON {schema_name}.{table.name}"))
+    conn.execute(text(f"DROP FUNCTION IF EXISTS {schema_name}.{CAPTURE}()"))
+    conn.execute(text(f"DROP TABLE IF EXISTS {schema_name}.{CHANGES_TABLE}"))
+
+# ---------------------- COPY ----------------------
+
+def _set_user_triggers(conn, schema_name: str, enabled: bool):
+    action = "ENABLE" if enabled else "DISABLE"
+    for table in crm_tables():
+        conn.execute(text(f"ALTER TABLE {schema_name}.{table.name} {action} TRIGGER USER"))
+
+def copy_snapshot(source, target, schema_name: str):
+    """Copy every table as of one snapshot of the source"""
+    tables = crm_tables()
+    with source.connect().execution_options(isolation_level="REPEATABLE READ") as src, target.connect() as dst:
+        with src.begin(), dst.begin():
+            # The template may have seeded rows (e.g. table_versions)
+            dst.execute(text("TRUNCATE " + ", ".join(f"{schema_name}.{table.name}" for table in tables)))
+            for table in tables:
+                started = time.perf_counter()
+                _copy_table(src, dst, schema_name, table)
+                print(f"  copied {table.name} ({time.perf_counter() - started:.1f}s)")
+
+def sync_changes(src, dst, schema_name: str) -> int:
+    """Apply the captured changes visible to `src` to the target; returns the
+    number of rows synced. The captured entries are consumed in `src`'s
+    transaction, so they survive if this round does not commit."""
+    changed = {}
+    for table_name, row_id in src.execute(text(f"DELETE FROM {schema_name}.{CHANGES_TABLE} RETURNING table_name, row_id")):
+        changed.setdefault(table_name, set()).add(row_id)
+    tables = [table for table in _id_tables() if changed.get(table.name)]
+    for table in tables:
+        ids = ", ".join(str(row_id) for row_id in sorted(changed[table.name]))
+        stage = f"_move_stage_{table.name}"
+        dst.execute(text(f"CREATE TEMP TABLE {stage} (LIKE {schema_name}.{table.name}) ON COMMIT DROP"))
+        _copy_table(src, dst, schema_name, table, where=f"WHERE id IN ({ids})", into=stage)
+        columns = _columns(table)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column != "id")
+        dst.execute(text(
+            f"INSERT INTO {schema_name}.{table.name} ({', '.join(columns)}) "
+            f"SELECT {', '.join(columns)} FROM {stage} ON CONFLICT (id) DO UPDATE SET {updates}"
+        ))
+    # Children first, so foreign keys hold
+    for table in reversed(tables):
+        ids = ", ".join(str(row_id) for row_id in sorted(changed[table.name]))
+        dst.execute(text(
+            f"DELETE FROM {schema_name}.{table.name} "
+            f"WHERE id IN ({ids}) AND id NOT IN (SELECT id FROM _move_stage_{table.name})"
+        ))
+    return sum(len(ids) for ids in changed.values())
+
+def catch_up(source, target, schema_name: str) -> int:
+    """One catch-up round from a consistent source snapshot"""
+    with source.connect().execution_options(isolation_level="REPEATABLE READ") as src, target.connect() as dst:
+        with src.begin():
+            with dst.begin():
+                # Off already, unless a failed cutover got as far as enabling them
+                _set_user_triggers(dst, schema_name, enabled=False)
+                return sync_changes(src, dst, schema_name)
+
+def cutover(source, target, schema_name: str, target_shard: str) -> int:
+    """Final sync with source writes blocked; leaves the source frozen"""
+    tables = crm_tables()
+    with source.connect() as src, target.connect() as dst:
+        with src.begin():
+            src.execute(text(f"SET LOCAL lock_timeout = {CUTOVER_LOCK_TIMEOUT_MS}"))
+            # EXCLUSIVE blocks writers but not readers
+            src.execute(text("LOCK TABLE " + ", ".join(f"{schema_name}.{table.name}" for table in tables) + " IN EXCLUSIVE MODE"))
+            with dst.begin():
+                _set_user_triggers(dst, schema_name, enabled=False)
+                synced = sync_changes(src, dst, schema_name)
+                # Trigger-maintained tables are small; copy them whole
+                for table in tables:
+                    if "id" not in table.c:
+                        dst.execute(text(f"DELETE FROM {schema_name}.{table.name}"))
+                        _copy_table(src, dst, schema_name, table)
+                for table in _id_tables():
+                    dst.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{schema_name}.{table.name}', 'id'), "
+                        f"coalesce(max(id), 0) + 1, false) FROM {schema_name}.{table.name}"
+                    ))
+                _set_user_triggers(dst, schema_name, enabled=True)
+            freeze_source(src, schema_name, target_shard)
+    return synced
+
+# ---------------------- MOVE ----------------------
+
+def _move(tenant_id: int, schema_name: str, source_shard: str, target_shard: str, threshold: int, max_rounds: int):
+    source, target = shard_registry.engine(source_shard), shard_registry.engine(target_shard)
+    with source.connect() as conn:
+        revision = _schema_revision(conn, schema_name) or _schema_revision(conn, "public")
+    if revision != head_revision():
+        raise TenantMoveError(f"{schema_name} is at {revision}, not {head_revision()}; run app.db.tenant_migrations first")
+    with target.connect() as conn:
+        if conn.execute(text("SELECT 1 FROM pg_namespace WHERE nspname = :schema"), {"schema": schema_name}).scalar():
+            raise TenantMoveError(f"Schema {schema_name} already exists on shard {target_shard}; drop it first")
+
+    print(f"Moving {schema_name} from shard {source_shard} to {target_shard}")
+    tenant_manager.create_tenant_schema(schema_name, target_shard)
+    try:
+        with target.begin() as conn:
+            _set_user_triggers(conn, schema_name, enabled=False)
+        with source.begin() as conn:
+            remove_capture(conn, schema_name)  # left over by an interrupted move
+            install_capture(conn, schema_name)
+        copy_snapshot(source, target, schema_name)
+        for round_number in range(1, max_rounds + 1):
+            synced = catch_up(source, target, schema_name)
+            print(f"  catch-up round {round_number}: {synced} row(s)")
+            if synced <= threshold:
+                break
+        for attempt in range(1, CUTOVER_ATTEMPTS + 1):
+            try:
+                cutover_started = time.perf_counter()
+                synced = cutover(source, target, schema_name, target_shard)
+                break
+            except Exception as e:
+                if attempt == CUTOVER_ATTEMPTS:
+                    raise
+                print(f"  cutover attempt {attempt} failed, retrying: {e}")
+                catch_up(source, target, schema_name)
+        print(f"  cutover: {synced} row(s), writes blocked {time.perf_counter() - cutover_started:.2f}s")
+
+        db = SessionLocal()
+        try:
+            switched = db.query(Tenant).filter(
+                Tenant.id == tenant_id, Tenant.shard == source_shard, Tenant.status == "ready"
+            ).update({"shard": target_shard}, synchronize_session=False)
+            if switched != 1:
+                raise TenantMoveError(f"Tenant {tenant_id} changed during the move")
+            db.commit()
+        finally:
+            db.close()
+    except Exception:
+        print(f"❌ Move of {schema_name} failed; shard {source_shard} stays authoritative, removing the copy")
+        with source.begin() as conn:
+            remove_capture(conn, schema_name)
+        tenant_manager.drop_tenant_schema(schema_name, shard=target_shard)
+        raise
+
+def move_tenant(tenant_id: int, target_shard: str, threshold: int = 1000, max_rounds: int = 10, drop_source: bool = False):
+    db = SessionLocal()
+    try:
+        tenant = db.get(Tenant, tenant_id)
+        if tenant is None or tenant.status != "ready":
+            raise TenantMoveError(f"Tenant {tenant_id} not found or not ready")
+        schema_name, source_shard = tenant.schema_name, tenant.shard
+    finally:
+        db.close()
+    if source_shard == target_shard:
+        raise TenantMoveError(f"Tenant {tenant_id} is already on shard {target_shard}")
+    source = shard_registry.engine(source_shard)
+
+    started = time.perf_counter()
+    lock_key = {"key": f"tenant_move:{schema_name}"}
+    with source.connect() as guard:
+        # Held for the whole move: one mover per tenant
+        if not guard.execute(text("SELECT pg_try_advisory_lock(hashtext(:key))"), lock_key).scalar():
+            raise TenantMoveError(f"{schema_name} is already being moved")
+        guard.commit()
+        try:
+            _move(tenant_id, schema_name, source_shard, target_shard, threshold, max_rounds)
+        finally:
+            guard.execute(text("SELECT pg_advisory_unlock(hashtext(:key))"), lock_key)
+            guard.commit()
+
+    tenant_manager.invalidate_tenant(tenant_id, schema_name)
+    print(f"✅ Moved {schema_name} to shard {target_shard} in {time.perf_counter() - started:.1f}s")
+    if drop_source:
+        print(f"Waiting {settings.TENANT_CACHE_TTL_SECONDS}s for API processes to re-resolve the tenant")
+        time.sleep(settings.TENANT_CACHE_TTL_SECONDS + 1)
+        tenant_manager.drop_tenant_schema(schema_name, settings.TENANT_REAPER_TABLE_PAUSE_SECONDS, shard=source_shard)
+    else:
+        print(f"The frozen copy stays on shard {source_shard}; drop schema {schema_name} there when done")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move a tenant schema to another shard")
+    parser.add_argument("tenant_id", type=int)
+    parser.add_argument("shard", help="target shard (see TENANT_SHARDS)")
+    parser.add_argument("--threshold", type=int, default=1000, help="rows left to sync that allow the cutover")
+    parser.add_argument("--max-rounds", type=int, default=10, help="catch-up rounds before cutting over anyway")
+    parser.add_argument("--drop-source", action="store_true", help="drop the old schema once no process routes to it")
+    args = parser.parse_args()
+    try:
+        move_tenant(args.tenant_id, args.shard, args.threshold, args.max_rounds, args.drop_source)
+    except TenantMoveError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -1,7 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
-from app.core.config import settings
+from app.core.security import password_hasher
+from app.db.session import async_engine
+from app.db.shards import shard_registry
+from app.db.tenant import tenant_manager
+from app.services.provisioning import provisioning_service
+from app.services.teardown import teardown_service
+from app.services.fanout import tenant_fanout_service
 
 app = FastAPI(title="Multi-tenant CRM API", version="1.0.0")
 
@@ -16,6 +22,25 @@ app.add_middleware(
 
 app.include_router(api_router, prefix="/api/v1")
 
+@app.on_event("startup")
+def start_background_jobs():
+    provisioning_service.resume()
+    teardown_service.start()
+
+@app.on_event("shutdown")
+def shutdown_pools():
+    teardown_service.stop()
+    provisioning_service.shutdown()
+    tenant_fanout_service.shutdown()
+    tenant_manager.dispose_all()
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_async_pool():
+    if async_engine is not None:
+        await async_engine.dispose()
+        await shard_registry.dispose_all_async()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Multi-tenant CRM API"}
\ No newline at end of file
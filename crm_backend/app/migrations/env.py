@@ -1,6 +1,6 @@
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config
-from sqlalchemy import pool
+from sqlalchemy import pool, text
 from alembic import context
 from app.core.config import settings
 from app.db.base import Base
@@ -13,6 +13,16 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# -x schema=<tenant schema>: migrate just that schema, with its own
+# alembic_version table (see app/db/migration_utils.py); -x shard=<name> when
+# it lives outside the main database (app/db/shards.py)
+x_arguments = context.get_x_argument(as_dictionary=True)
+schema_name = x_arguments.get("schema")
+if x_arguments.get("shard"):
+    from app.db.shards import shard_url
+
+    config.set_main_option("sqlalchemy.url", shard_url(x_arguments["shard"]))
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
@@ -20,6 +30,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        version_table_schema=schema_name,
+        crm_schema=schema_name,
     )
 
     with context.begin_transaction():
@@ -34,10 +46,17 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            version_table_schema=schema_name,
+            crm_schema=schema_name,
         )
 
         with context.begin_transaction():
+            if schema_name:
+                # One runner per schema at a time; unqualified DDL lands in it
+                connection.execute(text("SELECT pg_advisory_xact_lock(hashtext(:schema))"), {"schema": schema_name})
+                connection.execute(text(f"SET LOCAL search_path TO {schema_name}"))
             context.run_migrations()
 
 if context.is_offline_mode():
@@ -0,0 +1,137 @@
+"""Trigger-maintained dashboard summary tables
+
+Revision ID: 3c6a9f0e5d12
+Revises: 8e2d47a1c3b9
+Create Date: 2026-10-18 13:05:41.208114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import execute_in_crm_schemas
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c6a9f0e5d12'
+down_revision: Union[str, None] = '8e2d47a1c3b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The DDL as of this revision, kept here rather than imported from
+# app.db.summary: the live definitions move on with later revisions.
+
+_WEIGHTED = "coalesce(amount, 0) * coalesce(probability, 0) / 100"
+
+def _delta(source: str, sign: str) -> dict:
+    return {
+        "lead_status": f"""
+            INSERT INTO lead_status_counts AS s (status, lead_count)
+            SELECT coalesce(status, ''), {sign}count(*) FROM {source} GROUP BY 1
+            ON CONFLICT (status) DO UPDATE SET lead_count = s.lead_count + EXCLUDED.lead_count;""",
+        "stage": f"""
+            INSERT INTO opportunity_stage_totals AS s (stage, opportunity_count, amount_total, weighted_total)
+            SELECT coalesce(stage, ''), {sign}count(*), {sign}coalesce(sum(amount), 0), {sign}coalesce(sum({_WEIGHTED}), 0)
+            FROM {source} GROUP BY 1
+            ON CONFLICT (stage) DO UPDATE SET
+                opportunity_count = s.opportunity_count + EXCLUDED.opportunity_count,
+                amount_total = s.amount_total + EXCLUDED.amount_total,
+                weighted_total = s.weighted_total + EXCLUDED.weighted_total;""",
+        "monthly": f"""
+            INSERT INTO opportunity_monthly_closes AS s (month, stage, opportunity_count, amount_total, weighted_total)
+            SELECT date_trunc('month', close_date)::date, coalesce(stage, ''), {sign}count(*),
+                   {sign}coalesce(sum(amount), 0), {sign}coalesce(sum({_WEIGHTED}), 0)
+            FROM {source} WHERE close_date IS NOT NULL GROUP BY 1, 2
+            ON CONFLICT (month, stage) DO UPDATE SET
+                opportunity_count = s.opportunity_count + EXCLUDED.opportunity_count,
+                amount_total = s.amount_total + EXCLUDED.amount_total,
+                weighted_total = s.weighted_total + EXCLUDED.weighted_total;""",
+    }
+
+_ADD, _SUB = _delta("new_rows", ""), _delta("old_rows", "-")
+
+def _trigger_function(name: str, add: str, subtract: str) -> str:
+    body = f"""
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN {add}
+        END IF;
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN {subtract}
+        END IF;
+        RETURN NULL;"""
+    return (
+        f"CREATE OR REPLACE FUNCTION {{schema}}.{name}() RETURNS trigger LANGUAGE plpgsql "
+        f"SET search_path = {{schema}} AS $fn$ BEGIN {body.replace('{', '{{').replace('}', '}}')} END $fn$"
+    )
+
+def _statement_triggers(table: str, function: str) -> list:
+    return [
+        f"DROP TRIGGER IF EXISTS {table}_summary_insert ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_summary_insert AFTER INSERT ON {{schema}}.{table} "
+        f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.{function}()",
+        f"DROP TRIGGER IF EXISTS {table}_summary_update ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_summary_update AFTER UPDATE ON {{schema}}.{table} "
+        f"REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.{function}()",
+        f"DROP TRIGGER IF EXISTS {table}_summary_delete ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_summary_delete AFTER DELETE ON {{schema}}.{table} "
+        f"REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.{function}()",
+    ]
+
+SUMMARY_TABLES_DDL = [
+    """CREATE TABLE IF NOT EXISTS {schema}.lead_status_counts (
+        status varchar(50) PRIMARY KEY,
+        lead_count integer NOT NULL DEFAULT 0)""",
+    """CREATE TABLE IF NOT EXISTS {schema}.opportunity_stage_totals (
+        stage varchar(50) PRIMARY KEY,
+        opportunity_count integer NOT NULL DEFAULT 0,
+        amount_total numeric(18, 2) NOT NULL DEFAULT 0,
+        weighted_total numeric(18, 2) NOT NULL DEFAULT 0)""",
+    """CREATE TABLE IF NOT EXISTS {schema}.opportunity_monthly_closes (
+        month date NOT NULL,
+        stage varchar(50) NOT NULL,
+        opportunity_count integer NOT NULL DEFAULT 0,
+        amount_total numeric(18, 2) NOT NULL DEFAULT 0,
+        weighted_total numeric(18, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (month, stage))""",
+]
+
+SUMMARY_TRIGGERS_DDL = [
+    _trigger_function("crm_leads_summary", _ADD["lead_status"], _SUB["lead_status"]),
+    _trigger_function(
+        "crm_opportunities_summary",
+        _ADD["stage"] + _ADD["monthly"],
+        _SUB["stage"] + _SUB["monthly"],
+    ),
+    *_statement_triggers("leads", "crm_leads_summary"),
+    *_statement_triggers("opportunities", "crm_opportunities_summary"),
+]
+
+SUMMARY_REBUILD = [
+    "LOCK TABLE {schema}.leads, {schema}.opportunities IN SHARE MODE",
+    "DELETE FROM {schema}.lead_status_counts",
+    """INSERT INTO {schema}.lead_status_counts (status, lead_count)
+       SELECT coalesce(status, ''), count(*) FROM {schema}.leads GROUP BY 1""",
+    "DELETE FROM {schema}.opportunity_stage_totals",
+    f"""INSERT INTO {{schema}}.opportunity_stage_totals (stage, opportunity_count, amount_total, weighted_total)
+       SELECT coalesce(stage, ''), count(*), coalesce(sum(amount), 0), coalesce(sum({_WEIGHTED}), 0)
+       FROM {{schema}}.opportunities GROUP BY 1""",
+    "DELETE FROM {schema}.opportunity_monthly_closes",
+    f"""INSERT INTO {{schema}}.opportunity_monthly_closes (month, stage, opportunity_count, amount_total, weighted_total)
+       SELECT date_trunc('month', close_date)::date, coalesce(stage, ''), count(*),
+              coalesce(sum(amount), 0), coalesce(sum({_WEIGHTED}), 0)
+       FROM {{schema}}.opportunities WHERE close_date IS NOT NULL GROUP BY 1, 2""",
+]
+
+
+def upgrade() -> None:
+    # Create, wire up and backfill the aggregates from existing rows
+    execute_in_crm_schemas(op, SUMMARY_TABLES_DDL + SUMMARY_TRIGGERS_DDL + SUMMARY_REBUILD)
+
+
+def downgrade() -> None:
+    statements = []
+    for table, function in (('leads', 'crm_leads_summary'), ('opportunities', 'crm_opportunities_summary')):
+        for event in ('insert', 'update', 'delete'):
+            statements.append(f'DROP TRIGGER IF EXISTS {table}_summary_{event} ON {{schema}}.{table}')
+        statements.append(f'DROP FUNCTION IF EXISTS {{schema}}.{function}()')
+    for table in ('lead_status_counts', 'opportunity_stage_totals', 'opportunity_monthly_closes'):
+        statements.append(f'DROP TABLE IF EXISTS {{schema}}.{table}')
+    execute_in_crm_schemas(op, statements)
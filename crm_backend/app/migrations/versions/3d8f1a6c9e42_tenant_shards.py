@@ -0,0 +1,34 @@
+"""Tenant shard column
+
+Revision ID: 3d8f1a6c9e42
+Revises: e7c3a9b15d20
+Create Date: 2026-10-18 21:12:40.518336
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import migration_schema
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d8f1a6c9e42'
+down_revision: Union[str, None] = 'e7c3a9b15d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if migration_schema(op):
+        return  # public schema only
+    # Every existing schema lives in the main database
+    op.add_column('tenants', sa.Column('shard', sa.String(length=50), server_default='default', nullable=False))
+    op.create_index(op.f('ix_tenants_shard'), 'tenants', ['shard'], unique=False)
+
+
+def downgrade() -> None:
+    if migration_schema(op):
+        return
+    op.drop_index(op.f('ix_tenants_shard'), table_name='tenants')
+    op.drop_column('tenants', 'shard')
@@ -0,0 +1,51 @@
+"""CRM list pagination, filter and sort indexes in every tenant schema
+
+Revision ID: 5b1f0c2d9a71
+Revises: c4e8d4bd3e70
+Create Date: 2026-10-18 09:12:40.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import create_indexes_concurrently, drop_indexes_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1f0c2d9a71'
+down_revision: Union[str, None] = 'c4e8d4bd3e70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) -- mirrors __table_args__ in app/models/crm.py
+INDEXES = [
+    ('ix_contacts_created_at_id', 'contacts', 'created_at, id'),
+    ('ix_contacts_updated_at_id', 'contacts', 'coalesce(updated_at, created_at), id'),
+    ('ix_contacts_last_name_id', 'contacts', 'last_name, id'),
+    ('ix_contacts_company_id', 'contacts', 'company, id'),
+    ('ix_leads_created_at_id', 'leads', 'created_at, id'),
+    ('ix_leads_updated_at_id', 'leads', 'coalesce(updated_at, created_at), id'),
+    ('ix_leads_status_id', 'leads', 'status, id'),
+    ('ix_leads_source_id', 'leads', 'source, id'),
+    ('ix_leads_contact_id_id', 'leads', 'contact_id, id'),
+    ('ix_opportunities_created_at_id', 'opportunities', 'created_at, id'),
+    ('ix_opportunities_updated_at_id', 'opportunities', 'coalesce(updated_at, created_at), id'),
+    ('ix_opportunities_stage_id', 'opportunities', 'stage, id'),
+    ('ix_opportunities_contact_id_id', 'opportunities', 'contact_id, id'),
+    ('ix_opportunities_lead_id_id', 'opportunities', 'lead_id, id'),
+    ('ix_opportunities_close_date_id', 'opportunities', 'close_date, id'),
+    ('ix_opportunities_amount_id', 'opportunities', 'amount, id'),
+]
+
+
+def upgrade() -> None:
+    # Built CONCURRENTLY, outside the migration transaction, so tenants keep
+    # writing meanwhile. IF NOT EXISTS: schemas provisioned after the models
+    # gained these indexes already have them from create_all
+    create_indexes_concurrently(op, INDEXES)
+
+
+def downgrade() -> None:
+    drop_indexes_concurrently(op, [name for name, _, _ in INDEXES])
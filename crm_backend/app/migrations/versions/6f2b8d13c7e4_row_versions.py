@@ -0,0 +1,36 @@
+"""Row version column for optimistic concurrency on CRM tables
+
+Revision ID: 6f2b8d13c7e4
+Revises: d41b7c9e2a58
+Create Date: 2026-10-18 16:02:11.504217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import execute_in_crm_schemas
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f2b8d13c7e4'
+down_revision: Union[str, None] = 'd41b7c9e2a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_ROWS = ("contacts", "leads", "opportunities")
+
+
+def upgrade() -> None:
+    # A constant default is a catalog-only change, no table rewrite
+    execute_in_crm_schemas(op, [
+        f'ALTER TABLE {{schema}}.{table} ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1'
+        for table in VERSIONED_ROWS
+    ])
+
+
+def downgrade() -> None:
+    execute_in_crm_schemas(op, [
+        f'ALTER TABLE {{schema}}.{table} DROP COLUMN IF EXISTS version'
+        for table in VERSIONED_ROWS
+    ])
@@ -0,0 +1,57 @@
+"""Generated full-text / trigram search columns on CRM tables
+
+Revision ID: 8e2d47a1c3b9
+Revises: 5b1f0c2d9a71
+Create Date: 2026-10-18 11:40:02.512877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import execute_in_crm_schemas
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2d47a1c3b9'
+down_revision: Union[str, None] = '5b1f0c2d9a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table -> (search_text expression, search_vector expression), as in app/models/crm.py
+SEARCH_COLUMNS = {
+    'contacts': (
+        "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(company, ''))",
+        "to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(company, ''))",
+    ),
+    'leads': (
+        "lower(coalesce(title, ''))",
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+    ),
+    'opportunities': (
+        "lower(coalesce(name, ''))",
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+    ),
+}
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public')
+    statements = []
+    for table, (search_text, search_vector) in SEARCH_COLUMNS.items():
+        statements += [
+            f'ALTER TABLE {{schema}}.{table} '
+            f'ADD COLUMN IF NOT EXISTS search_text text GENERATED ALWAYS AS ({search_text}) STORED, '
+            f'ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({search_vector}) STORED',
+            f'CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {{schema}}.{table} USING gin (search_vector)',
+            f'CREATE INDEX IF NOT EXISTS ix_{table}_search_text_trgm ON {{schema}}.{table} USING gin (search_text public.gin_trgm_ops)',
+        ]
+    execute_in_crm_schemas(op, statements)
+
+
+def downgrade() -> None:
+    execute_in_crm_schemas(op, [
+        f'ALTER TABLE {{schema}}.{table} DROP COLUMN IF EXISTS search_text, DROP COLUMN IF EXISTS search_vector'
+        for table in SEARCH_COLUMNS
+    ])
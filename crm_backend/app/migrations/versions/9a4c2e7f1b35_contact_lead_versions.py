@@ -0,0 +1,41 @@
+"""Write counters on contacts and leads for the response cache
+
+Revision ID: 9a4c2e7f1b35
+Revises: 6f2b8d13c7e4
+Create Date: 2026-10-18 16:48:30.117602
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import execute_in_crm_schemas
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c2e7f1b35'
+down_revision: Union[str, None] = '6f2b8d13c7e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen as of this revision; crm_bump_table_version() exists since a7d3e1f48b26
+NEW_VERSIONED_TABLES = ("contacts", "leads")
+
+
+def upgrade() -> None:
+    execute_in_crm_schemas(op, [
+        statement
+        for table in NEW_VERSIONED_TABLES
+        for statement in (
+            f'DROP TRIGGER IF EXISTS {table}_version ON {{schema}}.{table}',
+            f'CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {{schema}}.{table} '
+            f'FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.crm_bump_table_version()',
+        )
+    ])
+
+
+def downgrade() -> None:
+    execute_in_crm_schemas(op, [
+        f'DROP TRIGGER IF EXISTS {table}_version ON {{schema}}.{table}'
+        for table in NEW_VERSIONED_TABLES
+    ])
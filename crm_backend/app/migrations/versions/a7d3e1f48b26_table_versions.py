@@ -0,0 +1,58 @@
+"""Per-table write counters for cache validation
+
+Revision ID: a7d3e1f48b26
+Revises: 3c6a9f0e5d12
+Create Date: 2026-10-18 14:22:09.631540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import execute_in_crm_schemas
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e1f48b26'
+down_revision: Union[str, None] = '3c6a9f0e5d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen as of this revision (9a4c2e7f1b35 adds contacts and leads)
+VERSIONED_TABLES = ("opportunities",)
+
+VERSION_TABLE_DDL = [
+    """CREATE TABLE IF NOT EXISTS {schema}.table_versions (
+        table_name varchar(63) PRIMARY KEY,
+        version bigint NOT NULL DEFAULT 0)""",
+]
+
+VERSION_FUNCTION_DDL = """CREATE OR REPLACE FUNCTION {schema}.crm_bump_table_version() RETURNS trigger LANGUAGE plpgsql
+       SET search_path = {schema} AS $fn$ BEGIN
+           INSERT INTO table_versions AS v (table_name, version) VALUES (TG_TABLE_NAME, 1)
+           ON CONFLICT (table_name) DO UPDATE SET version = v.version + 1;
+           RETURN NULL;
+       END $fn$"""
+
+VERSION_TRIGGERS_DDL = [VERSION_FUNCTION_DDL] + [
+    statement
+    for table in VERSIONED_TABLES
+    for statement in (
+        f"DROP TRIGGER IF EXISTS {table}_version ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {{schema}}.{table} "
+        f"FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.crm_bump_table_version()",
+    )
+]
+
+
+def upgrade() -> None:
+    execute_in_crm_schemas(op, VERSION_TABLE_DDL + VERSION_TRIGGERS_DDL)
+
+
+def downgrade() -> None:
+    statements = [f'DROP TRIGGER IF EXISTS {table}_version ON {{schema}}.{table}' for table in VERSIONED_TABLES]
+    statements += [
+        'DROP FUNCTION IF EXISTS {schema}.crm_bump_table_version()',
+        'DROP TABLE IF EXISTS {schema}.table_versions',
+    ]
+    execute_in_crm_schemas(op, statements)
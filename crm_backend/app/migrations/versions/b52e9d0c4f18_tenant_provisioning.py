@@ -0,0 +1,49 @@
+"""Tenant provisioning status and background job table
+
+Revision ID: b52e9d0c4f18
+Revises: 9a4c2e7f1b35
+Create Date: 2026-10-18 17:31:52.860413
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import migration_schema
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e9d0c4f18'
+down_revision: Union[str, None] = '9a4c2e7f1b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if migration_schema(op):
+        return  # public schema only
+    # Existing tenants already have their schemas
+    op.add_column('tenants', sa.Column('status', sa.String(length=20), server_default='ready', nullable=False))
+    op.create_table('tenant_provisioning_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=True),
+    sa.Column('tenant_name', sa.String(length=100), nullable=False),
+    sa.Column('schema_name', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tenant_provisioning_jobs_id'), 'tenant_provisioning_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_tenant_provisioning_jobs_tenant_id'), 'tenant_provisioning_jobs', ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    if migration_schema(op):
+        return
+    op.drop_index(op.f('ix_tenant_provisioning_jobs_tenant_id'), table_name='tenant_provisioning_jobs')
+    op.drop_index(op.f('ix_tenant_provisioning_jobs_id'), table_name='tenant_provisioning_jobs')
+    op.drop_table('tenant_provisioning_jobs')
+    op.drop_column('tenants', 'status')
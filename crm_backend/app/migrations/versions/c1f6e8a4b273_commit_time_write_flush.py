@@ -0,0 +1,175 @@
+"""Apply summary deltas and table version bumps at commit, in a fixed order
+
+Revision ID: c1f6e8a4b273
+Revises: 3d8f1a6c9e42
+Create Date: 2026-10-18 23:05:17.402981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import execute_in_crm_schemas
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1f6e8a4b273'
+down_revision: Union[str, None] = '3d8f1a6c9e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The DDL as of this revision (see app/db/summary.py for the live copy).
+# The triggers stay; only the functions they call are replaced.
+
+_WEIGHTED = "coalesce(amount, 0) * coalesce(probability, 0) / 100"
+
+_LEAD_STATUS_UPSERT = """
+    INSERT INTO lead_status_counts AS s (status, lead_count)
+    SELECT coalesce(status, ''), {sign}count(*) FROM {source} GROUP BY 1
+    ON CONFLICT (status) DO UPDATE SET lead_count = s.lead_count + EXCLUDED.lead_count;"""
+_STAGE_UPSERT = f"""
+    INSERT INTO opportunity_stage_totals AS s (stage, opportunity_count, amount_total, weighted_total)
+    SELECT coalesce(stage, ''), {{sign}}count(*), {{sign}}coalesce(sum(amount), 0), {{sign}}coalesce(sum({_WEIGHTED}), 0)
+    FROM {{source}} GROUP BY 1
+    ON CONFLICT (stage) DO UPDATE SET
+        opportunity_count = s.opportunity_count + EXCLUDED.opportunity_count,
+        amount_total = s.amount_total + EXCLUDED.amount_total,
+        weighted_total = s.weighted_total + EXCLUDED.weighted_total;"""
+_MONTHLY_UPSERT = f"""
+    INSERT INTO opportunity_monthly_closes AS s (month, stage, opportunity_count, amount_total, weighted_total)
+    SELECT date_trunc('month', close_date)::date, coalesce(stage, ''), {{sign}}count(*),
+           {{sign}}coalesce(sum(amount), 0), {{sign}}coalesce(sum({_WEIGHTED}), 0)
+    FROM {{source}} WHERE close_date IS NOT NULL GROUP BY 1, 2
+    ON CONFLICT (month, stage) DO UPDATE SET
+        opportunity_count = s.opportunity_count + EXCLUDED.opportunity_count,
+        amount_total = s.amount_total + EXCLUDED.amount_total,
+        weighted_total = s.weighted_total + EXCLUDED.weighted_total;"""
+
+_LEAD_STATUS_BUFFER = """
+    INSERT INTO lead_status_deltas (status, lead_count)
+    SELECT coalesce(status, ''), {sign}count(*) FROM {source} GROUP BY 1;"""
+_STAGE_BUFFER = f"""
+    INSERT INTO opportunity_stage_deltas (stage, opportunity_count, amount_total, weighted_total)
+    SELECT coalesce(stage, ''), {{sign}}count(*), {{sign}}coalesce(sum(amount), 0), {{sign}}coalesce(sum({_WEIGHTED}), 0)
+    FROM {{source}} GROUP BY 1;"""
+_MONTHLY_BUFFER = f"""
+    INSERT INTO opportunity_monthly_deltas (month, stage, opportunity_count, amount_total, weighted_total)
+    SELECT date_trunc('month', close_date)::date, coalesce(stage, ''), {{sign}}count(*),
+           {{sign}}coalesce(sum(amount), 0), {{sign}}coalesce(sum({_WEIGHTED}), 0)
+    FROM {{source}} WHERE close_date IS NOT NULL GROUP BY 1, 2;"""
+
+def _summary_function(name: str, statements, prelude: str = "") -> str:
+    add = "".join(statement.format(source="new_rows", sign="") for statement in statements)
+    subtract = "".join(statement.format(source="old_rows", sign="-") for statement in statements)
+    body = f"""{prelude}
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN {add}
+        END IF;
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN {subtract}
+        END IF;
+        RETURN NULL;"""
+    return (
+        f"CREATE OR REPLACE FUNCTION {{schema}}.{name}() RETURNS trigger LANGUAGE plpgsql "
+        f"SET search_path = {{schema}} AS $fn$ BEGIN {body.replace('{', '{{').replace('}', '}}')} END $fn$"
+    )
+
+def _version_function(body: str) -> str:
+    return f"""CREATE OR REPLACE FUNCTION {{schema}}.crm_bump_table_version() RETURNS trigger LANGUAGE plpgsql
+       SET search_path = {{schema}} AS $fn$ BEGIN
+           {body}
+           RETURN NULL;
+       END $fn$"""
+
+WRITE_BUFFERS_DDL = [
+    """CREATE UNLOGGED TABLE IF NOT EXISTS {schema}.lead_status_deltas (
+        status varchar(50) NOT NULL,
+        lead_count integer NOT NULL)""",
+    """CREATE UNLOGGED TABLE IF NOT EXISTS {schema}.opportunity_stage_deltas (
+        stage varchar(50) NOT NULL,
+        opportunity_count integer NOT NULL,
+        amount_total numeric(18, 2) NOT NULL,
+        weighted_total numeric(18, 2) NOT NULL)""",
+    """CREATE UNLOGGED TABLE IF NOT EXISTS {schema}.opportunity_monthly_deltas (
+        month date NOT NULL,
+        stage varchar(50) NOT NULL,
+        opportunity_count integer NOT NULL,
+        amount_total numeric(18, 2) NOT NULL,
+        weighted_total numeric(18, 2) NOT NULL)""",
+    """CREATE UNLOGGED TABLE IF NOT EXISTS {schema}.table_version_deltas (
+        table_name varchar(63) NOT NULL)""",
+    "CREATE UNLOGGED TABLE IF NOT EXISTS {schema}.pending_flushes (queued boolean NOT NULL DEFAULT true)",
+]
+
+FLUSH_DDL = [
+    """CREATE OR REPLACE FUNCTION {schema}.crm_queue_flush() RETURNS void LANGUAGE plpgsql
+       SET search_path = {schema} AS $fn$ BEGIN
+           IF current_setting('crm.flush_pending', true) IS DISTINCT FROM 'on' THEN
+               INSERT INTO pending_flushes DEFAULT VALUES;
+               PERFORM set_config('crm.flush_pending', 'on', true);
+           END IF;
+       END $fn$""",
+    """CREATE OR REPLACE FUNCTION {schema}.crm_flush_writes() RETURNS trigger LANGUAGE plpgsql
+       SET search_path = {schema} AS $fn$ BEGIN
+           INSERT INTO lead_status_counts AS s (status, lead_count)
+           SELECT status, sum(lead_count) FROM lead_status_deltas GROUP BY 1 ORDER BY 1
+           ON CONFLICT (status) DO UPDATE SET lead_count = s.lead_count + EXCLUDED.lead_count;
+           INSERT INTO opportunity_stage_totals AS s (stage, opportunity_count, amount_total, weighted_total)
+           SELECT stage, sum(opportunity_count), sum(amount_total), sum(weighted_total)
+           FROM opportunity_stage_deltas GROUP BY 1 ORDER BY 1
+           ON CONFLICT (stage) DO UPDATE SET
+               opportunity_count = s.opportunity_count + EXCLUDED.opportunity_count,
+               amount_total = s.amount_total + EXCLUDED.amount_total,
+               weighted_total = s.weighted_total + EXCLUDED.weighted_total;
+           INSERT INTO opportunity_monthly_closes AS s (month, stage, opportunity_count, amount_total, weighted_total)
+           SELECT month, stage, sum(opportunity_count), sum(amount_total), sum(weighted_total)
+           FROM opportunity_monthly_deltas GROUP BY 1, 2 ORDER BY 1, 2
+           ON CONFLICT (month, stage) DO UPDATE SET
+               opportunity_count = s.opportunity_count + EXCLUDED.opportunity_count,
+               amount_total = s.amount_total + EXCLUDED.amount_total,
+               weighted_total = s.weighted_total + EXCLUDED.weighted_total;
+           INSERT INTO table_versions AS v (table_name, version)
+           SELECT DISTINCT table_name, 1 FROM table_version_deltas ORDER BY 1
+           ON CONFLICT (table_name) DO UPDATE SET version = v.version + 1;
+           DELETE FROM lead_status_deltas;
+           DELETE FROM opportunity_stage_deltas;
+           DELETE FROM opportunity_monthly_deltas;
+           DELETE FROM table_version_deltas;
+           DELETE FROM pending_flushes;
+           -- SET CONSTRAINTS ... IMMEDIATE flushes early; later writes queue again
+           PERFORM set_config('crm.flush_pending', '', true);
+           RETURN NULL;
+       END $fn$""",
+    "DROP TRIGGER IF EXISTS pending_flushes_flush ON {schema}.pending_flushes",
+    "CREATE CONSTRAINT TRIGGER pending_flushes_flush AFTER INSERT ON {schema}.pending_flushes "
+    "DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE PROCEDURE {schema}.crm_flush_writes()",
+]
+
+_QUEUE = "\n        PERFORM crm_queue_flush();"
+
+
+def upgrade() -> None:
+    execute_in_crm_schemas(op, WRITE_BUFFERS_DDL + FLUSH_DDL + [
+        _summary_function("crm_leads_summary", [_LEAD_STATUS_BUFFER], _QUEUE),
+        _summary_function("crm_opportunities_summary", [_STAGE_BUFFER, _MONTHLY_BUFFER], _QUEUE),
+        _version_function(
+            "PERFORM crm_queue_flush();\n"
+            "           INSERT INTO table_version_deltas (table_name) VALUES (TG_TABLE_NAME);"
+        ),
+    ])
+
+
+def downgrade() -> None:
+    execute_in_crm_schemas(op, [
+        _summary_function("crm_leads_summary", [_LEAD_STATUS_UPSERT]),
+        _summary_function("crm_opportunities_summary", [_STAGE_UPSERT, _MONTHLY_UPSERT]),
+        _version_function(
+            "INSERT INTO table_versions AS v (table_name, version) VALUES (TG_TABLE_NAME, 1)\n"
+            "           ON CONFLICT (table_name) DO UPDATE SET version = v.version + 1;"
+        ),
+        'DROP TRIGGER IF EXISTS pending_flushes_flush ON {schema}.pending_flushes',
+        'DROP FUNCTION IF EXISTS {schema}.crm_flush_writes()',
+        'DROP FUNCTION IF EXISTS {schema}.crm_queue_flush()',
+    ] + [
+        f'DROP TABLE IF EXISTS {{schema}}.{table}'
+        for table in ('pending_flushes', 'table_version_deltas', 'opportunity_monthly_deltas',
+                      'opportunity_stage_deltas', 'lead_status_deltas')
+    ])
@@ -0,0 +1,98 @@
+"""Stage/status history tables for leads and opportunities
+
+Revision ID: d41b7c9e2a58
+Revises: a7d3e1f48b26
+Create Date: 2026-10-18 15:10:47.318962
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import execute_in_crm_schemas
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41b7c9e2a58'
+down_revision: Union[str, None] = 'a7d3e1f48b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The DDL as of this revision, kept here rather than imported from
+# app.db.history: the live definitions move on with later revisions.
+
+# table -> (history table, key column, tracked column)
+HISTORY_TABLES = {
+    "leads": ("lead_status_history", "lead_id", "status"),
+    "opportunities": ("opportunity_stage_history", "opportunity_id", "stage"),
+}
+
+HISTORY_TABLES_DDL = [
+    statement
+    for history, key, _ in HISTORY_TABLES.values()
+    for statement in (
+        f"""CREATE TABLE IF NOT EXISTS {{schema}}.{history} (
+            id bigserial PRIMARY KEY,
+            {key} integer NOT NULL,
+            from_value varchar(50),
+            to_value varchar(50),
+            changed_at timestamptz NOT NULL DEFAULT now())""",
+        f"CREATE INDEX IF NOT EXISTS ix_{history}_{key}_changed_at ON {{schema}}.{history} ({key}, changed_at)",
+        f"CREATE INDEX IF NOT EXISTS ix_{history}_changed_at ON {{schema}}.{history} (changed_at)",
+    )
+]
+
+def _history_triggers(table: str, history: str, key: str, column: str) -> list:
+    function = f"crm_{table}_history"
+    body = f"""
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO {history} ({key}, from_value, to_value, changed_at)
+            SELECT id, NULL, {column}, coalesce(created_at, now()) FROM new_rows;
+        ELSE
+            INSERT INTO {history} ({key}, from_value, to_value)
+            SELECT n.id, o.{column}, n.{column}
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.{column} IS DISTINCT FROM o.{column};
+        END IF;
+        RETURN NULL;"""
+    return [
+        f"CREATE OR REPLACE FUNCTION {{schema}}.{function}() RETURNS trigger LANGUAGE plpgsql "
+        f"SET search_path = {{schema}} AS $fn$ BEGIN {body} END $fn$",
+        f"DROP TRIGGER IF EXISTS {table}_history_insert ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_history_insert AFTER INSERT ON {{schema}}.{table} "
+        f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.{function}()",
+        f"DROP TRIGGER IF EXISTS {table}_history_update ON {{schema}}.{table}",
+        f"CREATE TRIGGER {table}_history_update AFTER UPDATE ON {{schema}}.{table} "
+        f"REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE PROCEDURE {{schema}}.{function}()",
+    ]
+
+HISTORY_TRIGGERS_DDL = [
+    statement
+    for table, (history, key, column) in HISTORY_TABLES.items()
+    for statement in _history_triggers(table, history, key, column)
+]
+
+HISTORY_BACKFILL = [
+    f"""INSERT INTO {{schema}}.{history} ({key}, from_value, to_value, changed_at)
+        SELECT t.id, NULL, t.{column}, coalesce(t.updated_at, t.created_at, now())
+        FROM {{schema}}.{table} t
+        WHERE NOT EXISTS (SELECT 1 FROM {{schema}}.{history} h WHERE h.{key} = t.id)"""
+    for table, (history, key, column) in HISTORY_TABLES.items()
+]
+
+
+def upgrade() -> None:
+    # Seed one row per existing lead/opportunity with its current value
+    execute_in_crm_schemas(op, HISTORY_TABLES_DDL + HISTORY_TRIGGERS_DDL + HISTORY_BACKFILL)
+
+
+def downgrade() -> None:
+    statements = []
+    for table, (history, _, _) in HISTORY_TABLES.items():
+        statements += [
+            f'DROP TRIGGER IF EXISTS {table}_history_insert ON {{schema}}.{table}',
+            f'DROP TRIGGER IF EXISTS {table}_history_update ON {{schema}}.{table}',
+            f'DROP FUNCTION IF EXISTS {{schema}}.crm_{table}_history()',
+            f'DROP TABLE IF EXISTS {{schema}}.{history}',
+        ]
+    execute_in_crm_schemas(op, statements)
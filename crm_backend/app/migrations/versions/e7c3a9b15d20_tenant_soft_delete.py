@@ -0,0 +1,31 @@
+"""Tenant soft delete timestamp
+
+Revision ID: e7c3a9b15d20
+Revises: b52e9d0c4f18
+Create Date: 2026-10-18 19:04:27.311958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import migration_schema
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c3a9b15d20'
+down_revision: Union[str, None] = 'b52e9d0c4f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if migration_schema(op):
+        return  # public schema only
+    op.add_column('tenants', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    if migration_schema(op):
+        return
+    op.drop_column('tenants', 'deleted_at')
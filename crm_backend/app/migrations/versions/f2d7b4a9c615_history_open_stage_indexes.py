@@ -0,0 +1,42 @@
+"""Partial indexes on history entries into an open stage, for stuck queries
+
+Revision ID: f2d7b4a9c615
+Revises: c1f6e8a4b273
+Create Date: 2026-10-18 23:41:52.660173
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.migration_utils import execute_in_crm_schemas
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d7b4a9c615'
+down_revision: Union[str, None] = 'c1f6e8a4b273'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns, terminal values) -- mirrors app/models/history.py
+INDEXES = [
+    ('ix_lead_status_history_open_changed_at', 'lead_status_history', 'changed_at, lead_id',
+     "'qualified', 'lost'"),
+    ('ix_opportunity_stage_history_open_changed_at', 'opportunity_stage_history', 'changed_at, opportunity_id',
+     "'closed_won', 'closed_lost'"),
+]
+
+
+def upgrade() -> None:
+    execute_in_crm_schemas(op, [
+        f'CREATE INDEX IF NOT EXISTS {name} ON {{schema}}.{table} ({columns}) WHERE to_value NOT IN ({terminal})'
+        for name, table, columns, terminal in INDEXES
+    ])
+
+
+def downgrade() -> None:
+    execute_in_crm_schemas(op, [
+        f'DROP INDEX IF EXISTS {{schema}}.{name}'
+        for name, _, _, _ in INDEXES
+    ])
@@ -1,4 +1,10 @@
-from app.models.tenant import Tenant, User
+from app.models.tenant import Tenant, User, TenantProvisioningJob
 from app.models.crm import Contact, Lead, Opportunity
+from app.models.stats import LeadStatusCount, OpportunityStageTotal, OpportunityMonthlyClose, TableVersion
+from app.models.history import LeadStatusChange, OpportunityStageChange
 
-__all__ = ["Tenant", "User", "Contact", "Lead", "Opportunity"]
\ No newline at end of file
+__all__ = [
+    "Tenant", "User", "TenantProvisioningJob", "Contact", "Lead", "Opportunity",
+    "LeadStatusCount", "OpportunityStageTotal", "OpportunityMonthlyClose", "TableVersion",
+    "LeadStatusChange", "OpportunityStageChange",
+]
\ No newline at end of file
@@ -1,8 +1,21 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Numeric, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Numeric, Boolean, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
 
+# Search columns (see app/services/search.py) are generated by Postgres, so
+# every write path -- ORM, bulk COPY, raw SQL -- keeps them current.
+# search_text feeds pg_trgm fuzzy matching, search_vector full-text search.
+# pg_trgm lives in the public schema, hence the qualified operator class.
+CONTACT_SEARCH_TEXT = "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(company, ''))"
+CONTACT_SEARCH_VECTOR = "to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(company, ''))"
+LEAD_SEARCH_TEXT = "lower(coalesce(title, ''))"
+LEAD_SEARCH_VECTOR = "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+OPPORTUNITY_SEARCH_TEXT = "lower(coalesce(name, ''))"
+OPPORTUNITY_SEARCH_VECTOR = "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+TRGM_OPS = "public.gin_trgm_ops"
+
 class Contact(Base):
     __tablename__ = "contacts"
     
@@ -15,10 +28,26 @@ class Contact(Base):
     title = Column(String(100))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # optimistic concurrency token
+    search_text = deferred(Column(Text, Computed(CONTACT_SEARCH_TEXT, persisted=True)))
+    search_vector = deferred(Column(TSVECTOR, Computed(CONTACT_SEARCH_VECTOR, persisted=True)))
     
     leads = relationship("Lead", back_populates="contact")
     opportunities = relationship("Opportunity", back_populates="contact")
 
+    # Keyset pagination sort keys (see app/services/pagination.py)
+    __table_args__ = (
+        Index("ix_contacts_created_at_id", created_at, id),
+        Index("ix_contacts_updated_at_id", func.coalesce(updated_at, created_at), id),
+        # Filter / sort keys for the list endpoints
+        Index("ix_contacts_last_name_id", last_name, id),
+        Index("ix_contacts_company_id", company, id),
+        # Search
+        Index("ix_contacts_search_vector", search_vector, postgresql_using="gin"),
+        Index("ix_contacts_search_text_trgm", search_text, postgresql_using="gin", postgresql_ops={"search_text": TRGM_OPS}),
+    )
+    __mapper_args__ = {"version_id_col": version}
+
 class Lead(Base):
     __tablename__ = "leads"
     
@@ -30,10 +59,27 @@ class Lead(Base):
     contact_id = Column(Integer, ForeignKey("contacts.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # optimistic concurrency token
+    search_text = deferred(Column(Text, Computed(LEAD_SEARCH_TEXT, persisted=True)))
+    search_vector = deferred(Column(TSVECTOR, Computed(LEAD_SEARCH_VECTOR, persisted=True)))
     
     contact = relationship("Contact", back_populates="leads")
     opportunities = relationship("Opportunity", back_populates="lead")
 
+    # Keyset pagination sort keys (see app/services/pagination.py)
+    __table_args__ = (
+        Index("ix_leads_created_at_id", created_at, id),
+        Index("ix_leads_updated_at_id", func.coalesce(updated_at, created_at), id),
+        # Filter / sort keys for the list endpoints
+        Index("ix_leads_status_id", status, id),
+        Index("ix_leads_source_id", source, id),
+        Index("ix_leads_contact_id_id", contact_id, id),
+        # Search
+        Index("ix_leads_search_vector", search_vector, postgresql_using="gin"),
+        Index("ix_leads_search_text_trgm", search_text, postgresql_using="gin", postgresql_ops={"search_text": TRGM_OPS}),
+    )
+    __mapper_args__ = {"version_id_col": version}
+
 class Opportunity(Base):
     __tablename__ = "opportunities"
     
@@ -48,6 +94,25 @@ class Opportunity(Base):
     lead_id = Column(Integer, ForeignKey("leads.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # optimistic concurrency token
+    search_text = deferred(Column(Text, Computed(OPPORTUNITY_SEARCH_TEXT, persisted=True)))
+    search_vector = deferred(Column(TSVECTOR, Computed(OPPORTUNITY_SEARCH_VECTOR, persisted=True)))
     
     contact = relationship("Contact", back_populates="opportunities")
-    lead = relationship("Lead", back_populates="opportunities")
\ No newline at end of file
+    lead = relationship("Lead", back_populates="opportunities")
+
+    # Keyset pagination sort keys (see app/services/pagination.py)
+    __table_args__ = (
+        Index("ix_opportunities_created_at_id", created_at, id),
+        Index("ix_opportunities_updated_at_id", func.coalesce(updated_at, created_at), id),
+        # Filter / sort keys for the list endpoints
+        Index("ix_opportunities_stage_id", stage, id),
+        Index("ix_opportunities_contact_id_id", contact_id, id),
+        Index("ix_opportunities_lead_id_id", lead_id, id),
+        Index("ix_opportunities_close_date_id", close_date, id),
+        Index("ix_opportunities_amount_id", amount, id),
+        # Search
+        Index("ix_opportunities_search_vector", search_vector, postgresql_using="gin"),
+        Index("ix_opportunities_search_text_trgm", search_text, postgresql_using="gin", postgresql_ops={"search_text": TRGM_OPS}),
+    )
+    __mapper_args__ = {"version_id_col": version}
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+# Append-only stage/status transitions, written by triggers on leads and
+# opportunities (see app/db/history.py) in the same transaction as the change.
+# Creating a row records its initial value with from_value NULL. There is no
+# foreign key, so history outlives deleted rows.
+
+# Values a record does not leave; the partial "open" indexes cover the rest
+LEAD_TERMINAL_STATUSES = ("qualified", "lost")
+OPPORTUNITY_TERMINAL_STAGES = ("closed_won", "closed_lost")
+
+class LeadStatusChange(Base):
+    __tablename__ = "lead_status_history"
+
+    id = Column(BigInteger, primary_key=True)
+    lead_id = Column(Integer, nullable=False)
+    from_value = Column(String(50))
+    to_value = Column(String(50))
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_lead_status_history_lead_id_changed_at", lead_id, changed_at),
+        Index("ix_lead_status_history_changed_at", changed_at),
+        # Stuck-record scans: entries into an open status, by entry time
+        Index(
+            "ix_lead_status_history_open_changed_at", changed_at, lead_id,
+            postgresql_where=to_value.notin_(LEAD_TERMINAL_STATUSES),
+        ),
+    )
+
+class OpportunityStageChange(Base):
+    __tablename__ = "opportunity_stage_history"
+
+    id = Column(BigInteger, primary_key=True)
+    opportunity_id = Column(Integer, nullable=False)
+    from_value = Column(String(50))
+    to_value = Column(String(50))
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_opportunity_stage_history_opportunity_id_changed_at", opportunity_id, changed_at),
+        Index("ix_opportunity_stage_history_changed_at", changed_at),
+        Index(
+            "ix_opportunity_stage_history_open_changed_at", changed_at, opportunity_id,
+            postgresql_where=to_value.notin_(OPPORTUNITY_TERMINAL_STAGES),
+        ),
+    )
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Numeric, Date
+from app.db.base_class import Base
+
+# Per-tenant dashboard aggregates. These tables are maintained by statement
+# level triggers on leads/opportunities (see app/db/summary.py), so reads
+# are constant time no matter how many rows a tenant has.
+
+class LeadStatusCount(Base):
+    __tablename__ = "lead_status_counts"
+
+    status = Column(String(50), primary_key=True)  # '' for NULL status
+    lead_count = Column(Integer, nullable=False, default=0)
+
+class OpportunityStageTotal(Base):
+    __tablename__ = "opportunity_stage_totals"
+
+    stage = Column(String(50), primary_key=True)  # '' for NULL stage
+    opportunity_count = Column(Integer, nullable=False, default=0)
+    amount_total = Column(Numeric(18, 2), nullable=False, default=0)
+    weighted_total = Column(Numeric(18, 2), nullable=False, default=0)  # sum(amount * probability / 100)
+
+class OpportunityMonthlyClose(Base):
+    __tablename__ = "opportunity_monthly_closes"
+
+    month = Column(Date, primary_key=True)  # first day of the close_date month
+    stage = Column(String(50), primary_key=True)
+    opportunity_count = Column(Integer, nullable=False, default=0)
+    amount_total = Column(Numeric(18, 2), nullable=False, default=0)
+    weighted_total = Column(Numeric(18, 2), nullable=False, default=0)
+
+class TableVersion(Base):
+    """Write counter per CRM table, bumped once per writing transaction at
+    commit. Readers compare it to decide whether a cached result is stale."""
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(63), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -10,6 +10,12 @@ class Tenant(Base):
     name = Column(String(100), unique=True, index=True, nullable=False)
     schema_name = Column(String(50), unique=True, nullable=False)
     is_active = Column(Boolean, default=True)
+    # "provisioning" until its schema exists, then "ready" (see app/services/provisioning.py);
+    # "deleting" once deleted, until the reaper drops the schema (app/services/teardown.py)
+    status = Column(String(20), nullable=False, default="ready", server_default="ready")
+    deleted_at = Column(DateTime(timezone=True))
+    # Database holding the schema (app/db/shards.py); moved by app/db/tenant_move.py
+    shard = Column(String(50), nullable=False, default="default", server_default="default", index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # This relationship stays in public schema
@@ -27,4 +33,19 @@ class User(Base):
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    tenant = relationship("Tenant", back_populates="users")
\ No newline at end of file
+    tenant = relationship("Tenant", back_populates="users")
+
+class TenantProvisioningJob(Base):
+    """One background run creating a tenant schema. Outlives the tenant row
+    when provisioning fails and the tenant is rolled back."""
+    __tablename__ = "tenant_provisioning_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, index=True)  # no foreign key, see above
+    tenant_name = Column(String(100), nullable=False)
+    schema_name = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, succeeded, failed
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
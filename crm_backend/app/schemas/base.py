@@ -0,0 +1,24 @@
+from pydantic import BaseModel, model_validator
+from sqlalchemy import inspect
+from sqlalchemy.orm.state import InstanceState
+
+class ExpandableModel(BaseModel):
+    """Response schema whose relationship fields are filled only when the ORM
+    object already has them loaded (via ?include=).
+
+    Reading an unloaded relationship would lazy-load it: one query per row in
+    a list, or an error on an AsyncSession. Those fields stay at their default.
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def _loaded_only(cls, data):
+        state = inspect(data, raiseerr=False)
+        if not isinstance(state, InstanceState):
+            return data
+        skip = state.unloaded & set(state.mapper.relationships.keys())
+        return {
+            name: getattr(data, name)
+            for name in cls.model_fields
+            if name not in skip and hasattr(data, name)
+        }
@@ -1,6 +1,82 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, Generic, List, Literal, Optional, TypeVar, Union
 from datetime import datetime
+from app.schemas.base import ExpandableModel
+
+T = TypeVar("T")
+
+# Sortable fields per list endpoint; each one is backed by a (field, id) index
+ContactSortField = Literal["id", "created_at", "updated_at", "last_name", "company"]
+LeadSortField = Literal["id", "created_at", "updated_at", "status"]
+OpportunitySortField = Literal["id", "created_at", "updated_at", "amount", "close_date"]
+SortOrder = Literal["asc", "desc"]
+
+# Relationships that ?include= can embed, per entity
+CONTACT_INCLUDES = ()
+LEAD_INCLUDES = ("contact",)
+OPPORTUNITY_INCLUDES = ("contact", "lead")
+
+class Page(BaseModel, Generic[T]):
+    """Keyset-paginated list; pass next_cursor back as ?cursor= for the next page"""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+F = TypeVar("F")
+P = TypeVar("P")
+
+# Bulk update/delete: the same filters as the list endpoints, in the body
+# (`_from` / `_to` are inclusive bounds)
+class ContactFilter(BaseModel):
+    company: Optional[str] = None
+    email: Optional[str] = None
+    created_at_from: Optional[datetime] = None
+    created_at_to: Optional[datetime] = None
+
+class LeadFilter(BaseModel):
+    status: Optional[str] = None
+    source: Optional[str] = None
+    contact_id: Optional[int] = None
+    created_at_from: Optional[datetime] = None
+    created_at_to: Optional[datetime] = None
+
+class OpportunityFilter(BaseModel):
+    stage: Optional[str] = None
+    contact_id: Optional[int] = None
+    lead_id: Optional[int] = None
+    close_date_from: Optional[datetime] = None
+    close_date_to: Optional[datetime] = None
+    amount_from: Optional[float] = None
+    amount_to: Optional[float] = None
+    created_at_from: Optional[datetime] = None
+    created_at_to: Optional[datetime] = None
+
+class BulkUpdate(BaseModel, Generic[F, P]):
+    """Set `patch` on every row matching `filter`; dry_run only counts them"""
+    filter: F
+    patch: P
+    dry_run: bool = False
+
+class BulkDelete(BaseModel, Generic[F]):
+    filter: F
+    dry_run: bool = False
+
+class BulkResult(BaseModel):
+    affected: int  # rows changed, or rows that would be with dry_run
+    dry_run: bool
+
+DataFormat = Literal["csv", "ndjson"]
+
+class ImportRowError(BaseModel):
+    row: int  # line number in the upload
+    error: str
+
+class ImportReport(BaseModel):
+    inserted: int
+    failed: int
+    chunks: int
+    errors: List[ImportRowError]
+    elapsed_seconds: float
+    rows_per_second: Optional[float] = None
 
 class ContactBase(BaseModel):
     first_name: str
@@ -13,10 +89,20 @@ class ContactBase(BaseModel):
 class ContactCreate(ContactBase):
     pass
 
+class ContactUpdate(BaseModel):
+    """Partial update: only the fields that are sent are written"""
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    company: Optional[str] = None
+    title: Optional[str] = None
+
 class Contact(ContactBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime]
+    version: int  # send back as If-Match on PATCH
     
     class Config:
         from_attributes = True
@@ -31,10 +117,19 @@ class LeadBase(BaseModel):
 class LeadCreate(LeadBase):
     pass
 
-class Lead(LeadBase):
+class LeadUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    source: Optional[str] = None
+    contact_id: Optional[int] = None
+
+class Lead(LeadBase, ExpandableModel):
     id: int
     created_at: datetime
     updated_at: Optional[datetime]
+    version: int  # send back as If-Match on PATCH
+    contact: Optional[Contact] = None  # ?include=contact
     
     class Config:
         from_attributes = True
@@ -52,10 +147,70 @@ class OpportunityBase(BaseModel):
 class OpportunityCreate(OpportunityBase):
     pass
 
-class Opportunity(OpportunityBase):
+class OpportunityUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    amount: Optional[float] = None
+    stage: Optional[str] = None
+    probability: Optional[int] = None
+    close_date: Optional[datetime] = None
+    contact_id: Optional[int] = None
+    lead_id: Optional[int] = None
+
+class Opportunity(OpportunityBase, ExpandableModel):
     id: int
     created_at: datetime
     updated_at: Optional[datetime]
+    version: int  # send back as If-Match on PATCH
+    contact: Optional[Contact] = None  # ?include=contact
+    lead: Optional[Lead] = None  # ?include=lead
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Columns that ?fields= can select on the list endpoints
+CONTACT_FIELDS = tuple(Contact.model_fields)
+LEAD_FIELDS = tuple(name for name in Lead.model_fields if name not in LEAD_INCLUDES)
+OPPORTUNITY_FIELDS = tuple(name for name in Opportunity.model_fields if name not in OPPORTUNITY_INCLUDES)
+
+SearchEntity = Literal["contacts", "leads", "opportunities"]
+
+class SearchHit(BaseModel):
+    id: int
+    label: str
+    detail: Optional[str] = None
+    score: float
+
+class SearchResults(BaseModel):
+    query: str
+    contacts: List[SearchHit] = []
+    leads: List[SearchHit] = []
+    opportunities: List[SearchHit] = []
+    timed_out: List[SearchEntity] = []
+
+# /crm/batch: an ordered list of writes run in one transaction. A create can
+# name its result with `ref`; later operations use "$<ref>" in place of that
+# id, either as `id` or as a value in `data` (e.g. "contact_id": "$acme").
+BatchEntity = Literal["contacts", "leads", "opportunities"]
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    entity: BatchEntity
+    id: Optional[Union[int, str]] = None  # update/delete target
+    ref: Optional[str] = None  # create: name for the new id
+    data: Optional[Dict[str, Any]] = None  # create: full record, update: changed fields
+    version: Optional[int] = None  # update: only apply while the row is at this version
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+class BatchResult(BaseModel):
+    index: int
+    op: str
+    entity: BatchEntity
+    id: int
+    ref: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None  # the row as written (create/update)
+
+class BatchResponse(BaseModel):
+    results: List[BatchResult]
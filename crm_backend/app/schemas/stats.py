@@ -0,0 +1,117 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+from datetime import date, datetime
+
+AnalyticsPeriod = Literal["month", "quarter"]
+
+class LeadStatusCount(BaseModel):
+    status: Optional[str] = None
+    count: int
+
+class StageTotal(BaseModel):
+    stage: Optional[str] = None
+    count: int
+    amount: float
+    weighted_amount: float
+
+class Pipeline(BaseModel):
+    stages: List[StageTotal]
+    open_count: int
+    open_amount: float
+    weighted_pipeline: float
+
+class MonthlyClose(BaseModel):
+    month: date
+    count: int
+    amount: float
+    weighted_amount: float
+
+class StatsSnapshot(BaseModel):
+    lead_statuses: List[LeadStatusCount]
+    pipeline: Pipeline
+    expected_closes: List[MonthlyClose]
+
+class StatsRecompute(BaseModel):
+    consistent: bool
+    before: StatsSnapshot
+    after: StatsSnapshot
+
+class StageConversion(BaseModel):
+    from_stage: str
+    to_stage: str
+    reached: int
+    converted: int
+    rate: Optional[float] = None
+
+class StageAge(BaseModel):
+    stage: Optional[str] = None
+    count: int
+    avg_days_in_stage: float
+
+class ForecastPeriod(BaseModel):
+    period: str
+    start: date
+    open_count: int
+    pipeline_amount: float
+    expected_amount: float
+    won_amount: float
+
+class PipelineAnalytics(BaseModel):
+    computed_at: datetime
+    period: AnalyticsPeriod
+    opportunity_count: int
+    open_count: int
+    win_rate: Optional[float] = None
+    avg_sales_cycle_days: Optional[float] = None
+    conversions: List[StageConversion]
+    time_in_stage: List[StageAge]
+    forecast: List[ForecastPeriod]
+
+HistoryEntity = Literal["leads", "opportunities"]
+
+class StageChange(BaseModel):
+    id: int
+    from_value: Optional[str] = None
+    to_value: Optional[str] = None
+    changed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class FunnelStage(BaseModel):
+    stage: Optional[str] = None
+    entered: int
+
+class Funnel(BaseModel):
+    since: datetime
+    until: datetime
+    stages: List[FunnelStage]
+
+class StageVelocity(BaseModel):
+    stage: Optional[str] = None
+    exits: int
+    avg_days_in_stage: float
+
+class Velocity(BaseModel):
+    since: datetime
+    until: datetime
+    stages: List[StageVelocity]
+
+class StuckRecord(BaseModel):
+    id: int
+    label: str
+    stage: Optional[str] = None
+    since: datetime
+    days_in_stage: float
+
+class CacheMetrics(BaseModel):
+    enabled: bool
+    backend: str
+    hits: int
+    misses: int
+    hit_rate: Optional[float] = None
+    stores: int
+    entries: Optional[int] = None  # None where the backend can't tell (redis)
+    bytes: Optional[int] = None
+    max_bytes: Optional[int] = None
+    evictions: Optional[int] = None
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+from app.schemas.base import ExpandableModel
 
 class TenantBase(BaseModel):
     name: str
@@ -12,11 +13,44 @@ class Tenant(TenantBase):
     id: int
     schema_name: str
     is_active: bool
+    status: str  # provisioning, ready, deleting
+    shard: str
     created_at: datetime
     
     class Config:
         from_attributes = True
 
+class PendingTeardown(BaseModel):
+    id: int
+    name: str
+    schema_name: str
+    shard: str
+    deleted_at: Optional[datetime] = None
+    due_at: Optional[datetime] = None  # reaper may drop the schema from then on
+    tables: int  # tables left in the schema
+    bytes: int
+    last_error: Optional[str] = None
+
+class TeardownStatus(BaseModel):
+    reaper_running: bool
+    last_run_at: Optional[datetime] = None  # this process' reaper
+    dropped: int
+    tenants: List[PendingTeardown]
+
+class ProvisioningJob(BaseModel):
+    id: int
+    tenant_id: int
+    tenant_name: str
+    schema_name: str
+    status: str  # pending, running, succeeded, failed
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class UserBase(BaseModel):
     email: EmailStr
     full_name: str
@@ -25,13 +59,17 @@ class UserCreate(UserBase):
     password: str
     tenant_id: int
 
-class User(UserBase):
+# Relationships that ?include= can embed in a user
+USER_INCLUDES = ("tenant",)
+
+class User(UserBase, ExpandableModel):
     id: int
     is_active: bool
     is_superuser: bool
-    tenant_id: int
+    tenant_id: Optional[int] = None
     tenant_name: Optional[str] = None
     created_at: datetime
+    tenant: Optional[Tenant] = None  # ?include=tenant
     
     class Config:
         from_attributes = True
@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.crm import Opportunity
+from app.models.history import OpportunityStageChange
+from app.models.stats import TableVersion
+
+# Pipeline analytics computed column-wise with NumPy. The opportunities table
+# is read once per tenant as plain columns (no ORM objects) and every metric
+# is a handful of array operations over those columns.
+
+# Funnel order; an opportunity at stage N is counted as having passed 0..N-1
+STAGE_ORDER = ("prospecting", "qualification", "proposal", "negotiation", "closed_won")
+WON_STAGE, LOST_STAGE = "closed_won", "closed_lost"
+PERIODS = ("month", "quarter")
+DAY_SECONDS = 86400.0
+
+def _epoch(column):
+    return cast(func.extract("epoch", column), Float)
+
+def factorize(values):
+    """Strings -> (int code per value, distinct labels in first-seen order)"""
+    labels = {}
+    codes = np.fromiter((labels.setdefault(value, len(labels)) for value in values), dtype=np.int64, count=len(values))
+    return codes, tuple(labels)
+
+def load_columns(db: Session) -> dict:
+    """One query -> dict of NumPy arrays; NULLs become NaN (or '' for stage)"""
+    # When the current stage was entered: the latest stage history entry (one
+    # probe of the (opportunity_id, changed_at) index per row). An update to
+    # other fields doesn't reset it; rows without history fall back to creation.
+    entered_at = (
+        select(func.max(OpportunityStageChange.changed_at))
+        .where(OpportunityStageChange.opportunity_id == Opportunity.id)
+        .scalar_subquery()
+    )
+    stmt = select(
+        func.coalesce(Opportunity.stage, ""),
+        cast(Opportunity.amount, Float),
+        cast(Opportunity.probability, Float),
+        _epoch(Opportunity.close_date),
+        _epoch(Opportunity.created_at),
+        _epoch(func.coalesce(entered_at, Opportunity.created_at)),
+    )
+    rows = db.execute(stmt).all()
+    stage, amount, probability, close_date, created_at, entered_at = zip(*rows) if rows else ((),) * 6
+    stage_code, stage_labels = factorize(stage)
+    return {
+        "stage_code": stage_code,
+        "stage_labels": stage_labels,
+        "amount": np.array(amount, dtype=float),
+        "probability": np.array(probability, dtype=float),
+        "close_date": np.array(close_date, dtype=float),
+        "created_at": np.array(created_at, dtype=float),
+        "entered_at": np.array(entered_at, dtype=float),
+    }
+
+def _mean(values) -> float:
+    return float(values.mean()) if values.size else None
+
+def _period_index(close_seconds, period: str):
+    """close_date epoch seconds -> months since 1970 of the containing month/quarter start"""
+    months = close_seconds.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+    if period == "month":
+        return months
+    return months - months % 3
+
+def compute(columns: dict, period: str = "month", now: float = None) -> dict:
+    """Conversion rates, time in stage, win rate and a close_date forecast"""
+    now = time.time() if now is None else now
+    codes = columns["stage_code"]
+    labels = columns["stage_labels"]
+    amount = np.nan_to_num(columns["amount"])
+    probability = np.nan_to_num(columns["probability"])
+    close_date = columns["close_date"]
+    weighted = amount * probability / 100
+
+    position = {name: i for i, name in enumerate(STAGE_ORDER)}
+    # Funnel position per row; -1 for closed_lost and unknown stages
+    stage_rank = np.array([position.get(name, -1) for name in labels] + [-1], dtype=np.int64)[codes]
+    won = codes == (labels.index(WON_STAGE) if WON_STAGE in labels else -1)
+    lost = codes == (labels.index(LOST_STAGE) if LOST_STAGE in labels else -1)
+    open_ = ~(won | lost)
+
+    # reached[i]: opportunities that got at least as far as STAGE_ORDER[i].
+    # Lost deals entered the funnel but we don't know where they dropped out.
+    reached = np.bincount(stage_rank[stage_rank >= 0], minlength=len(STAGE_ORDER))[::-1].cumsum()[::-1]
+    reached[0] += int(lost.sum())
+    conversions = [
+        {
+            "from_stage": STAGE_ORDER[i],
+            "to_stage": STAGE_ORDER[i + 1],
+            "reached": int(reached[i]),
+            "converted": int(reached[i + 1]),
+            "rate": float(reached[i + 1] / reached[i]) if reached[i] else None,
+        }
+        for i in range(len(STAGE_ORDER) - 1)
+    ]
+
+    # Age in the current stage: time since it was entered
+    age_days = (now - columns["entered_at"]) / DAY_SECONDS
+    counts = np.bincount(codes, minlength=len(labels))
+    age_sums = np.bincount(codes, weights=age_days, minlength=len(labels))
+    time_in_stage = [
+        {"stage": name or None, "count": int(counts[i]), "avg_days_in_stage": float(age_sums[i] / counts[i])}
+        for i, name in sorted(enumerate(labels), key=lambda item: item[1])
+        if name not in (WON_STAGE, LOST_STAGE)
+    ]
+
+    closed = int(won.sum() + lost.sum())
+    cycle_days = (columns["entered_at"][won] - columns["created_at"][won]) / DAY_SECONDS
+
+    # Forecast: open pipeline and won revenue bucketed by close_date
+    dated = ~np.isnan(close_date)
+    forecast = []
+    if dated.any():
+        index = _period_index(close_date[dated], period)
+        first = index.min()
+        bucket = index - first
+        size = int(bucket.max()) + 1
+        open_dated = open_[dated].astype(float)
+        won_dated = won[dated]
+        rows = np.bincount(bucket, minlength=size)
+        open_count = np.bincount(bucket, weights=open_dated, minlength=size)
+        pipeline = np.bincount(bucket, weights=amount[dated] * open_dated, minlength=size)
+        expected = np.bincount(bucket, weights=weighted[dated] * open_dated, minlength=size)
+        won_amount = np.bincount(bucket, weights=amount[dated] * won_dated, minlength=size)
+        for i in np.flatnonzero(rows):
+            start = np.datetime64(int(first + i), "M").astype("datetime64[D]").astype(object)
+            label = f"{start.year}-{start.month:02d}" if period == "month" else f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+            forecast.append({
+                "period": label,
+                "start": start,
+                "open_count": int(open_count[i]),
+                "pipeline_amount": float(pipeline[i]),
+                "expected_amount": float(expected[i]),
+                "won_amount": float(won_amount[i]),
+            })
+
+    return {
+        "computed_at": datetime.fromtimestamp(now, tz=timezone.utc),
+        "period": period,
+        "opportunity_count": int(codes.size),
+        "open_count": int(open_.sum()),
+        "win_rate": float(won.sum() / closed) if closed else None,
+        "avg_sales_cycle_days": _mean(cycle_days),
+        "conversions": conversions,
+        "time_in_stage": time_in_stage,
+        "forecast": forecast,
+    }
+
+class AnalyticsService:
+    """Per-tenant analytics cached until the tenant's next opportunity write.
+
+    Entries are tagged with the opportunities write counter (TableVersion,
+    bumped at the commit of every transaction writing the table), so a
+    cached result is served only while that counter is unchanged.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # (schema, period) -> (version, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def current_version(db: Session) -> int:
+        version = db.query(TableVersion.version).filter(TableVersion.table_name == "opportunities").scalar()
+        return version or 0
+
+    def get_pipeline_analytics(self, db: Session, schema_name: str, period: str = "month") -> dict:
+        # Read the version before the data: a concurrent write can only make
+        # the cached entry look older than it is, never newer
+        version = self.current_version(db)
+        key = (schema_name, period)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        result = compute(load_columns(db), period)
+        with self._lock:
+            self._entries[key] = (version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return result
+
+analytics_service = AnalyticsService(settings.ANALYTICS_CACHE_SIZE)
@@ -0,0 +1,134 @@
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+from app.models.crm import Contact, Lead, Opportunity
+from app.services.crm import VersionConflict
+from app.schemas.crm import (
+    ContactCreate, ContactUpdate, LeadCreate, LeadUpdate, OpportunityCreate, OpportunityUpdate,
+    CONTACT_FIELDS, LEAD_FIELDS, OPPORTUNITY_FIELDS,
+)
+
+# SQLSTATE -> HTTP status for transient failures; the batch can be retried as is
+RETRYABLE_ERRORS = {
+    "40P01": 409,  # deadlock_detected
+    "40001": 409,  # serialization_failure
+    "55P03": 503,  # lock_not_available (lock_timeout)
+    "57014": 503,  # query_canceled (statement_timeout)
+}
+RETRY_AFTER_SECONDS = 1
+
+# entity -> (model, create schema, update schema, columns returned)
+BATCH_TARGETS = {
+    "contacts": (Contact, ContactCreate, ContactUpdate, CONTACT_FIELDS),
+    "leads": (Lead, LeadCreate, LeadUpdate, LEAD_FIELDS),
+    "opportunities": (Opportunity, OpportunityCreate, OpportunityUpdate, OPPORTUNITY_FIELDS),
+}
+
+class BatchError(Exception):
+    """Operation `index` failed; the whole batch was rolled back"""
+
+    def __init__(self, index: int, status_code: int, message: str, retry_after: int = None):
+        super().__init__(message)
+        self.index = index
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+def _resolve(value, refs: dict):
+    """'$name' -> id created by the operation with ref 'name'"""
+    if isinstance(value, str) and value.startswith("$"):
+        if value[1:] not in refs:
+            raise KeyError(value)
+        return refs[value[1:]]
+    return value
+
+def _describe(e: Exception):
+    """(HTTP status, message, Retry-After) for an operation failure, None if unexpected"""
+    if isinstance(e, ValidationError):
+        return 422, "; ".join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()), None
+    if isinstance(e, KeyError):
+        return 400, f"Unknown reference {e.args[0]}", None
+    if isinstance(e, VersionConflict):
+        return 412, str(e), None
+    if isinstance(e, LookupError):
+        return 404, str(e), None
+    if isinstance(e, ValueError):
+        return 400, str(e), None
+    if isinstance(e, IntegrityError):
+        return 409, str(e.orig).strip(), None
+    if isinstance(e, DBAPIError):
+        status_code = RETRYABLE_ERRORS.get(getattr(e.orig, "pgcode", None))
+        if status_code is not None:
+            return status_code, str(e.orig).strip(), RETRY_AFTER_SECONDS
+        if isinstance(e, OperationalError):
+            return None  # connection lost, server shutting down, ...: a 500
+        return 400, str(e.orig).strip(), None
+    return None
+
+class BatchService:
+    @staticmethod
+    def _run_one(db: Session, operation, refs: dict) -> dict:
+        model, create_schema, update_schema, fields = BATCH_TARGETS[operation.entity]
+        returning = [getattr(model, name) for name in fields]
+        data = {key: _resolve(value, refs) for key, value in (operation.data or {}).items()}
+
+        if operation.op == "create":
+            values = create_schema.model_validate(data).model_dump()
+            row = db.execute(insert(model).values(**values).returning(*returning)).one()
+        else:
+            if operation.id is None:
+                raise ValueError(f"{operation.op} needs an id")
+            obj_id = int(_resolve(operation.id, refs))
+            if operation.op == "delete":
+                row = db.execute(delete(model).where(model.id == obj_id).returning(model.id)).first()
+            else:
+                values = update_schema.model_validate(data).model_dump(exclude_unset=True)
+                if not values:
+                    raise ValueError("update needs at least one field in data")
+                stmt = update(model).where(model.id == obj_id)
+                if operation.version is not None:
+                    stmt = stmt.where(model.version == operation.version)
+                row = db.execute(stmt.values(**values, version=model.version + 1).returning(*returning)).first()
+                if row is None and operation.version is not None:
+                    current = db.execute(select(model.version).where(model.id == obj_id)).scalar()
+                    if current is not None:
+                        raise VersionConflict(current)
+            if row is None:
+                raise LookupError(f"{operation.entity} {obj_id} not found")
+
+        result = {"op": operation.op, "entity": operation.entity, "id": row.id, "ref": operation.ref}
+        if operation.op != "delete":
+            result["data"] = dict(zip(fields, row))
+        return result
+
+    @staticmethod
+    def run(db: Session, operations) -> list:
+        """Apply the operations in order in one transaction (one commit).
+
+        Each write is a single INSERT/UPDATE/DELETE ... RETURNING, so no row
+        is read back after the commit. The first failure rolls everything
+        back and raises BatchError.
+        """
+        refs, results = {}, []
+        for index, operation in enumerate(operations):
+            try:
+                if operation.ref is not None:
+                    if operation.op != "create":
+                        raise ValueError("ref is only valid on create")
+                    if operation.ref in refs:
+                        raise ValueError(f"ref '{operation.ref}' is already used")
+                result = BatchService._run_one(db, operation, refs)
+            except Exception as e:
+                db.rollback()
+                described = _describe(e)
+                if described is None:
+                    raise
+                raise BatchError(index, *described) from e
+            if operation.ref is not None:
+                refs[operation.ref] = result["id"]
+            results.append({"index": index, **result})
+        db.commit()
+        return results
+
+batch_service = BatchService()
@@ -0,0 +1,173 @@
+import csv
+import io
+import json
+import tempfile
+import time
+from typing import Iterator, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+# Uploads larger than this spill from memory to a temporary file
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+async def spool_request_body(request) -> tempfile.SpooledTemporaryFile:
+    """Stream the raw request body into a spooled temp file without buffering it whole"""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+# Media type -> import format. A plain JSON document (application/json) is
+# not line-delimited, so it is not accepted as NDJSON.
+CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+class UnsupportedContentType(ValueError):
+    """The request body's Content-Type is not an import format"""
+    pass
+
+def detect_format(content_type: str) -> str:
+    """Import format for a Content-Type header; a missing header means CSV"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if not media_type:
+        return "csv"
+    try:
+        return CONTENT_TYPE_FORMATS[media_type]
+    except KeyError:
+        raise UnsupportedContentType(
+            f"Unsupported Content-Type {media_type!r}; use {', '.join(CONTENT_TYPE_FORMATS)} or ?format="
+        )
+
+def _copy_text(value) -> str:
+    """Encode one value for COPY ... FROM STDIN (text format)"""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+def _supports_copy(connection) -> bool:
+    return connection.dialect.driver == "psycopg2"
+
+def _db_error_message(error: DBAPIError) -> str:
+    """The driver's message and DETAIL line, without the echoed COPY data"""
+    lines = str(error.orig).strip().splitlines()
+    return " ".join(line.strip() for line in lines if line.strip() and not line.startswith("CONTEXT:"))
+
+class BulkImportService:
+    @staticmethod
+    def iter_records(upload, fmt: str) -> Iterator[Tuple[int, object]]:
+        """Yield (row number, raw record); unparsable rows yield an Exception instead"""
+        text_stream = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+        if fmt == "ndjson":
+            for row_number, line in enumerate(text_stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield row_number, json.loads(line)
+                except ValueError as e:
+                    yield row_number, e
+        else:
+            reader = csv.DictReader(text_stream)
+            # Row 1 is the header line
+            for row_number, record in enumerate(reader, start=2):
+                if None in record:
+                    # DictReader files cells beyond the header under the key None
+                    yield row_number, ValueError(f"{len(record[None])} more field(s) than the header has")
+                    continue
+                yield row_number, {key: (value if value != "" else None) for key, value in record.items()}
+
+    @staticmethod
+    def _write_chunk(db: Session, model, columns, rows):
+        """Insert one chunk with COPY where the driver supports it, else a multi-row INSERT"""
+        connection = db.connection()
+        if not _supports_copy(connection):
+            db.execute(insert(model), rows)
+            return
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_text(row[column]) for column in columns))
+            buffer.write("\n")
+        buffer.seek(0)
+        statement = f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN"
+        dbapi = connection.dialect.dbapi
+        with connection.connection.driver_connection.cursor() as cursor:
+            try:
+                cursor.copy_expert(statement, buffer)
+            except dbapi.Error as e:
+                # The raw cursor bypasses SQLAlchemy: wrap like the INSERT path would
+                raise DBAPIError.instance(statement, None, e, dbapi.Error, dialect=connection.dialect) from e
+
+    @staticmethod
+    def import_rows(db: Session, model, create_schema, upload, fmt: str) -> dict:
+        """Validate and load rows in chunked transactions, collecting per-row errors"""
+        started = time.perf_counter()
+        columns = list(create_schema.model_fields)
+        chunk_size = settings.BULK_IMPORT_CHUNK_SIZE
+        report = {"inserted": 0, "failed": 0, "chunks": 0, "errors": []}
+
+        def record_error(row, error):
+            report["failed"] += 1
+            if len(report["errors"]) < settings.BULK_IMPORT_MAX_ERRORS:
+                report["errors"].append({"row": row, "error": error})
+
+        def write(rows):
+            """Load [(row number, values)]; when the database rejects them, split
+            the rows in halves and retry each, down to the single failing rows"""
+            try:
+                BulkImportService._write_chunk(db, model, columns, [values for _, values in rows])
+                db.commit()
+                report["inserted"] += len(rows)
+            except OperationalError:
+                # Lost connection, timeout, deadlock: not the rows' fault
+                db.rollback()
+                raise
+            except DBAPIError as e:
+                db.rollback()
+                if len(rows) == 1:
+                    record_error(rows[0][0], _db_error_message(e))
+                    return
+                middle = len(rows) // 2
+                write(rows[:middle])
+                write(rows[middle:])
+
+        def flush(chunk):
+            write(chunk)
+            report["chunks"] += 1
+
+        chunk = []
+        for row_number, record in BulkImportService.iter_records(upload, fmt):
+            if isinstance(record, Exception):
+                record_error(row_number, f"Unparsable row: {record}")
+                continue
+            try:
+                validated = create_schema.model_validate(record)
+            except ValidationError as e:
+                record_error(row_number, "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            chunk.append((row_number, validated.model_dump()))
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+
+        elapsed = time.perf_counter() - started
+        report["elapsed_seconds"] = round(elapsed, 3)
+        report["rows_per_second"] = round(report["inserted"] / elapsed, 1) if elapsed else None
+        return report
+
+bulk_import_service = BulkImportService()
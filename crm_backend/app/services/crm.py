@@ -1,17 +1,124 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import Optional, Sequence, get_args
 from app.models.crm import Contact, Lead, Opportunity
-from app.schemas.crm import ContactCreate, LeadCreate, OpportunityCreate
+from app.schemas.crm import (
+    ContactCreate, LeadCreate, OpportunityCreate,
+    ContactSortField, LeadSortField, OpportunitySortField,
+    CONTACT_FIELDS, LEAD_FIELDS, OPPORTUNITY_FIELDS
+)
+from app.services.pagination import keyset_select, build_page, row_select, build_row_page, apply_filters
+
+SORTABLE_FIELDS = {
+    Contact: get_args(ContactSortField),
+    Lead: get_args(LeadSortField),
+    Opportunity: get_args(OpportunitySortField),
+}
+
+# Columns returned by writes that use RETURNING
+RESPONSE_FIELDS = {
+    Contact: CONTACT_FIELDS,
+    Lead: LEAD_FIELDS,
+    Opportunity: OPPORTUNITY_FIELDS,
+}
+
+class VersionConflict(Exception):
+    """The row changed since the version the client last read"""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Version conflict: the current version is {current_version}")
+        self.current_version = current_version
+
+def list_loaders(model, include: Sequence[str]):
+    """Eager loads for a page: one extra `WHERE id IN (...)` query per relationship,
+    leaving the keyset query itself untouched"""
+    return [selectinload(getattr(model, name)) for name in include]
+
+def detail_loaders(model, include: Sequence[str]):
+    """Eager loads for a single row: joined into the same query"""
+    return [joinedload(getattr(model, name)) for name in include]
 
 class CRMService:
+    @staticmethod
+    def _page(db: Session, model, cursor: Optional[str], limit: int, sort: str, order: str, filters: dict = None,
+              include: Sequence[str] = (), fields: Optional[Sequence[str]] = None) -> dict:
+        """One keyset page: {"items": [...], "next_cursor": str | None}
+
+        With `fields`, only those columns are selected and items are plain
+        dicts built from the row tuples (no ORM objects); otherwise items are
+        ORM objects with the `include` relationships loaded.
+        """
+        if fields is not None:
+            stmt, keys = row_select(model, fields, sort)
+            stmt = keyset_select(model, sort, order, cursor, limit, stmt=stmt, filters=filters, allowed_sorts=SORTABLE_FIELDS[model])
+            return build_row_page(db.execute(stmt).all(), keys, sort, order, limit)
+        stmt = keyset_select(model, sort, order, cursor, limit, filters=filters, allowed_sorts=SORTABLE_FIELDS[model])
+        rows = db.execute(stmt.options(*list_loaders(model, include))).scalars().all()
+        return build_page(rows, sort, order, limit)
+
+    @staticmethod
+    def _get(db: Session, model, obj_id: int, include: Sequence[str] = ()):
+        return db.query(model).options(*detail_loaders(model, include)).filter(model.id == obj_id).first()
+
+    @staticmethod
+    def patch(db: Session, model, obj_id: int, values: dict, expected_version: Optional[int] = None,
+              commit: bool = True) -> Optional[dict]:
+        """Partial update as one UPDATE ... RETURNING, bumping the row version.
+
+        With `expected_version` the UPDATE only matches that version, so a
+        concurrent edit raises VersionConflict instead of being overwritten.
+        Returns None when the row does not exist.
+        """
+        stmt = update(model).where(model.id == obj_id)
+        if expected_version is not None:
+            stmt = stmt.where(model.version == expected_version)
+        fields = RESPONSE_FIELDS[model]
+        stmt = stmt.values(**values, version=model.version + 1).returning(*[getattr(model, name) for name in fields])
+        row = db.execute(stmt).first()
+        if row is None:
+            # Only on failure: tell a missing row from a stale version
+            current = db.execute(select(model.version).where(model.id == obj_id)).scalar()
+            db.rollback()
+            if current is None:
+                return None
+            raise VersionConflict(current)
+        if commit:
+            db.commit()
+        return dict(zip(fields, row))
+
+    @staticmethod
+    def bulk_update(db: Session, model, filters: dict, patch: dict, dry_run: bool = False) -> dict:
+        """One set-based UPDATE ... WHERE <filters>; with dry_run, only count the matches"""
+        if dry_run:
+            return {"affected": CRMService._count(db, model, filters), "dry_run": True}
+        stmt = apply_filters(update(model), model, filters).values(**patch, version=model.version + 1)
+        result = db.execute(stmt.execution_options(synchronize_session=False))
+        db.commit()
+        return {"affected": result.rowcount, "dry_run": False}
+
+    @staticmethod
+    def bulk_delete(db: Session, model, filters: dict, dry_run: bool = False) -> dict:
+        """One set-based DELETE ... WHERE <filters>; with dry_run, only count the matches"""
+        if dry_run:
+            return {"affected": CRMService._count(db, model, filters), "dry_run": True}
+        stmt = apply_filters(delete(model), model, filters)
+        result = db.execute(stmt.execution_options(synchronize_session=False))
+        db.commit()
+        return {"affected": result.rowcount, "dry_run": False}
+
+    @staticmethod
+    def _count(db: Session, model, filters: dict) -> int:
+        return db.execute(apply_filters(select(func.count()).select_from(model), model, filters)).scalar_one()
+
     # Contact methods
     @staticmethod
-    def get_contacts(db: Session, skip: int = 0, limit: int = 100) -> List[Contact]:
-        return db.query(Contact).offset(skip).limit(limit).all()
+    def get_contacts(db: Session, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", order: str = "asc", filters: dict = None,
+                     fields: Optional[Sequence[str]] = None) -> dict:
+        return CRMService._page(db, Contact, cursor, limit, sort, order, filters, fields=fields)
     
     @staticmethod
     def get_contact(db: Session, contact_id: int) -> Optional[Contact]:
-        return db.query(Contact).filter(Contact.id == contact_id).first()
+        return CRMService._get(db, Contact, contact_id)
     
     @staticmethod
     def create_contact(db: Session, contact: ContactCreate) -> Contact:
@@ -51,8 +158,13 @@ class CRMService:
         return db_lead
     
     @staticmethod
-    def get_leads(db: Session, skip: int = 0, limit: int = 100) -> List[Lead]:
-        return db.query(Lead).offset(skip).limit(limit).all()
+    def get_leads(db: Session, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", order: str = "asc", filters: dict = None,
+                  include: Sequence[str] = (), fields: Optional[Sequence[str]] = None) -> dict:
+        return CRMService._page(db, Lead, cursor, limit, sort, order, filters, include, fields)
+
+    @staticmethod
+    def get_lead(db: Session, lead_id: int, include: Sequence[str] = ()) -> Optional[Lead]:
+        return CRMService._get(db, Lead, lead_id, include)
     
     @staticmethod
     def update_lead(db: Session, lead_id: int, lead_update: LeadCreate) -> Optional[Lead]:
@@ -80,8 +192,13 @@ class CRMService:
         return db_opportunity
     
     @staticmethod
-    def get_opportunities(db: Session, skip: int = 0, limit: int = 100) -> List[Opportunity]:
-        return db.query(Opportunity).offset(skip).limit(limit).all()
+    def get_opportunities(db: Session, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", order: str = "asc", filters: dict = None,
+                          include: Sequence[str] = (), fields: Optional[Sequence[str]] = None) -> dict:
+        return CRMService._page(db, Opportunity, cursor, limit, sort, order, filters, include, fields)
+
+    @staticmethod
+    def get_opportunity(db: Session, opportunity_id: int, include: Sequence[str] = ()) -> Optional[Opportunity]:
+        return CRMService._get(db, Opportunity, opportunity_id, include)
 
     @staticmethod
     def update_opportunity(db: Session, opportunity_id: int, opportunity_update: OpportunityCreate) -> Optional[Opportunity]:
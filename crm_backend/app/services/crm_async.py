@@ -0,0 +1,105 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Sequence
+from app.models.crm import Contact, Lead, Opportunity
+from app.schemas.crm import ContactCreate, LeadCreate, OpportunityCreate
+from app.services.crm import SORTABLE_FIELDS, list_loaders, detail_loaders
+from app.services.pagination import keyset_select, build_page, row_select, build_row_page
+
+class AsyncCRMService:
+    """AsyncSession versions of the CRMService methods (DB_ASYNC)"""
+
+    @staticmethod
+    async def _page(db: AsyncSession, model, cursor: Optional[str], limit: int, sort: str, order: str, filters: dict = None,
+                    include: Sequence[str] = (), fields: Optional[Sequence[str]] = None) -> dict:
+        if fields is not None:
+            stmt, keys = row_select(model, fields, sort)
+            stmt = keyset_select(model, sort, order, cursor, limit, stmt=stmt, filters=filters, allowed_sorts=SORTABLE_FIELDS[model])
+            result = await db.execute(stmt)
+            return build_row_page(result.all(), keys, sort, order, limit)
+        stmt = keyset_select(model, sort, order, cursor, limit, filters=filters, allowed_sorts=SORTABLE_FIELDS[model])
+        result = await db.execute(stmt.options(*list_loaders(model, include)))
+        return build_page(result.scalars().all(), sort, order, limit)
+
+    @staticmethod
+    async def _get(db: AsyncSession, model, obj_id: int, include: Sequence[str] = ()):
+        return await db.get(model, obj_id, options=detail_loaders(model, include))
+
+    @staticmethod
+    async def _create(db: AsyncSession, model, data):
+        db_obj = model(**data.dict())
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    @staticmethod
+    async def _update(db: AsyncSession, model, obj_id: int, data):
+        db_obj = await db.get(model, obj_id)
+        if db_obj:
+            for key, value in data.dict().items():
+                setattr(db_obj, key, value)
+            await db.commit()
+            await db.refresh(db_obj)
+        return db_obj
+
+    @staticmethod
+    async def _delete(db: AsyncSession, model, obj_id: int) -> bool:
+        db_obj = await db.get(model, obj_id)
+        if db_obj:
+            await db.delete(db_obj)
+            await db.commit()
+            return True
+        return False
+
+    # Contact methods
+    async def get_contacts(self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", order: str = "asc", filters: dict = None,
+                           fields: Optional[Sequence[str]] = None) -> dict:
+        return await self._page(db, Contact, cursor, limit, sort, order, filters, fields=fields)
+
+    async def get_contact(self, db: AsyncSession, contact_id: int) -> Optional[Contact]:
+        return await self._get(db, Contact, contact_id)
+
+    async def create_contact(self, db: AsyncSession, contact: ContactCreate) -> Contact:
+        return await self._create(db, Contact, contact)
+
+    async def update_contact(self, db: AsyncSession, contact_id: int, contact_update: ContactCreate) -> Optional[Contact]:
+        return await self._update(db, Contact, contact_id, contact_update)
+
+    async def delete_contact(self, db: AsyncSession, contact_id: int) -> bool:
+        return await self._delete(db, Contact, contact_id)
+
+    # Lead methods
+    async def get_leads(self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", order: str = "asc", filters: dict = None,
+                        include: Sequence[str] = (), fields: Optional[Sequence[str]] = None) -> dict:
+        return await self._page(db, Lead, cursor, limit, sort, order, filters, include, fields)
+
+    async def get_lead(self, db: AsyncSession, lead_id: int, include: Sequence[str] = ()) -> Optional[Lead]:
+        return await self._get(db, Lead, lead_id, include)
+
+    async def create_lead(self, db: AsyncSession, lead: LeadCreate) -> Lead:
+        return await self._create(db, Lead, lead)
+
+    async def update_lead(self, db: AsyncSession, lead_id: int, lead_update: LeadCreate) -> Optional[Lead]:
+        return await self._update(db, Lead, lead_id, lead_update)
+
+    async def delete_lead(self, db: AsyncSession, lead_id: int) -> bool:
+        return await self._delete(db, Lead, lead_id)
+
+    # Opportunity methods
+    async def get_opportunities(self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, sort: str = "id", order: str = "asc", filters: dict = None,
+                                include: Sequence[str] = (), fields: Optional[Sequence[str]] = None) -> dict:
+        return await self._page(db, Opportunity, cursor, limit, sort, order, filters, include, fields)
+
+    async def get_opportunity(self, db: AsyncSession, opportunity_id: int, include: Sequence[str] = ()) -> Optional[Opportunity]:
+        return await self._get(db, Opportunity, opportunity_id, include)
+
+    async def create_opportunity(self, db: AsyncSession, opportunity: OpportunityCreate) -> Opportunity:
+        return await self._create(db, Opportunity, opportunity)
+
+    async def update_opportunity(self, db: AsyncSession, opportunity_id: int, opportunity_update: OpportunityCreate) -> Optional[Opportunity]:
+        return await self._update(db, Opportunity, opportunity_id, opportunity_update)
+
+    async def delete_opportunity(self, db: AsyncSession, opportunity_id: int) -> bool:
+        return await self._delete(db, Opportunity, opportunity_id)
+
+async_crm_service = AsyncCRMService()
@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.shards import shard_url
+from app.models.tenant import Tenant
+from app.services.stats import CLOSED_STAGES
+
+# One round trip per tenant; leads and opportunities come from the
+# trigger-maintained summary tables, contacts have none and are counted
+_CLOSED = ", ".join(f"'{stage}'" for stage in CLOSED_STAGES)
+TENANT_REPORT_QUERY = f"""
+    SELECT
+        (SELECT count(*) FROM {{schema}}.contacts) AS contacts,
+        (SELECT coalesce(sum(lead_count), 0) FROM {{schema}}.lead_status_counts) AS leads,
+        coalesce(sum(s.opportunity_count), 0) AS opportunities,
+        coalesce(sum(s.opportunity_count) FILTER (WHERE s.stage NOT IN ({_CLOSED})), 0) AS open_opportunities,
+        coalesce(sum(s.amount_total) FILTER (WHERE s.stage NOT IN ({_CLOSED})), 0) AS open_amount,
+        coalesce(sum(s.weighted_total) FILTER (WHERE s.stage NOT IN ({_CLOSED})), 0) AS weighted_pipeline,
+        coalesce(sum(s.amount_total) FILTER (WHERE s.stage = 'closed_won'), 0) AS won_amount
+    FROM {{schema}}.opportunity_stage_totals s
+"""
+
+COUNT_FIELDS = ("contacts", "leads", "opportunities", "open_opportunities")
+AMOUNT_FIELDS = ("open_amount", "weighted_pipeline", "won_amount")
+REPORT_FIELDS = COUNT_FIELDS + AMOUNT_FIELDS
+
+class TenantFanoutService:
+    """Runs the tenant report query across every tenant schema concurrently.
+
+    Queries run on ADMIN_FANOUT_WORKERS threads, with connections from a pool
+    of the same size per shard, so a report never competes with API requests
+    for connections and concurrent reports simply queue. Every tenant's query
+    runs under statement_timeout; one that exceeds it is reported as
+    "timeout" while the others carry on.
+    """
+
+    def __init__(self, workers: int):
+        self._workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fanout")
+        self._engines = {}  # shard -> engine
+        self._lock = threading.Lock()
+
+    def _get_engine(self, shard: str):
+        with self._lock:
+            engine = self._engines.get(shard)
+            if engine is None:
+                engine = self._engines[shard] = create_engine(
+                    shard_url(shard),
+                    pool_size=self._workers,
+                    max_overflow=0,
+                    pool_pre_ping=True,
+                )
+            return engine
+
+    @staticmethod
+    def report_tenants(db: Session):
+        """(id, name, schema_name, shard) of the tenants whose schemas are in use"""
+        return (
+            db.query(Tenant.id, Tenant.name, Tenant.schema_name, Tenant.shard)
+            .filter(Tenant.status == "ready")
+            .order_by(Tenant.id)
+            .all()
+        )
+
+    def _query_tenant(self, tenant_id: int, name: str, schema_name: str, shard: str) -> dict:
+        row = {"type": "tenant", "tenant_id": tenant_id, "name": name, "schema_name": schema_name, "shard": shard}
+        started = time.perf_counter()
+        try:
+            with self._get_engine(shard).begin() as conn:
+                conn.execute(
+                    text("SELECT set_config('statement_timeout', :timeout, true)"),
+                    {"timeout": f"{settings.ADMIN_FANOUT_TIMEOUT_MS}ms"},
+                )
+                values = conn.execute(text(TENANT_REPORT_QUERY.format(schema=schema_name))).one()._mapping
+            row["status"] = "ok"
+            row.update({field: int(values[field]) for field in COUNT_FIELDS})
+            row.update({field: float(values[field]) for field in AMOUNT_FIELDS})
+        except DBAPIError as e:
+            if getattr(e.orig, "pgcode", None) == "57014":  # query_canceled
+                row["status"] = "timeout"
+            else:
+                row["status"] = "error"
+                row["error"] = str(e.orig).strip()[:500]
+        except Exception as e:
+            row["status"] = "error"
+            row["error"] = str(e)[:500]
+        row["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return row
+
+    def stream(self, tenants):
+        """NDJSON: one line per tenant in completion order, then a totals line"""
+        started = time.perf_counter()
+        futures = [self._executor.submit(self._query_tenant, *tenant) for tenant in tenants]
+        totals = dict.fromkeys(REPORT_FIELDS, 0)
+        counts = {"ok": 0, "timeout": 0, "error": 0}
+        try:
+            for future in as_completed(futures):
+                row = future.result()
+                counts[row["status"]] += 1
+                if row["status"] == "ok":
+                    for field in REPORT_FIELDS:
+                        totals[field] += row[field]
+                yield json.dumps(row) + "\n"
+        finally:
+            # Client gone: don't run the tenants that haven't started yet
+            for future in futures:
+                future.cancel()
+        totals.update(
+            type="total",
+            tenants=len(futures),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+            **counts,
+        )
+        yield json.dumps(totals) + "\n"
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for engine in engines:
+            engine.dispose()
+
+tenant_fanout_service = TenantFanoutService(settings.ADMIN_FANOUT_WORKERS)
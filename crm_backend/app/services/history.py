@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import and_, exists, func, select, true, tuple_
+from sqlalchemy.orm import Session, aliased
+from app.models.crm import Lead, Opportunity
+from app.models.history import (
+    LeadStatusChange, OpportunityStageChange, LEAD_TERMINAL_STATUSES, OPPORTUNITY_TERMINAL_STAGES,
+)
+from app.services.analytics import STAGE_ORDER
+
+# entity -> (history model, key column, CRM model, tracked column, label column, values in funnel order, terminal values)
+HISTORY_TARGETS = {
+    "leads": (
+        LeadStatusChange, LeadStatusChange.lead_id, Lead, Lead.status, Lead.title,
+        ("new", "contacted", "qualified"), LEAD_TERMINAL_STATUSES,
+    ),
+    "opportunities": (
+        OpportunityStageChange, OpportunityStageChange.opportunity_id, Opportunity, Opportunity.stage, Opportunity.name,
+        STAGE_ORDER, OPPORTUNITY_TERMINAL_STAGES,
+    ),
+}
+
+def _window(since: Optional[datetime], until: Optional[datetime]):
+    until = until or datetime.now(timezone.utc)
+    return since or until - timedelta(days=90), until
+
+def _funnel_order(values, order):
+    position = {value: i for i, value in enumerate(order)}
+    return sorted(values, key=lambda value: (position.get(value, len(order)), value or ""))
+
+class HistoryService:
+    """Funnel, velocity and stuck-deal queries over the stage/status history.
+
+    Each one is a range scan on (changed_at) or per-row probes of
+    (<entity>_id, changed_at), never a scan of the whole history.
+    """
+
+    @staticmethod
+    def get_history(db: Session, entity: str, entity_id: int):
+        history, key = HISTORY_TARGETS[entity][:2]
+        return (
+            db.query(history)
+            .filter(key == entity_id)
+            .order_by(history.changed_at, history.id)
+            .all()
+        )
+
+    @staticmethod
+    def funnel(db: Session, entity: str, since: datetime = None, until: datetime = None) -> dict:
+        """Distinct records entering each stage within the window"""
+        history, key, _, _, _, order, _ = HISTORY_TARGETS[entity]
+        since, until = _window(since, until)
+        rows = db.execute(
+            select(history.to_value, func.count(key.distinct()))
+            .where(history.changed_at >= since, history.changed_at < until)
+            .group_by(history.to_value)
+        ).all()
+        entered = dict(rows)
+        stages = [{"stage": value, "entered": entered[value]} for value in _funnel_order(entered, order)]
+        return {"since": since, "until": until, "stages": stages}
+
+    @staticmethod
+    def velocity(db: Session, entity: str, since: datetime = None, until: datetime = None) -> dict:
+        """Average days spent in a stage, over stints that ended within the window"""
+        history, key, _, _, _, order, _ = HISTORY_TARGETS[entity]
+        since, until = _window(since, until)
+        entry = aliased(history)
+        # For every change out of a stage, the change that entered it
+        entered_at = (
+            select(entry.changed_at)
+            .where(
+                getattr(entry, key.key) == key,
+                entry.changed_at <= history.changed_at,
+                entry.id < history.id,
+            )
+            .order_by(entry.changed_at.desc(), entry.id.desc())
+            .limit(1)
+            .lateral()
+        )
+        days = func.extract("epoch", history.changed_at - entered_at.c.changed_at) / 86400
+        rows = db.execute(
+            select(history.from_value, func.count(), func.avg(days))
+            .select_from(history)
+            .join(entered_at, true())
+            .where(
+                history.changed_at >= since,
+                history.changed_at < until,
+                history.from_value.isnot(None),
+            )
+            .group_by(history.from_value)
+        ).all()
+        by_stage = {value: (count, avg_days) for value, count, avg_days in rows}
+        stages = [
+            {"stage": value, "exits": by_stage[value][0], "avg_days_in_stage": float(by_stage[value][1])}
+            for value in _funnel_order(by_stage, order)
+        ]
+        return {"since": since, "until": until, "stages": stages}
+
+    @staticmethod
+    def stuck(db: Session, entity: str, days: int = 30, limit: int = 100):
+        """Open records that have not changed stage for at least `days`, oldest first.
+
+        A range scan over the entries into an open stage before the cutoff
+        (the partial ix_<history>_open_changed_at index, in changed_at order),
+        keeping those with no later change for the record, joined to the
+        records still in that stage. It stops after `limit` matches instead
+        of probing the history of every open record.
+        """
+        history, key, model, column, label, _, terminal = HISTORY_TARGETS[entity]
+        later = aliased(history)
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        superseded = exists().where(
+            getattr(later, key.key) == key,
+            later.changed_at >= history.changed_at,
+            tuple_(later.changed_at, later.id) > tuple_(history.changed_at, history.id),
+        )
+        rows = db.execute(
+            select(model.id, label.label("label"), column.label("stage"), history.changed_at.label("since"))
+            .select_from(history)
+            .join(model, and_(model.id == key, column == history.to_value))
+            .where(history.to_value.notin_(terminal), history.changed_at < cutoff, ~superseded)
+            .order_by(history.changed_at, model.id)
+            .limit(limit)
+        ).all()
+        now = datetime.now(timezone.utc)
+        return [
+            {**row._mapping, "days_in_stage": (now - row.since).total_seconds() / 86400}
+            for row in rows
+        ]
+
+history_service = HistoryService()
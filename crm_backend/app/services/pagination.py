@@ -0,0 +1,138 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import and_, bindparam, func, or_, select, tuple_
+
+# Keyset pagination and filtering for the CRM list endpoints.
+# Rows are ordered by (sort key, id) and the cursor carries the last row's
+# values for both, so page N costs the same index range scan as page 1.
+
+SORT_FIELDS = ("id", "created_at", "updated_at")
+
+class InvalidCursor(ValueError):
+    pass
+
+def sort_column(model, sort: str, allowed=SORT_FIELDS):
+    if sort not in allowed:
+        raise InvalidCursor(f"Cannot sort by '{sort}'")
+    if sort == "updated_at":
+        # updated_at stays NULL until the first update
+        return func.coalesce(model.updated_at, model.created_at)
+    return getattr(model, sort)
+
+def sort_value(obj, sort: str):
+    if sort == "updated_at":
+        return obj.updated_at or obj.created_at
+    return getattr(obj, sort)
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def _decode_value(value, column):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return python_type(value)
+
+def encode_cursor(sort: str, order: str, value, last_id: int) -> str:
+    raw = json.dumps([sort, order, _encode_value(value), last_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, order: str, column=None):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        c_sort, c_order, value, last_id = json.loads(raw)
+        if column is not None:
+            value = _decode_value(value, column)
+        last_id = int(last_id)
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+    if (c_sort, c_order) != (sort, order):
+        raise InvalidCursor("Cursor was issued for a different sort order")
+    return value, last_id
+
+def _after_cursor(model, column, value, last_id: int, descending: bool):
+    """Rows strictly after (value, last_id) in the page ordering.
+
+    NULL sort keys come last ascending and first descending, which is the
+    order Postgres walks a plain (column, id) btree index in either direction.
+    """
+    key = tuple_(column, model.id)
+    if value is None:
+        if descending:
+            return or_(and_(column.is_(None), model.id < last_id), column.isnot(None))
+        return and_(column.is_(None), model.id > last_id)
+    after = tuple_(bindparam(None, value, type_=column.type), last_id)
+    if descending:
+        return key < after
+    return or_(key > after, column.is_(None))
+
+def apply_filters(stmt, model, filters: dict):
+    """AND together equality filters and `<field>_from` / `<field>_to` ranges (inclusive)"""
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        if key.endswith("_from"):
+            stmt = stmt.where(getattr(model, key[:-len("_from")]) >= value)
+        elif key.endswith("_to"):
+            stmt = stmt.where(getattr(model, key[:-len("_to")]) <= value)
+        else:
+            stmt = stmt.where(getattr(model, key) == value)
+    return stmt
+
+def keyset_select(model, sort: str = "id", order: str = "asc", cursor: str = None, limit: int = 100,
+                  stmt=None, filters: dict = None, allowed_sorts=SORT_FIELDS):
+    """Build a SELECT for one page; fetches limit + 1 rows to detect a next page"""
+    column = sort_column(model, sort, allowed_sorts)
+    descending = order == "desc"
+    if stmt is None:
+        stmt = select(model)
+    stmt = apply_filters(stmt, model, filters)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort, order, None if sort == "id" else column)
+        if sort == "id":
+            stmt = stmt.where(model.id < last_id if descending else model.id > last_id)
+        else:
+            stmt = stmt.where(_after_cursor(model, column, value, last_id, descending))
+
+    if sort == "id":
+        ordering = [model.id.desc() if descending else model.id.asc()]
+    elif descending:
+        ordering = [column.desc().nulls_first(), model.id.desc()]
+    else:
+        ordering = [column.asc().nulls_last(), model.id.asc()]
+    return stmt.order_by(*ordering).limit(limit + 1)
+
+def build_page(rows, sort: str, order: str, limit: int) -> dict:
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(sort, order, sort_value(last, sort), last.id)
+    return {"items": items, "next_cursor": next_cursor}
+
+def row_select(model, fields, sort: str):
+    """SELECT of just `fields` (plus id) for the tuple fast path.
+
+    Returns (stmt, keys): the first len(keys) result columns are the output
+    fields; columns the cursor needs but the caller didn't ask for follow.
+    """
+    keys = ("id",) + tuple(field for field in fields if field != "id")
+    needed = ("updated_at", "created_at") if sort == "updated_at" else (sort,)
+    extra = [name for name in needed if name not in keys]
+    return select(*[getattr(model, name) for name in keys + tuple(extra)]), keys
+
+def build_row_page(rows, keys, sort: str, order: str, limit: int) -> dict:
+    page = build_page(rows, sort, order, limit)
+    page["items"] = [dict(zip(keys, row)) for row in page["items"]]
+    return page
@@ -0,0 +1,133 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.security import principal_cache
+from app.db.session import SessionLocal
+from app.db.shards import DEFAULT_SHARD
+from app.db.tenant import tenant_manager
+from app.models.tenant import Tenant, TenantProvisioningJob, User
+
+UNFINISHED = ("pending", "running")
+
+def delete_tenant_rows(db: Session, tenant_id: int) -> list:
+    """Delete a tenant row with the users registered under it (not committed).
+
+    Returns the users' emails; invalidate them once the deletion is committed.
+    """
+    users = db.query(User).filter(User.tenant_id == tenant_id).all()
+    for user in users:
+        db.delete(user)
+    db.flush()
+    db.query(Tenant).filter(Tenant.id == tenant_id).delete(synchronize_session=False)
+    return [user.email for user in users]
+
+def invalidate_principals(emails):
+    for email in emails:
+        principal_cache.invalidate(email)
+
+class ProvisioningService:
+    """Creates tenant schemas on a small dedicated thread pool.
+
+    TenantService.create_tenant commits the tenant (status "provisioning")
+    together with a job row and returns immediately. The job runs the schema
+    template in one transaction; on success the tenant becomes "ready", on
+    failure the tenant row is deleted and the job keeps the error. Jobs are
+    claimed with a conditional UPDATE, so several processes may resume the
+    same backlog without running a job twice.
+    """
+
+    def __init__(self, workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="provision")
+
+    def submit(self, job_id: int):
+        self._executor.submit(self.run, job_id)
+
+    def resume(self):
+        """Queue jobs left unfinished by a restart (called on startup)"""
+        db = SessionLocal()
+        try:
+            job_ids = [
+                job_id for (job_id,) in
+                db.query(TenantProvisioningJob.id).filter(TenantProvisioningJob.status.in_(UNFINISHED)).order_by(TenantProvisioningJob.id)
+            ]
+        finally:
+            db.close()
+        for job_id in job_ids:
+            self.submit(job_id)
+        if job_ids:
+            print(f"Resuming {len(job_ids)} tenant provisioning job(s)")
+
+    @staticmethod
+    def _claim(db: Session, job_id: int) -> bool:
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.PROVISIONING_STALE_SECONDS)
+        claimed = db.execute(
+            update(TenantProvisioningJob)
+            .where(
+                TenantProvisioningJob.id == job_id,
+                or_(
+                    TenantProvisioningJob.status == "pending",
+                    (TenantProvisioningJob.status == "running") & (TenantProvisioningJob.started_at < stale),
+                ),
+            )
+            .values(status="running", started_at=now)
+        ).rowcount
+        db.commit()
+        return claimed == 1
+
+    @staticmethod
+    def run(job_id: int):
+        db = SessionLocal()
+        try:
+            if not ProvisioningService._claim(db, job_id):
+                return
+            job = db.get(TenantProvisioningJob, job_id)
+            removed_emails = []
+            # A rolled-back tenant of the same name may have used another shard
+            shard = db.query(Tenant.shard).filter(Tenant.id == job.tenant_id).scalar() or DEFAULT_SHARD
+            try:
+                # One transaction: on failure nothing of the schema remains
+                tenant_manager.create_tenant_schema(job.schema_name, shard)
+            except Exception as e:
+                print(f"❌ Provisioning {job.schema_name} failed, rolling back tenant {job.tenant_id}: {e}")
+                db.rollback()
+                removed_emails = delete_tenant_rows(db, job.tenant_id)
+                job.status = "failed"
+                job.error = str(e)[:2000]
+            else:
+                # A tenant deleted meanwhile stays "deleting"
+                db.query(Tenant).filter(Tenant.id == job.tenant_id, Tenant.status == "provisioning").update(
+                    {"status": "ready"}, synchronize_session=False
+                )
+                job.status = "succeeded"
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+            invalidate_principals(removed_emails)
+            tenant_manager.invalidate_tenant(job.tenant_id, job.schema_name)
+            if job.status == "succeeded":
+                tenant_manager.set_shard(job.schema_name, shard)
+                tenant_manager.mark_provisioned(job.schema_name)
+        except Exception as e:
+            # Job stays "running"; resume() retries it once it is stale
+            print(f"❌ Provisioning job {job_id} crashed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_job(db: Session, tenant_id: int):
+        """Latest provisioning job for a tenant (kept even if the tenant was rolled back)"""
+        return (
+            db.query(TenantProvisioningJob)
+            .filter(TenantProvisioningJob.tenant_id == tenant_id)
+            .order_by(TenantProvisioningJob.id.desc())
+            .first()
+        )
+
+    def shutdown(self):
+        # Queued jobs stay "pending" and are resumed on the next start
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+provisioning_service = ProvisioningService(settings.PROVISIONING_WORKERS)
@@ -0,0 +1,220 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Awaitable, Callable, Optional, Sequence
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.stats import TableVersion
+
+# Read-through cache of rendered CRM list/detail responses. Keys carry the
+# tenant's write counters (table_versions, bumped at the commit of every
+# transaction that ran an INSERT/UPDATE/DELETE/COPY on the table; see
+# app/db/summary.py) for each table the response reads, so any
+# write through any path makes the older entries unreachable; they are never
+# served again and age out of the LRU.
+
+# include name -> table it reads
+INCLUDE_TABLES = {"contact": "contacts", "lead": "leads"}
+
+CachedBody = namedtuple("CachedBody", ["body", "etag"])  # JSON bytes, ETag header or None
+
+class MemoryBackend:
+    """Process-local LRU bounded by the total size of the cached bodies"""
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> CachedBody
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedBody):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.body)
+            self._entries[key] = value
+            self.size += len(value.body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.body)
+                self.evictions += 1
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self.size -= len(self._entries.pop(key).body)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.size, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+class RedisBackend:
+    """Shared by every worker and host; needs the optional `redis` package.
+
+    Keys for superseded versions are never deleted explicitly, so each entry
+    expires after ttl_seconds; size limits are left to Redis' maxmemory policy.
+    """
+
+    name = "redis"
+    blocking = True  # network round trips: kept off the event loop by the async path
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis  # optional dependency, only needed for this backend
+
+        self.ttl_seconds = ttl_seconds
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        raw = self._client.get(key)
+        if raw is None:
+            return None
+        etag, _, body = raw.partition(b"\n")
+        return CachedBody(body, etag.decode() or None)
+
+    def set(self, key: str, value: CachedBody):
+        self._client.set(key, (value.etag or "").encode() + b"\n" + value.body, ex=self.ttl_seconds)
+
+    def delete_prefix(self, prefix: str):
+        for key in self._client.scan_iter(match=prefix + "*", count=1000):
+            self._client.delete(key)
+
+    def stats(self) -> dict:
+        return {"entries": None, "bytes": None, "max_bytes": None, "evictions": None}
+
+def make_backend():
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        if not settings.RESPONSE_CACHE_REDIS_URL:
+            raise ValueError("RESPONSE_CACHE_BACKEND=redis needs RESPONSE_CACHE_REDIS_URL")
+        return RedisBackend(settings.RESPONSE_CACHE_REDIS_URL, settings.RESPONSE_CACHE_TTL_SECONDS)
+    if settings.RESPONSE_CACHE_BACKEND != "memory":
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND {settings.RESPONSE_CACHE_BACKEND!r}")
+    return MemoryBackend(settings.RESPONSE_CACHE_MAX_BYTES)
+
+def _tenant_prefix(schema_name: str) -> str:
+    return f"crm:{schema_name}:"
+
+class ResponseCache:
+    def __init__(self, backend, enabled: bool, max_entry_bytes: int):
+        self.backend = backend
+        self.enabled = enabled
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _versions_query(tables: Sequence[str]):
+        return select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables))
+
+    @staticmethod
+    def table_versions(db: Session, tables: Sequence[str]) -> tuple:
+        rows = dict(db.execute(ResponseCache._versions_query(tables)).all())
+        return tuple(rows.get(table, 0) for table in tables)
+
+    @staticmethod
+    async def table_versions_async(db: AsyncSession, tables: Sequence[str]) -> tuple:
+        rows = dict((await db.execute(ResponseCache._versions_query(tables))).all())
+        return tuple(rows.get(table, 0) for table in tables)
+
+    @staticmethod
+    def _tables(entity: str, include: Sequence[str]) -> tuple:
+        return (entity,) + tuple(INCLUDE_TABLES[name] for name in include)
+
+    def _counted_lookup(self, value: Optional[CachedBody]) -> Optional[CachedBody]:
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return value
+
+    def _storable(self, value: Optional[CachedBody]) -> bool:
+        return value is not None and len(value.body) <= self.max_entry_bytes
+
+    def _stored(self):
+        with self._lock:
+            self.stores += 1
+
+    @staticmethod
+    def key(schema_name: str, entity: str, tables: Sequence[str], versions: tuple, params: dict) -> str:
+        digest = hashlib.sha1(orjson.dumps(params, default=str, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        stamp = ",".join(f"{table}={version}" for table, version in zip(tables, versions))
+        return f"{_tenant_prefix(schema_name)}{entity}:{stamp}:{digest}"
+
+    def get_or_load(self, db: Session, schema_name: str, entity: str, params: dict, include: Sequence[str],
+                    load: Callable[[], Optional[CachedBody]]) -> Optional[CachedBody]:
+        """Cached body for (tenant, entity, params), else load() and store it.
+
+        load() returning None (not found) is not cached.
+        """
+        if not self.enabled:
+            return load()
+        tables = self._tables(entity, include)
+        # Read the counters before the data: a concurrent write can only make
+        # the stored entry look older than it is, never newer
+        key = self.key(schema_name, entity, tables, self.table_versions(db, tables), params)
+        value = self._counted_lookup(self.backend.get(key))
+        if value is not None:
+            return value
+        value = load()
+        if self._storable(value):
+            self.backend.set(key, value)
+            self._stored()
+        return value
+
+    async def get_or_load_async(self, db: AsyncSession, schema_name: str, entity: str, params: dict,
+                                include: Sequence[str], load: Callable[[], Awaitable[Optional[CachedBody]]]) -> Optional[CachedBody]:
+        """get_or_load for an AsyncSession (DB_ASYNC) and an async load(); same keys"""
+        if not self.enabled:
+            return await load()
+        tables = self._tables(entity, include)
+        key = self.key(schema_name, entity, tables, await self.table_versions_async(db, tables), params)
+        value = self._counted_lookup(await self._call_backend(self.backend.get, key))
+        if value is not None:
+            return value
+        value = await load()
+        if self._storable(value):
+            await self._call_backend(self.backend.set, key, value)
+            self._stored()
+        return value
+
+    async def _call_backend(self, method, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    def invalidate(self, schema_name: str):
+        """Drop every entry of one tenant (e.g. when the tenant goes away)"""
+        self.backend.delete_prefix(_tenant_prefix(schema_name))
+
+    def metrics(self) -> dict:
+        with self._lock:
+            hits, misses, stores = self.hits, self.misses, self.stores
+        lookups = hits + misses
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else None,
+            "stores": stores,
+            **self.backend.stats(),
+        }
+
+response_cache = ResponseCache(make_backend(), settings.RESPONSE_CACHE_ENABLED, settings.RESPONSE_CACHE_MAX_ENTRY_BYTES)
@@ -0,0 +1,79 @@
+import re
+import time
+from sqlalchemy import func, literal, or_, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.crm import Contact, Lead, Opportunity
+
+# entity -> (model, label expression, detail expression)
+SEARCH_TARGETS = {
+    "contacts": (
+        Contact,
+        Contact.first_name + " " + Contact.last_name,
+        func.coalesce(Contact.email, Contact.company),
+    ),
+    "leads": (Lead, Lead.title, Lead.status),
+    "opportunities": (Opportunity, Opportunity.name, Opportunity.stage),
+}
+
+def prefix_tsquery(q: str) -> str:
+    """'acme cor' -> 'acme:* & cor:*' (only word characters survive)"""
+    return " & ".join(f"{word}:*" for word in re.findall(r"\w+", q.lower()))
+
+class SearchService:
+    @staticmethod
+    def _search_one(db: Session, entity: str, q: str, tsquery: str, limit: int):
+        model, label, detail = SEARCH_TARGETS[entity]
+        needle = literal(q.lower())
+        # Typo-tolerant match on the short text fields (pg_trgm, GIN indexed)
+        fuzzy = needle.op("OPERATOR(public.<%)")(model.search_text)
+        score = func.public.word_similarity(needle, model.search_text)
+        condition = fuzzy
+        if tsquery:
+            query = func.to_tsquery("simple", tsquery)
+            condition = or_(model.search_vector.op("@@")(query), fuzzy)
+            score = score + func.ts_rank(model.search_vector, query)
+        stmt = (
+            select(model.id, label.label("label"), detail.label("detail"), score.label("score"))
+            .where(condition)
+            .order_by(score.desc(), model.id)
+            .limit(limit)
+        )
+        return [dict(row._mapping) for row in db.execute(stmt)]
+
+    @staticmethod
+    def search(db: Session, q: str, entities, limit: int = 10) -> dict:
+        """Ranked hits grouped by entity, within SEARCH_TIMEOUT_MS overall.
+
+        Each group runs in its own savepoint with statement_timeout set to the
+        remaining budget; a group that runs out of time is reported in
+        timed_out instead of failing the whole search.
+        """
+        deadline = time.monotonic() + settings.SEARCH_TIMEOUT_MS / 1000
+        tsquery = prefix_tsquery(q)
+        results = {"query": q, "timed_out": []}
+        db.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+            {"threshold": str(settings.SEARCH_SIMILARITY_THRESHOLD)},
+        )
+        for entity in entities:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                results["timed_out"].append(entity)
+                continue
+            try:
+                with db.begin_nested():
+                    db.execute(
+                        text("SELECT set_config('statement_timeout', :timeout, true)"),
+                        {"timeout": f"{remaining_ms}ms"},
+                    )
+                    results[entity] = SearchService._search_one(db, entity, q, tsquery, limit)
+            except DBAPIError as e:
+                if getattr(e.orig, "pgcode", None) != "57014":  # query_canceled
+                    raise
+                results["timed_out"].append(entity)
+        db.rollback()
+        return results
+
+search_service = SearchService()
@@ -0,0 +1,79 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db.summary import SUMMARY_LOCK, rebuild_summaries
+from app.models.stats import LeadStatusCount, OpportunityStageTotal, OpportunityMonthlyClose
+
+# Stages that no longer count towards the open pipeline / expected closes
+CLOSED_STAGES = ("closed_won", "closed_lost")
+
+class StatsService:
+    """Dashboard aggregates read from the trigger-maintained summary tables"""
+
+    @staticmethod
+    def get_lead_status_counts(db: Session):
+        rows = db.query(LeadStatusCount).filter(LeadStatusCount.lead_count > 0).order_by(LeadStatusCount.status).all()
+        return [{"status": row.status or None, "count": row.lead_count} for row in rows]
+
+    @staticmethod
+    def get_pipeline(db: Session) -> dict:
+        rows = (
+            db.query(OpportunityStageTotal)
+            .filter(OpportunityStageTotal.opportunity_count > 0)
+            .order_by(OpportunityStageTotal.stage)
+            .all()
+        )
+        stages = [
+            {
+                "stage": row.stage or None,
+                "count": row.opportunity_count,
+                "amount": float(row.amount_total),
+                "weighted_amount": float(row.weighted_total),
+            }
+            for row in rows
+        ]
+        open_stages = [s for s in stages if s["stage"] not in CLOSED_STAGES]
+        return {
+            "stages": stages,
+            "open_count": sum(s["count"] for s in open_stages),
+            "open_amount": sum(s["amount"] for s in open_stages),
+            "weighted_pipeline": sum(s["weighted_amount"] for s in open_stages),
+        }
+
+    @staticmethod
+    def get_expected_closes(db: Session):
+        """Open opportunities by close_date month"""
+        rows = (
+            db.query(OpportunityMonthlyClose)
+            .filter(OpportunityMonthlyClose.opportunity_count > 0)
+            .filter(OpportunityMonthlyClose.stage.notin_(CLOSED_STAGES))
+            .order_by(OpportunityMonthlyClose.month)
+            .all()
+        )
+        months = {}
+        for row in rows:
+            month = months.setdefault(row.month, {"month": row.month, "count": 0, "amount": 0.0, "weighted_amount": 0.0})
+            month["count"] += row.opportunity_count
+            month["amount"] += float(row.amount_total)
+            month["weighted_amount"] += float(row.weighted_total)
+        return list(months.values())
+
+    @staticmethod
+    def snapshot(db: Session) -> dict:
+        return {
+            "lead_statuses": StatsService.get_lead_status_counts(db),
+            "pipeline": StatsService.get_pipeline(db),
+            "expected_closes": StatsService.get_expected_closes(db),
+        }
+
+    @staticmethod
+    def recompute(db: Session, schema_name: str) -> dict:
+        """Rebuild the summaries from scratch and report whether they had drifted"""
+        # Take the write lock first so "before" and the rebuild see the same rows
+        db.execute(text(SUMMARY_LOCK.format(schema=schema_name)))
+        before = StatsService.snapshot(db)
+        rebuild_summaries(db.connection(), schema_name)
+        db.commit()
+        after = StatsService.snapshot(db)
+        return {"consistent": before == after, "before": before, "after": after}
+
+stats_service = StatsService()
@@ -0,0 +1,137 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.shards import shard_registry
+from app.db.tenant import tenant_manager
+from app.models.tenant import Tenant
+from app.services.provisioning import delete_tenant_rows, invalidate_principals
+
+class TeardownService:
+    """Background reaper for deleted tenants.
+
+    TenantService.delete_tenant only marks the tenant "deleting". Every
+    TENANT_REAPER_INTERVAL_SECONDS this thread takes up to
+    TENANT_REAPER_BATCH_SIZE tenants past the grace period, drops each schema
+    table by table (TenantManager.drop_tenant_schema) and then deletes the
+    tenant row and its users. Tenants are claimed with FOR UPDATE SKIP LOCKED,
+    so every API process can run a reaper. A failed drop is retried next run.
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.last_run_at = None
+        self.dropped = 0
+        self.errors = {}  # schema_name -> last error
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="tenant-reaper", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(settings.TENANT_REAPER_INTERVAL_SECONDS):
+            try:
+                self.reap()
+            except Exception as e:
+                print(f"❌ Tenant reaper run failed: {e}")
+
+    @staticmethod
+    def _due_before() -> datetime:
+        return datetime.now(timezone.utc) - timedelta(seconds=settings.TENANT_TEARDOWN_GRACE_SECONDS)
+
+    def _reap_one(self, db: Session, skip) -> bool:
+        """Claim and tear down one due tenant; False when none is left"""
+        tenant = (
+            db.query(Tenant)
+            .filter(Tenant.status == "deleting", Tenant.deleted_at < self._due_before(), Tenant.id.notin_(skip))
+            .order_by(Tenant.deleted_at)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if tenant is None:
+            return False
+        skip.append(tenant.id)
+        tenant_id, schema_name = tenant.id, tenant.schema_name
+        try:
+            # The row lock is held while dropping, so no other reaper takes it
+            tenant_manager.drop_tenant_schema(schema_name, settings.TENANT_REAPER_TABLE_PAUSE_SECONDS, tenant.shard)
+            removed_emails = delete_tenant_rows(db, tenant_id)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Teardown of {schema_name} failed, retrying next run: {e}")
+            with self._lock:
+                self.errors[schema_name] = str(e)[:2000]
+            return True
+        invalidate_principals(removed_emails)
+        tenant_manager.invalidate_tenant(tenant_id, schema_name)
+        with self._lock:
+            self.errors.pop(schema_name, None)
+            self.dropped += 1
+        return True
+
+    def reap(self) -> int:
+        """One throttled batch; returns the number of tenants attempted"""
+        db = SessionLocal()
+        skip = []
+        try:
+            while len(skip) < settings.TENANT_REAPER_BATCH_SIZE and self._reap_one(db, skip):
+                pass
+        finally:
+            db.close()
+        self.last_run_at = datetime.now(timezone.utc)
+        return len(skip)
+
+    def pending(self, db: Session) -> dict:
+        """Deleted tenants whose schemas are still to be dropped, with their size"""
+        tenants = db.query(Tenant).filter(Tenant.status == "deleting").order_by(Tenant.deleted_at).all()
+        grace = timedelta(seconds=settings.TENANT_TEARDOWN_GRACE_SECONDS)
+        sizes = {}
+        shards = {}
+        for tenant in tenants:
+            shards.setdefault(tenant.shard, []).append(tenant.schema_name)
+        for shard, schemas in shards.items():
+            with shard_registry.engine(shard).connect() as conn:
+                rows = conn.execute(
+                    text("""
+                        SELECT n.nspname, count(c.oid) FILTER (WHERE c.relkind = 'r'), coalesce(sum(pg_total_relation_size(c.oid)) FILTER (WHERE c.relkind = 'r'), 0)
+                        FROM pg_namespace n
+                        LEFT JOIN pg_class c ON c.relnamespace = n.oid
+                        WHERE n.nspname = ANY(:schemas)
+                        GROUP BY n.nspname
+                    """),
+                    {"schemas": schemas},
+                ).all()
+            sizes.update({schema_name: (table_count, size) for schema_name, table_count, size in rows})
+        with self._lock:
+            errors = dict(self.errors)
+            dropped = self.dropped
+        return {
+            "reaper_running": self._thread is not None and self._thread.is_alive(),
+            "last_run_at": self.last_run_at,
+            "dropped": dropped,
+            "tenants": [
+                {
+                    "id": tenant.id,
+                    "name": tenant.name,
+                    "schema_name": tenant.schema_name,
+                    "shard": tenant.shard,
+                    "deleted_at": tenant.deleted_at,
+                    "due_at": tenant.deleted_at + grace if tenant.deleted_at else None,
+                    "tables": sizes.get(tenant.schema_name, (0, 0))[0],
+                    "bytes": int(sizes.get(tenant.schema_name, (0, 0))[1]),
+                    "last_error": errors.get(tenant.schema_name),
+                }
+                for tenant in tenants
+            ],
+        }
+
+teardown_service = TeardownService()
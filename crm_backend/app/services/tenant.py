@@ -1,33 +1,97 @@
+from datetime import timedelta
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.models.tenant import Tenant, User
+from app.core.config import settings
+from app.models.tenant import Tenant, TenantProvisioningJob, User
 from app.schemas.tenant import TenantCreate, UserCreate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, principal_cache
+from app.db.shards import place_tenant
 from app.db.tenant import tenant_manager
+from app.services.provisioning import invalidate_principals, provisioning_service
+from app.services.response_cache import response_cache
+
+class NameTaken(Exception):
+    """A tenant name (or its schema name) or a user email is already in use"""
+    pass
+
+class TeardownPending(NameTaken):
+    """The name or email still belongs to a deleted tenant: its rows and
+    schema stay until teardown_service drops them after the grace period"""
+
+    def __init__(self, what: str, tenant: Tenant):
+        due_at = tenant.deleted_at + timedelta(seconds=settings.TENANT_TEARDOWN_GRACE_SECONDS)
+        super().__init__(
+            f"{what} belongs to deleted tenant '{tenant.name}', whose teardown is pending "
+            f"(due {due_at.isoformat()}); retry once it is done"
+        )
 
 class TenantService:
+    @staticmethod
+    def check_tenant_name_free(db: Session, name: str, schema_name: str):
+        """Raise NameTaken (TeardownPending if held by a deleted tenant)"""
+        existing = db.query(Tenant).filter(or_(Tenant.name == name, Tenant.schema_name == schema_name)).first()
+        if existing is None:
+            return
+        if existing.status == "deleting":
+            raise TeardownPending(f"Tenant name '{name}'", existing)
+        raise NameTaken(f"Tenant name '{name}' is already registered")
+
+    @staticmethod
+    def check_email_free(db: Session, email: str):
+        """Raise NameTaken (TeardownPending if held by a deleted tenant's user)"""
+        existing = db.query(User).filter(User.email == email).first()
+        if existing is None:
+            return
+        if existing.tenant is not None and existing.tenant.status == "deleting":
+            raise TeardownPending(f"Email {email}", existing.tenant)
+        raise NameTaken("Email already registered")
+
     @staticmethod
     def create_tenant(db: Session, tenant: TenantCreate):
+        """Register a tenant and queue its schema for background provisioning.
+
+        The tenant is returned with status "provisioning"; CRM requests for it
+        get a 503 until the job marks it "ready" (see provisioning_service).
+        Raises NameTaken / TeardownPending when the name is in use.
+        """
         # Create schema name from tenant name (lowercase, replace spaces with underscores)
         schema_name = f"tenant_{tenant.name.lower().replace(' ', '_').replace('-', '_')}"
+        TenantService.check_tenant_name_free(db, tenant.name, schema_name)
         
-        # Create tenant in main schema
+        # Create tenant in main schema, its schema goes to the shard picked for it
         db_tenant = Tenant(
             name=tenant.name,
-            schema_name=schema_name
+            schema_name=schema_name,
+            status="provisioning",
+            shard=place_tenant(db, schema_name),
         )
         db.add(db_tenant)
+        try:
+            db.flush()
+        except IntegrityError:
+            # Registered concurrently since the check
+            db.rollback()
+            TenantService.check_tenant_name_free(db, tenant.name, schema_name)
+            raise
+        job = TenantProvisioningJob(tenant_id=db_tenant.id, tenant_name=tenant.name, schema_name=schema_name)
+        db.add(job)
         db.commit()
         db.refresh(db_tenant)
-        
-        # Create schema for the tenant with proper name
-        tenant_manager.create_tenant_schema(schema_name)
-        
+
+        provisioning_service.submit(job.id)
         return db_tenant
     
     @staticmethod
-    def create_user(db: Session, user: UserCreate):
-        """Create user either as admin (global) or under a tenant."""
-        hashed_password = get_password_hash(user.password)
+    def create_user(db: Session, user: UserCreate, hashed_password: str = None):
+        """Create user either as admin (global) or under a tenant.
+
+        Pass hashed_password when it was already computed off-thread by
+        password_hasher; otherwise the password is hashed inline. Raises
+        NameTaken / TeardownPending when the email is in use.
+        """
+        if hashed_password is None:
+            hashed_password = get_password_hash(user.password)
         db_user = User(
             email=user.email,
             hashed_password=hashed_password,
@@ -36,7 +100,12 @@ class TenantService:
             is_superuser=getattr(user, "is_superuser", False)
         )
         db.add(db_user)
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            TenantService.check_email_free(db, user.email)
+            raise
         db.refresh(db_user)
         return db_user
 
@@ -46,29 +115,45 @@ class TenantService:
         return db.query(User).filter(User.email == email).first()
     @staticmethod
     def get_all_tenants(db: Session):
-        """Return all tenants for admin view"""
-        return db.query(Tenant).order_by(Tenant.id.desc()).all()
+        """Return all tenants for admin view (deleted ones are listed by teardown_service)"""
+        return db.query(Tenant).filter(Tenant.status != "deleting").order_by(Tenant.id.desc()).all()
 
     @staticmethod
     def get_tenant_by_id(db: Session, tenant_id: int):
         """Return a single tenant by ID"""
-        return db.query(Tenant).filter(Tenant.id == tenant_id).first()
+        return db.query(Tenant).filter(Tenant.id == tenant_id, Tenant.status != "deleting").first()
 
     @staticmethod
     def delete_tenant(db: Session, tenant_id: int):
-        """Delete a tenant record (and optionally drop schema)"""
-        tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+        """Soft delete: the tenant stops resolving at once and its pools are
+        closed; teardown_service drops the schema in the background"""
+        tenant = db.query(Tenant).filter(Tenant.id == tenant_id, Tenant.status != "deleting").first()
         if not tenant:
             return False
-        # Optional: Drop schema if tenant_manager supports it
-        try:
-            tenant_manager.drop_tenant_schema(tenant.schema_name)
-        except Exception as e:
-            print(f"⚠️ Warning: Failed to drop schema {tenant.schema_name}: {e}")
-
-        db.delete(tenant)
+        emails = [email for (email,) in db.query(User.email).filter(User.tenant_id == tenant_id)]
+        tenant.status = "deleting"
+        tenant.deleted_at = func.now()
         db.commit()
+        # Their next request reloads the principal, which a deleted tenant no longer yields
+        invalidate_principals(emails)
+        tenant_manager.invalidate_tenant(tenant_id, tenant.schema_name)
+        tenant_manager.dispose_tenant_engine(tenant.schema_name)
+        response_cache.invalidate(tenant.schema_name)
         return True
+
+    @staticmethod
+    def update_tenant(db: Session, tenant_id: int, updates: dict):
+        """Update tenant fields (e.g. name, is_active)."""
+        tenant = db.query(Tenant).filter(Tenant.id == tenant_id, Tenant.status != "deleting").first()
+        if not tenant:
+            return None
+        for key, value in updates.items():
+            if key in ("name", "is_active"):
+                setattr(tenant, key, value)
+        db.commit()
+        db.refresh(tenant)
+        tenant_manager.invalidate_tenant(tenant_id, tenant.schema_name)
+        return tenant
     @staticmethod
     def get_all_users(db: Session):
         """Return all users across tenants (admin-only)."""
@@ -85,11 +170,14 @@ class TenantService:
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
             return None
+        old_email = user.email
         for key, value in updates.items():
             if hasattr(user, key):
                 setattr(user, key, value)
         db.commit()
         db.refresh(user)
+        # After the commit, so a concurrent request can't re-cache the old principal
+        invalidate_principals({old_email, user.email})
         return user
 
     @staticmethod
@@ -100,6 +188,7 @@ class TenantService:
             return False
         db.delete(user)
         db.commit()
+        principal_cache.invalidate(user.email)
         return True
 
 
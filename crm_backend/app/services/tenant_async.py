@@ -0,0 +1,32 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+from app.models.tenant import Tenant, User
+
+class AsyncTenantService:
+    """AsyncSession versions of the read-side admin queries (DB_ASYNC)"""
+
+    @staticmethod
+    async def get_all_tenants(db: AsyncSession):
+        """Return all tenants for admin view (deleted ones are listed by teardown_service)"""
+        result = await db.execute(select(Tenant).where(Tenant.status != "deleting").order_by(Tenant.id.desc()))
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_tenant_by_name(db: AsyncSession, name: str):
+        result = await db.execute(select(Tenant).where(Tenant.name.ilike(name)).limit(1))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_users(db: AsyncSession, tenant_id: Optional[int] = None, include_tenant: bool = False) -> list:
+        """(user, tenant name) pairs from one outer-joined query, by user id"""
+        stmt = select(User, Tenant.name).outerjoin(User.tenant)
+        if include_tenant:
+            stmt = stmt.options(contains_eager(User.tenant))
+        if tenant_id is not None:
+            stmt = stmt.where(User.tenant_id == tenant_id)
+        result = await db.execute(stmt.order_by(User.id))
+        return result.all()
+
+async_tenant_service = AsyncTenantService()
@@ -0,0 +1,36 @@
+"""Time in stage is measured from the stage history, not the last update"""
+import numpy as np
+from sqlalchemy import text
+from app.models.crm import Opportunity
+from app.services.analytics import DAY_SECONDS, compute, factorize, load_columns
+
+def test_compute_measures_from_stage_entry():
+    now = 100 * DAY_SECONDS
+    stage_code, stage_labels = factorize(["proposal", "proposal", "closed_won"])
+    columns = {
+        "stage_code": stage_code,
+        "stage_labels": stage_labels,
+        "amount": np.array([10.0, 20.0, 30.0]),
+        "probability": np.array([50.0, 50.0, 100.0]),
+        "close_date": np.array([np.nan] * 3),
+        "created_at": np.array([0.0, 0.0, 10 * DAY_SECONDS]),
+        "entered_at": np.array([90 * DAY_SECONDS, 80 * DAY_SECONDS, 40 * DAY_SECONDS]),
+    }
+    result = compute(columns, now=now)
+    assert result["time_in_stage"] == [{"stage": "proposal", "count": 2, "avg_days_in_stage": 15.0}]
+    assert result["avg_sales_cycle_days"] == 30.0
+
+def test_unrelated_updates_do_not_reset_time_in_stage(tenant_db):
+    opportunity = Opportunity(name="Deal", stage="proposal", amount=100)
+    tenant_db.add(opportunity)
+    tenant_db.commit()
+    tenant_db.execute(text(
+        "UPDATE opportunity_stage_history SET changed_at = now() - interval '10 days' WHERE opportunity_id = :id"
+    ), {"id": opportunity.id})
+    tenant_db.commit()
+    opportunity.amount = 200  # sets updated_at, stays in the stage
+    tenant_db.commit()
+
+    columns = load_columns(tenant_db)
+    (days,) = compute(columns)["time_in_stage"]
+    assert 9.9 < days["avg_days_in_stage"] < 10.1
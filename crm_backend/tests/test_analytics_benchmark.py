@@ -0,0 +1,72 @@
+"""Pipeline analytics end to end (the columnar query plus the NumPy pass)
+on 10k, 100k and 1M opportunities with their stage history.
+
+Prints the uncached and cached times per size and period; run with -s to
+see the numbers.
+"""
+import time
+import pytest
+from sqlalchemy import text
+from app.db.tenant import tenant_manager
+from app.services.analytics import PERIODS, STAGE_ORDER, LOST_STAGE, analytics_service, compute, load_columns
+
+STAGES = STAGE_ORDER + (LOST_STAGE,)
+
+SEED_OPPORTUNITIES = """
+    INSERT INTO opportunities (name, stage, amount, probability, close_date, created_at)
+    SELECT 'Deal ' || i,
+           (:stages)[1 + i % :stage_count],
+           1000 + (i * 7919) % 99000,
+           (i * 37) % 101,
+           CASE WHEN i % 10 = 0 THEN NULL ELSE now()::timestamp + ((i % 455) - 90) * interval '1 day' END,
+           now() - (i % 365) * interval '1 day'
+    FROM generate_series(1, :size) AS i
+"""
+
+# The insert trigger recorded each opportunity's creation; half of them also
+# moved from prospecting to their current stage up to 30 days later
+SEED_STAGE_CHANGES = """
+    INSERT INTO opportunity_stage_history (opportunity_id, from_value, to_value, changed_at)
+    SELECT id, 'prospecting', stage, least(created_at + (id % 30) * interval '1 day', now())
+    FROM opportunities
+    WHERE id % 2 = 0 AND stage <> 'prospecting'
+"""
+
+def seed(schema_name: str, size: int):
+    session = tenant_manager.get_tenant_session(schema_name)
+    try:
+        params = {"stages": list(STAGES), "stage_count": len(STAGES), "size": size}
+        session.execute(text(SEED_OPPORTUNITIES), params)
+        session.execute(text(SEED_STAGE_CHANGES))
+        session.commit()
+        session.connection().exec_driver_sql("ANALYZE opportunities, opportunity_stage_history")
+        session.commit()
+    finally:
+        session.close()
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+@pytest.mark.parametrize("size", [10_000, 100_000, 1_000_000], ids=["10k", "100k", "1M"])
+def test_pipeline_analytics_end_to_end(make_tenant, size):
+    schema_name = make_tenant().schema_name
+    seed(schema_name, size)
+    session = tenant_manager.get_tenant_session(schema_name)
+    try:
+        # The two halves, for where the time goes
+        columns, query_ms = timed(load_columns, session)
+        _, compute_ms = timed(compute, columns)
+        print(f"\n{size:>9} opportunities: query {query_ms:.0f} ms, compute {compute_ms:.0f} ms")
+
+        for period in PERIODS:
+            misses, hits = analytics_service.misses, analytics_service.hits
+            result, uncached_ms = timed(analytics_service.get_pipeline_analytics, session, schema_name, period)
+            cached, cached_ms = timed(analytics_service.get_pipeline_analytics, session, schema_name, period)
+            assert (analytics_service.misses, analytics_service.hits) == (misses + 1, hits + 1)
+            assert cached is result
+            assert result["opportunity_count"] == size
+            print(f"{size:>9} opportunities, {period:<7}: uncached {uncached_ms:.0f} ms, cached {cached_ms:.2f} ms")
+    finally:
+        session.close()
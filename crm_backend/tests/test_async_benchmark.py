@@ -0,0 +1,91 @@
+"""Sync vs async (DB_ASYNC) throughput on the same tenant list query.
+
+Prints requests/second for both stacks with the same pool size and
+concurrency; run with -s to see the numbers.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.core.config import settings
+from app.db.session import get_async_database_url
+from app.db.tenant import AsyncTenantSyncSession, tenant_manager
+from app.models.crm import Contact
+from app.models.tenant import Tenant, User
+from app.services.crm import crm_service
+from app.services.crm_async import async_crm_service
+from app.services.tenant import tenant_service
+from app.services.tenant_async import async_tenant_service
+
+REQUESTS = 400
+CONCURRENCY = 20
+
+@pytest.fixture
+def async_engine(database):
+    engine = create_async_engine(
+        get_async_database_url(database),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+    yield engine
+    asyncio.run(engine.dispose())
+
+@pytest.fixture
+def schema_name(make_tenant):
+    schema_name = make_tenant().schema_name
+    session = tenant_manager.get_tenant_session(schema_name)
+    session.add_all(Contact(first_name=f"First {i}", last_name=f"Last {i}") for i in range(200))
+    session.commit()
+    session.close()
+    return schema_name
+
+def sync_requests_per_second(schema_name: str) -> float:
+    def one_request(_):
+        session = tenant_manager.get_tenant_session(schema_name)
+        try:
+            return len(crm_service.get_contacts(session, limit=50)["items"])
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        list(pool.map(one_request, range(CONCURRENCY)))  # warm up the pool
+        started = time.perf_counter()
+        assert all(count == 50 for count in pool.map(one_request, range(REQUESTS)))
+        return REQUESTS / (time.perf_counter() - started)
+
+async def async_requests_per_second(engine, schema_name: str) -> float:
+    slots = asyncio.Semaphore(CONCURRENCY)
+
+    async def one_request():
+        async with slots:
+            async with AsyncSession(bind=engine, sync_session_class=AsyncTenantSyncSession,
+                                    info={"tenant_schema": schema_name}) as session:
+                return len((await async_crm_service.get_contacts(session, limit=50))["items"])
+
+    await asyncio.gather(*(one_request() for _ in range(CONCURRENCY)))
+    started = time.perf_counter()
+    counts = await asyncio.gather(*(one_request() for _ in range(REQUESTS)))
+    assert all(count == 50 for count in counts)
+    return REQUESTS / (time.perf_counter() - started)
+
+def test_async_throughput_is_comparable_to_sync(schema_name, async_engine):
+    sync_rate = sync_requests_per_second(schema_name)
+    async_rate = asyncio.run(async_requests_per_second(async_engine, schema_name))
+    print(f"\ncontacts list, {CONCURRENCY} concurrent: sync {sync_rate:.0f} req/s, async {async_rate:.0f} req/s")
+    assert async_rate >= 0.5 * sync_rate
+
+def test_async_admin_listing_matches_sync(db, make_tenant, async_engine):
+    tenant = make_tenant()
+    db.add(User(email=f"{tenant.schema_name}@example.com", hashed_password="x", full_name="Async", tenant_id=tenant.id))
+    db.commit()
+
+    async def listing():
+        async with AsyncSession(bind=async_engine) as session:
+            tenants = await async_tenant_service.get_all_tenants(session)
+            users = await async_tenant_service.get_users(session, tenant.id)
+            return [t.id for t in tenants], [(u.email, name) for u, name in users]
+
+    tenant_ids, users = asyncio.run(listing())
+    assert tenant_ids == [t.id for t in tenant_service.get_all_tenants(db)]
+    assert users == [(f"{tenant.schema_name}@example.com", tenant.name)]
@@ -0,0 +1,22 @@
+"""DB_ASYNC swaps in the async handlers without reordering the routes"""
+import asyncio
+import pytest
+from app.api.v1.api import with_overrides
+from app.api.v1.endpoints import (
+    admin_tenant, admin_tenant_async, admin_user, admin_user_async, crm, crm_async,
+)
+
+@pytest.mark.parametrize("base, overrides", [
+    (crm.router, crm_async.router),
+    (admin_tenant.router, admin_tenant_async.router),
+    (admin_user.router, admin_user_async.router),
+])
+def test_overrides_replace_routes_in_place(base, overrides):
+    router = with_overrides(base, overrides)
+    assert [(route.path, route.methods) for route in router.routes] == [(route.path, route.methods) for route in base.routes]
+    overridden = {(route.path, frozenset(route.methods)) for route in overrides.routes}
+    for route in router.routes:
+        is_async = asyncio.iscoroutinefunction(route.endpoint)
+        if (route.path, frozenset(route.methods)) in overridden:
+            assert is_async, route.path
+            assert route in overrides.routes
@@ -0,0 +1,28 @@
+"""HTTP status of batch operation failures raised by the database"""
+import pytest
+from sqlalchemy.exc import DataError, OperationalError
+from app.services.batch import _describe
+
+class FakeDriverError(Exception):
+    def __init__(self, message: str, pgcode: str = None):
+        super().__init__(message)
+        self.pgcode = pgcode
+
+def wrapped(error_class, pgcode: str = None):
+    return error_class("UPDATE leads ...", {}, FakeDriverError("failed", pgcode))
+
+@pytest.mark.parametrize("pgcode, status_code", [
+    ("40P01", 409),
+    ("40001", 409),
+    ("55P03", 503),
+    ("57014", 503),
+])
+def test_transient_failures_ask_for_a_retry(pgcode, status_code):
+    assert _describe(wrapped(OperationalError, pgcode)) == (status_code, "failed", 1)
+
+def test_other_operational_errors_are_unexpected():
+    assert _describe(wrapped(OperationalError, "08006")) is None
+    assert _describe(wrapped(OperationalError)) is None
+
+def test_bad_input_is_a_client_error():
+    assert _describe(wrapped(DataError, "22P02")) == (400, "failed", None)
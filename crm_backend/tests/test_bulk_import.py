@@ -0,0 +1,84 @@
+"""Rows the database rejects are reported one by one; the rest are loaded"""
+import io
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app.core.config import settings
+from app.models.crm import Contact, Lead
+from app.schemas.crm import ContactCreate, LeadCreate
+from app.services import bulk_import
+from app.services.bulk_import import BulkImportService, bulk_import_service
+
+class FakeSession:
+    def __init__(self):
+        self.committed = []
+        self.pending = []
+
+    def commit(self):
+        self.committed.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+class FakeDriverError(Exception):
+    pass
+
+def csv_upload(*rows) -> io.BytesIO:
+    return io.BytesIO(("first_name,last_name\n" + "".join(f"{row},Test\n" for row in rows)).encode())
+
+@pytest.fixture
+def fake_writes(monkeypatch):
+    """_write_chunk that rejects any chunk containing first_name "bad" """
+    monkeypatch.setattr(settings, "BULK_IMPORT_CHUNK_SIZE", 8)
+
+    def write_chunk(db, model, columns, rows):
+        if any(row["first_name"] == "bad" for row in rows):
+            raise IntegrityError("COPY contacts ...", None, FakeDriverError("violates a constraint\nCONTEXT: COPY contacts, line 1"))
+        db.pending.extend(row["first_name"] for row in rows)
+
+    monkeypatch.setattr(BulkImportService, "_write_chunk", staticmethod(write_chunk))
+
+def test_rejected_chunk_is_narrowed_to_its_failing_rows(fake_writes):
+    names = [f"ok{i}" for i in range(10)]
+    names[2] = names[7] = "bad"
+    db = FakeSession()
+    report = bulk_import_service.import_rows(db, Contact, ContactCreate, csv_upload(*names), "csv")
+
+    assert report["inserted"] == 8 and report["failed"] == 2 and report["chunks"] == 2
+    # Header is line 1
+    assert report["errors"] == [
+        {"row": 4, "error": "violates a constraint"},
+        {"row": 9, "error": "violates a constraint"},
+    ]
+    assert db.committed == [name for name in names if name != "bad"]
+
+def test_operational_errors_abort_the_import(monkeypatch):
+    def write_chunk(db, model, columns, rows):
+        raise OperationalError("COPY contacts ...", None, FakeDriverError("server closed the connection"))
+
+    monkeypatch.setattr(BulkImportService, "_write_chunk", staticmethod(write_chunk))
+    with pytest.raises(OperationalError):
+        bulk_import_service.import_rows(FakeSession(), Contact, ContactCreate, csv_upload("Ada", "Alan"), "csv")
+
+@pytest.mark.parametrize("use_copy", [True, False], ids=["copy", "insert"])
+def test_database_errors_are_reported_per_row(tenant_db, monkeypatch, use_copy):
+    monkeypatch.setattr(bulk_import, "_supports_copy", lambda connection: use_copy)
+    contact = Contact(first_name="Ada", last_name="Lovelace")
+    tenant_db.add(contact)
+    tenant_db.commit()
+
+    upload = io.BytesIO("\n".join([
+        "title,contact_id",
+        f"Good one,{contact.id}",
+        "Missing contact,999999",
+        "No contact,",
+        "x" * 300 + ",",
+        f"Good two,{contact.id}",
+    ]).encode())
+    report = bulk_import_service.import_rows(tenant_db, Lead, LeadCreate, upload, "csv")
+
+    assert report["inserted"] == 3 and report["failed"] == 2
+    assert [error["row"] for error in report["errors"]] == [3, 5]
+    assert "foreign key" in report["errors"][0]["error"]
+    assert "too long" in report["errors"][1]["error"]
+    assert sorted(title for (title,) in tenant_db.query(Lead.title)) == ["Good one", "Good two", "No contact"]
@@ -0,0 +1,28 @@
+"""Import body parsing: formats by Content-Type, and malformed CSV rows"""
+import io
+import pytest
+from app.services.bulk_import import UnsupportedContentType, bulk_import_service, detect_format
+
+@pytest.mark.parametrize("content_type, fmt", [
+    ("text/csv", "csv"),
+    ("text/csv; charset=utf-8", "csv"),
+    ("application/x-ndjson", "ndjson"),
+    ("application/jsonl", "ndjson"),
+    (None, "csv"),
+])
+def test_detect_format(content_type, fmt):
+    assert detect_format(content_type) == fmt
+
+@pytest.mark.parametrize("content_type", ["application/json", "application/vnd.api+json", "text/plain"])
+def test_other_content_types_are_unsupported(content_type):
+    with pytest.raises(UnsupportedContentType):
+        detect_format(content_type)
+
+def test_csv_rows_with_extra_fields_are_rejected():
+    upload = io.BytesIO(b"first_name,last_name\nAda,Lovelace\nAlan,Turing,extra,more\nGrace,\n")
+    records = list(bulk_import_service.iter_records(upload, "csv"))
+    assert records[0] == (2, {"first_name": "Ada", "last_name": "Lovelace"})
+    row_number, error = records[1]
+    assert row_number == 3 and isinstance(error, ValueError)
+    assert "2 more field(s)" in str(error)
+    assert records[2] == (4, {"first_name": "Grace", "last_name": None})
@@ -0,0 +1,39 @@
+"""Stuck records come from a range scan over the history's open entries"""
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from app.models.crm import Opportunity
+from app.services.history import history_service
+
+def age_history(db, opportunity_id: int, days: int):
+    db.execute(
+        text("UPDATE opportunity_stage_history SET changed_at = now() - make_interval(days => :days) WHERE opportunity_id = :id"),
+        {"days": days, "id": opportunity_id},
+    )
+
+def test_stuck_lists_open_records_by_last_change(tenant_db):
+    old = Opportunity(name="Old", stage="proposal")
+    fresh = Opportunity(name="Fresh", stage="proposal")
+    won = Opportunity(name="Won", stage="closed_won")
+    moved = Opportunity(name="Moved", stage="prospecting")
+    tenant_db.add_all([old, fresh, won, moved])
+    tenant_db.commit()
+    for opportunity in (old, won, moved):
+        age_history(tenant_db, opportunity.id, 60)
+    # A recent change: no longer stuck, though it entered its first stage long ago
+    moved.stage = "proposal"
+    tenant_db.commit()
+
+    rows = history_service.stuck(tenant_db, "opportunities", days=30)
+    assert [(row["id"], row["stage"]) for row in rows] == [(old.id, "proposal")]
+    assert rows[0]["days_in_stage"] >= 59
+
+def test_stuck_scans_the_open_entries_index(tenant_db, monkeypatch):
+    captured = []
+    execute = tenant_db.execute
+    monkeypatch.setattr(tenant_db, "execute", lambda statement, *args: captured.append(statement) or execute(statement, *args))
+    history_service.stuck(tenant_db, "opportunities", days=30)
+    sql = str(captured[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    tenant_db.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(tenant_db.execute(text("EXPLAIN " + sql)).scalars())
+    assert "ix_opportunity_stage_history_open_changed_at" in plan
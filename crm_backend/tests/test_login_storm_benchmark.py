@@ -0,0 +1,88 @@
+"""CRM read latency with and without a concurrent login storm.
+
+The logins use a production-cost bcrypt hash and a wrong password, so each
+one runs a full verify on the password hashing pool and nothing is
+rehashed. Prints the read latencies; run with -s to see the numbers.
+"""
+import asyncio
+import time
+import httpx
+import numpy as np
+import pytest
+from passlib.context import CryptContext
+from app.db.tenant import tenant_manager
+from app.main import app
+from app.models.crm import Contact
+from app.models.tenant import User
+
+READS = 200
+READ_CONCURRENCY = 10
+LOGIN_CONCURRENCY = 100
+STORM_BCRYPT_ROUNDS = 12
+
+@pytest.fixture
+def tenant(make_tenant):
+    tenant = make_tenant()
+    session = tenant_manager.get_tenant_session(tenant.schema_name)
+    session.add_all(Contact(first_name=f"First {i}", last_name=f"Last {i}") for i in range(200))
+    session.commit()
+    session.close()
+    return tenant
+
+@pytest.fixture
+def login_email(db, tenant):
+    email = f"{tenant.schema_name}@example.com"
+    hashed = CryptContext(schemes=["bcrypt"], bcrypt__rounds=STORM_BCRYPT_ROUNDS).hash("correct horse")
+    db.add(User(email=email, hashed_password=hashed, full_name="Storm", tenant_id=tenant.id))
+    db.commit()
+    return email
+
+async def read_latencies(client, tenant_id: int) -> np.ndarray:
+    slots = asyncio.Semaphore(READ_CONCURRENCY)
+
+    async def one_read():
+        async with slots:
+            started = time.perf_counter()
+            response = await client.get("/api/v1/crm/contacts/", params={"limit": 50}, headers={"X-Tenant-ID": str(tenant_id)})
+            assert response.status_code == 200
+            return time.perf_counter() - started
+
+    return np.array(await asyncio.gather(*(one_read() for _ in range(READS))))
+
+async def login_storm(client, email: str, stop: asyncio.Event) -> dict:
+    """LOGIN_CONCURRENCY clients logging in back to back until `stop` is set"""
+    statuses = {}
+
+    async def login_loop():
+        while not stop.is_set():
+            response = await client.post("/api/v1/auth/login/", params={"email": email, "password": "wrong"})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 429:
+                await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(login_loop() for _ in range(LOGIN_CONCURRENCY)))
+    return statuses
+
+async def run_benchmark(tenant_id: int, email: str):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60) as client:
+        await read_latencies(client, tenant_id)  # warm up the pools
+        quiet = await read_latencies(client, tenant_id)
+        stop = asyncio.Event()
+        storm = asyncio.ensure_future(login_storm(client, email, stop))
+        await asyncio.sleep(0.1)  # let the storm fill the hashing pool
+        loaded = await read_latencies(client, tenant_id)
+        stop.set()
+        return quiet, loaded, await storm
+
+def test_reads_stay_fast_during_a_login_storm(tenant, login_email):
+    quiet, loaded, statuses = asyncio.run(run_benchmark(tenant.id, login_email))
+    quiet_p50, quiet_p95 = np.percentile(quiet, [50, 95])
+    loaded_p50, loaded_p95 = np.percentile(loaded, [50, 95])
+    print(f"\ncontacts list p50/p95: quiet {quiet_p50 * 1000:.1f}/{quiet_p95 * 1000:.1f} ms, "
+          f"login storm {loaded_p50 * 1000:.1f}/{loaded_p95 * 1000:.1f} ms; logins {statuses}")
+
+    # Failed logins get a 400; past the pool's queue limit, a 429
+    assert set(statuses) <= {400, 429}
+    assert statuses.get(429), "the storm never filled the hashing pool"
+    # bcrypt competes for CPU, but no reader waits behind a hash
+    assert loaded_p95 <= 4 * quiet_p95 + 0.05
@@ -0,0 +1,44 @@
+"""Cached principals are dropped once user and tenant changes commit"""
+import uuid
+import pytest
+from app.core.security import load_principal, principal_cache
+from app.models.tenant import User
+from app.services.tenant import tenant_service
+
+@pytest.fixture
+def user(db, make_tenant):
+    tenant = make_tenant()
+    user = User(
+        email=f"user_{uuid.uuid4().hex[:10]}@example.com",
+        hashed_password="x",
+        full_name="Test User",
+        tenant_id=tenant.id,
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+def cache(email):
+    principal = load_principal(email)
+    principal_cache.set(principal)
+    return principal
+
+def test_update_user_invalidates_after_commit(db, user):
+    cache(user.email)
+    tenant_service.update_user(db, user.id, {"is_active": False})
+    assert principal_cache.get(user.email) is None
+    # Reloading now sees the committed change
+    assert cache(user.email).is_active is False
+
+def test_update_user_invalidates_old_email(db, user):
+    old_email = user.email
+    cache(old_email)
+    tenant_service.update_user(db, user.id, {"email": f"renamed_{old_email}"})
+    assert principal_cache.get(old_email) is None
+    assert load_principal(old_email) is None
+
+def test_deleted_tenant_users_stop_authenticating(db, user):
+    cache(user.email)
+    assert tenant_service.delete_tenant(db, user.tenant_id)
+    assert principal_cache.get(user.email) is None
+    assert load_principal(user.email) is None
@@ -0,0 +1,89 @@
+"""The admin user listing and ?include= expansions run a fixed number of
+queries, however many rows they return"""
+import re
+import pytest
+from fastapi.testclient import TestClient
+from app.core.security import Principal, get_current_admin_user
+from app.db.tenant import tenant_manager
+from app.main import app
+from app.models.crm import Contact, Lead, Opportunity
+from app.models.tenant import User
+
+ROWS = 20
+SELECT_FROM = re.compile(r"^\s*SELECT\b.*?\bFROM (\w+)", re.DOTALL)
+
+def selects(query_log) -> list:
+    """Table in the outermost FROM of each SELECT, in order"""
+    return [match.group(1) for match in (SELECT_FROM.match(statement) for statement, _ in query_log) if match]
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_admin_user] = lambda: Principal(0, "admin@example.com", None, True, True)
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_current_admin_user)
+
+@pytest.fixture
+def tenant(db, make_tenant):
+    tenant = make_tenant()
+    db.add_all(
+        User(email=f"user{i}.{tenant.schema_name}@example.com", hashed_password="x", full_name=f"User {i}", tenant_id=tenant.id)
+        for i in range(ROWS)
+    )
+    db.commit()
+
+    session = tenant_manager.get_tenant_session(tenant.schema_name)
+    contacts = [Contact(first_name=f"First {i}", last_name="Last") for i in range(ROWS)]
+    session.add_all(contacts)
+    session.flush()
+    leads = [Lead(title=f"Lead {i}", contact_id=contact.id) for i, contact in enumerate(contacts)]
+    session.add_all(leads)
+    session.flush()
+    session.add_all(
+        Opportunity(name=f"Deal {i}", contact_id=lead.contact_id, lead_id=lead.id) for i, lead in enumerate(leads)
+    )
+    session.commit()
+    session.close()
+    return tenant
+
+@pytest.mark.parametrize("params", [{}, {"include": "tenant"}])
+def test_admin_user_listing_is_one_query(client, tenant, query_log, params):
+    response = client.get("/api/v1/admin_users/users/", params=params)
+    assert response.status_code == 200
+    users = [user for user in response.json() if user["tenant_id"] == tenant.id]
+    assert len(users) == ROWS
+    assert all(user["tenant_name"] == tenant.name for user in users)
+    if params:
+        assert all(user["tenant"]["name"] == tenant.name for user in users)
+    assert selects(query_log) == ["users"]
+
+def test_admin_user_listing_by_tenant_name(client, tenant, query_log):
+    response = client.get("/api/v1/admin_users/users/", params={"tenant_name": tenant.name, "include": "tenant"})
+    assert response.status_code == 200
+    assert len(response.json()) == ROWS
+    # The tenant lookup, then the listing
+    assert selects(query_log) == ["tenants", "users"]
+
+@pytest.mark.parametrize("path, include, tables", [
+    ("leads/", "", ["leads"]),
+    ("leads/", "contact", ["leads", "contacts"]),
+    ("opportunities/", "contact,lead", ["opportunities", "contacts", "leads"]),
+])
+def test_list_include_is_one_query_per_relationship(client, tenant, query_log, path, include, tables):
+    response = client.get(f"/api/v1/crm/{path}", params={"include": include, "limit": ROWS},
+                          headers={"X-Tenant-ID": str(tenant.id)})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == ROWS
+    for name in filter(None, include.split(",")):
+        assert all(item[name]["id"] == item[f"{name}_id"] for item in items)
+    crm_selects = [table for table in selects(query_log) if table in ("contacts", "leads", "opportunities")]
+    assert sorted(crm_selects) == sorted(tables)
+
+@pytest.mark.parametrize("path", ["leads", "opportunities"])
+def test_detail_include_is_one_joined_query(client, tenant, query_log, path):
+    include = "contact" if path == "leads" else "contact,lead"
+    response = client.get(f"/api/v1/crm/{path}/1", params={"include": include}, headers={"X-Tenant-ID": str(tenant.id)})
+    assert response.status_code == 200
+    assert response.json()["contact"]["id"] == response.json()["contact_id"]
+    crm_selects = [table for table in selects(query_log) if table in ("contacts", "leads", "opportunities")]
+    assert crm_selects == [path]
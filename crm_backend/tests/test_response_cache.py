@@ -0,0 +1,114 @@
+"""Response cache: the memory backend's LRU and byte limit, version-stamped
+keys and the hit/miss counters. No database: table versions are stubbed."""
+import asyncio
+import pytest
+from app.services.response_cache import CachedBody, MemoryBackend, ResponseCache
+
+def body(size: int, etag: str = None) -> CachedBody:
+    return CachedBody(b"x" * size, etag)
+
+# ---------------------- MEMORY BACKEND ----------------------
+
+def test_evicts_least_recently_used_past_the_byte_limit():
+    backend = MemoryBackend(max_bytes=30)
+    for key in ("a", "b", "c"):
+        backend.set(key, body(10))
+    backend.get("a")  # b is now the least recently used
+    backend.set("d", body(10))
+    assert backend.get("b") is None
+    assert all(backend.get(key) is not None for key in ("a", "c", "d"))
+    assert backend.stats() == {"entries": 3, "bytes": 30, "max_bytes": 30, "evictions": 1}
+
+def test_large_entry_evicts_as_many_as_needed():
+    backend = MemoryBackend(max_bytes=30)
+    for key in ("a", "b", "c"):
+        backend.set(key, body(10))
+    backend.set("big", body(25))
+    assert [key for key in ("a", "b", "c", "big") if backend.get(key)] == ["big"]
+    assert backend.stats()["bytes"] == 25
+    assert backend.stats()["evictions"] == 3
+
+def test_replacing_a_key_counts_its_size_once():
+    backend = MemoryBackend(max_bytes=100)
+    backend.set("a", body(10))
+    backend.set("a", body(20, '"2"'))
+    assert backend.stats()["bytes"] == 20
+    assert backend.get("a").etag == '"2"'
+
+def test_delete_prefix_frees_its_bytes():
+    backend = MemoryBackend(max_bytes=100)
+    backend.set("crm:tenant_a:leads", body(10))
+    backend.set("crm:tenant_a:contacts", body(10))
+    backend.set("crm:tenant_b:leads", body(10))
+    backend.delete_prefix("crm:tenant_a:")
+    assert backend.stats()["entries"] == 1 and backend.stats()["bytes"] == 10
+    assert backend.get("crm:tenant_b:leads") is not None
+
+# ---------------------- KEYS AND METRICS ----------------------
+
+@pytest.fixture
+def versions(monkeypatch):
+    """table -> version, as table_versions would read them"""
+    current = {}
+
+    def read(db, tables):
+        return tuple(current.get(table, 0) for table in tables)
+
+    async def read_async(db, tables):
+        return read(db, tables)
+
+    monkeypatch.setattr(ResponseCache, "table_versions", staticmethod(read))
+    monkeypatch.setattr(ResponseCache, "table_versions_async", staticmethod(read_async))
+    return current
+
+@pytest.fixture
+def cache():
+    return ResponseCache(MemoryBackend(max_bytes=1000), enabled=True, max_entry_bytes=100)
+
+def test_key_includes_every_table_version_and_the_params():
+    key = ResponseCache.key("tenant_a", "leads", ("leads", "contacts"), (3, 7), {"limit": 10})
+    assert key.startswith("crm:tenant_a:leads:leads=3,contacts=7:")
+    assert key == ResponseCache.key("tenant_a", "leads", ("leads", "contacts"), (3, 7), {"limit": 10})
+    assert key != ResponseCache.key("tenant_a", "leads", ("leads", "contacts"), (3, 8), {"limit": 10})
+    assert key != ResponseCache.key("tenant_a", "leads", ("leads", "contacts"), (3, 7), {"limit": 20})
+    # Parameter order doesn't matter
+    assert ResponseCache.key("t", "leads", ("leads",), (1,), {"a": 1, "b": 2}) == ResponseCache.key("t", "leads", ("leads",), (1,), {"b": 2, "a": 1})
+
+def test_a_write_makes_the_entry_unreachable(cache, versions):
+    loads = []
+
+    def load():
+        loads.append(1)
+        return body(10)
+
+    cache.get_or_load(None, "tenant_a", "leads", {"limit": 10}, ("contact",), load)
+    cache.get_or_load(None, "tenant_a", "leads", {"limit": 10}, ("contact",), load)
+    assert len(loads) == 1
+    # A write to an included table changes the key
+    versions["contacts"] = 1
+    cache.get_or_load(None, "tenant_a", "leads", {"limit": 10}, ("contact",), load)
+    assert len(loads) == 2
+    assert cache.metrics() == {
+        "enabled": True, "backend": "memory", "hits": 1, "misses": 2, "hit_rate": 1 / 3, "stores": 2,
+        "entries": 2, "bytes": 20, "max_bytes": 1000, "evictions": 0,
+    }
+
+def test_not_found_and_oversized_bodies_are_not_stored(cache, versions):
+    assert cache.get_or_load(None, "tenant_a", "leads", {"id": 1}, (), lambda: None) is None
+    cache.get_or_load(None, "tenant_a", "leads", {"limit": 1000}, (), lambda: body(101))
+    metrics = cache.metrics()
+    assert (metrics["misses"], metrics["stores"], metrics["entries"]) == (2, 0, 0)
+
+def test_disabled_cache_always_loads(versions):
+    cache = ResponseCache(MemoryBackend(max_bytes=1000), enabled=False, max_entry_bytes=100)
+    cache.get_or_load(None, "tenant_a", "leads", {}, (), lambda: body(10))
+    assert cache.metrics()["misses"] == 0 and cache.metrics()["entries"] == 0
+
+def test_async_lookups_share_the_sync_entries(cache, versions):
+    cached = cache.get_or_load(None, "tenant_a", "leads", {"limit": 10}, (), lambda: body(10, '"1"'))
+
+    async def load():
+        raise AssertionError("should be served from the cache")
+
+    assert asyncio.run(cache.get_or_load_async(None, "tenant_a", "leads", {"limit": 10}, (), load)) == cached
+    assert cache.metrics()["hits"] == 1
@@ -0,0 +1,133 @@
+"""Tenant placement, shard routing and tenant_move across two databases"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from app.core.config import settings
+from app.db import tenant_move
+from app.db.shards import DEFAULT_SHARD, hashed, least_loaded, place_tenant, shard_registry
+from app.db.tenant import tenant_manager
+from app.models.crm import Contact
+from app.models.tenant import Tenant
+
+def add_contacts(schema_name: str, *names) -> list:
+    session = tenant_manager.get_tenant_session(schema_name)
+    try:
+        contacts = [Contact(first_name=name, last_name="Test") for name in names]
+        session.add_all(contacts)
+        session.commit()
+        return [contact.id for contact in contacts]
+    finally:
+        session.close()
+
+def execute(schema_name: str, shard: str, statement: str):
+    with shard_registry.engine(shard).begin() as conn:
+        conn.execute(text(statement.format(schema=schema_name)))
+
+def contacts_on(shard: str, schema_name: str) -> list:
+    with shard_registry.engine(shard).connect() as conn:
+        return conn.execute(text(f"SELECT id, first_name FROM {schema_name}.contacts ORDER BY id")).all()
+
+def schema_exists(shard: str, schema_name: str) -> bool:
+    with shard_registry.engine(shard).connect() as conn:
+        return bool(conn.execute(
+            text("SELECT 1 FROM pg_namespace WHERE nspname = :schema"), {"schema": schema_name}
+        ).scalar())
+
+# ---------------------- PLACEMENT ----------------------
+
+def test_hashed_placement_is_stable():
+    shards = [DEFAULT_SHARD, "shard2", "shard3"]
+    placed = hashed(None, shards, "tenant_acme")
+    assert placed in shards
+    assert all(hashed(None, shards, "tenant_acme") == placed for _ in range(5))
+
+def test_least_loaded_prefers_the_emptier_shard(db, shard_database, make_tenant):
+    make_tenant(shard_database)
+    counts = {
+        shard: db.query(Tenant).filter(Tenant.shard == shard, Tenant.status != "deleting").count()
+        for shard in (DEFAULT_SHARD, shard_database)
+    }
+    expected = min((DEFAULT_SHARD, shard_database), key=counts.get)
+    assert least_loaded(db, [DEFAULT_SHARD, shard_database], "tenant_new") == expected
+    # A shard with no tenants yet wins outright
+    assert least_loaded(db, [DEFAULT_SHARD, shard_database, "empty"], "tenant_new") == "empty"
+
+def test_unknown_placement_strategy(monkeypatch):
+    monkeypatch.setattr(settings, "TENANT_PLACEMENT_STRATEGY", "nope")
+    with pytest.raises(ValueError):
+        place_tenant(None, "tenant_new")
+
+# ---------------------- ROUTING ----------------------
+
+def test_sessions_route_to_the_tenants_shard(shard_database, make_tenant):
+    local, remote = make_tenant(), make_tenant(shard_database)
+    assert tenant_manager.shard_of(remote.schema_name) == shard_database
+    assert schema_exists(shard_database, remote.schema_name)
+    assert not schema_exists(DEFAULT_SHARD, remote.schema_name)
+
+    add_contacts(local.schema_name, "Local")
+    add_contacts(remote.schema_name, "Remote")
+    assert [name for _, name in contacts_on(DEFAULT_SHARD, local.schema_name)] == ["Local"]
+    assert [name for _, name in contacts_on(shard_database, remote.schema_name)] == ["Remote"]
+
+# ---------------------- TENANT MOVE ----------------------
+
+def test_catch_up_and_cutover_bring_over_concurrent_writes(shard_database, make_tenant):
+    tenant = make_tenant()
+    schema_name = tenant.schema_name
+    source, target = shard_registry.engine(DEFAULT_SHARD), shard_registry.engine(shard_database)
+    kept, updated, deleted = add_contacts(schema_name, "Kept", "Before", "Deleted")
+
+    tenant_manager.create_tenant_schema(schema_name, shard_database)
+    try:
+        with target.begin() as conn:
+            tenant_move._set_user_triggers(conn, schema_name, enabled=False)
+        with source.begin() as conn:
+            tenant_move.install_capture(conn, schema_name)
+        tenant_move.copy_snapshot(source, target, schema_name)
+        assert contacts_on(shard_database, schema_name) == contacts_on(DEFAULT_SHARD, schema_name)
+
+        # Written after the snapshot: picked up by a catch-up round
+        (inserted,) = add_contacts(schema_name, "Inserted")
+        execute(schema_name, DEFAULT_SHARD, f"UPDATE {{schema}}.contacts SET first_name = 'After' WHERE id = {updated}")
+        execute(schema_name, DEFAULT_SHARD, f"DELETE FROM {{schema}}.contacts WHERE id = {deleted}")
+        assert tenant_move.catch_up(source, target, schema_name) == 3
+        assert contacts_on(shard_database, schema_name) == [(kept, "Kept"), (updated, "After"), (inserted, "Inserted")]
+        assert tenant_move.catch_up(source, target, schema_name) == 0
+
+        # Written after the last round: synced by the cutover
+        (last,) = add_contacts(schema_name, "Last")
+        assert tenant_move.cutover(source, target, schema_name, shard_database) == 1
+        assert contacts_on(shard_database, schema_name) == contacts_on(DEFAULT_SHARD, schema_name)
+
+        # The source is frozen; the target continues its id sequence
+        with pytest.raises(DBAPIError):
+            execute(schema_name, DEFAULT_SHARD, "INSERT INTO {schema}.contacts (first_name, last_name) VALUES ('Lost', 'Test')")
+        with target.begin() as conn:
+            new_id = conn.execute(text(
+                f"INSERT INTO {schema_name}.contacts (first_name, last_name) VALUES ('New', 'Test') RETURNING id"
+            )).scalar()
+        assert new_id > last
+    finally:
+        tenant_manager.drop_tenant_schema(schema_name, shard=shard_database)
+
+def test_move_tenant_switches_the_catalog(db, shard_database, make_tenant):
+    tenant = make_tenant()
+    schema_name = tenant.schema_name
+    add_contacts(schema_name, "Moved")
+
+    tenant_move.move_tenant(tenant.id, shard_database, drop_source=False)
+
+    db.expire_all()
+    assert db.get(Tenant, tenant.id).shard == shard_database
+    # Re-resolving the tenant routes its sessions to the new shard
+    assert tenant_manager.resolve_tenant(db, str(tenant.id)).shard == shard_database
+    add_contacts(schema_name, "After move")
+    assert [name for _, name in contacts_on(shard_database, schema_name)] == ["Moved", "After move"]
+    # The source copy is left in place, frozen
+    assert [name for _, name in contacts_on(DEFAULT_SHARD, schema_name)] == ["Moved"]
+
+def test_move_to_the_same_shard_is_refused(make_tenant):
+    tenant = make_tenant()
+    with pytest.raises(tenant_move.TenantMoveError):
+        tenant_move.move_tenant(tenant.id, DEFAULT_SHARD)
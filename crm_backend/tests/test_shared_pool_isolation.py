@@ -0,0 +1,86 @@
+"""TENANT_POOL_MODE="shared": tenants share pooled connections, and the
+per-transaction search_path must never let one tenant see another's rows."""
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+from app.db.tenant import SharedTenantSession
+from app.models.crm import Contact
+
+@pytest.fixture
+def pool(database):
+    """A shared pool of one connection, so every session reuses it"""
+    engine = create_engine(database, pool_size=1, max_overflow=0)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def tenants(make_tenant):
+    return make_tenant().schema_name, make_tenant().schema_name
+
+def session_for(engine, schema_name: str):
+    return SharedTenantSession(bind=engine, info={"tenant_schema": schema_name})
+
+def contact_names(session) -> set:
+    return set(session.execute(select(Contact.last_name)).scalars())
+
+def backend_pid(session) -> int:
+    return session.execute(text("SELECT pg_backend_pid()")).scalar()
+
+def test_reused_connection_sees_only_its_tenant(pool, tenants):
+    schema_a, schema_b = tenants
+    with session_for(pool, schema_a) as session:
+        session.add(Contact(first_name="A", last_name="only-a"))
+        session.commit()
+        pid_a = backend_pid(session)
+    with session_for(pool, schema_b) as session:
+        session.add(Contact(first_name="B", last_name="only-b"))
+        session.commit()
+        assert backend_pid(session) == pid_a
+        assert contact_names(session) == {"only-b"}
+    with session_for(pool, schema_a) as session:
+        assert contact_names(session) == {"only-a"}
+
+def test_interleaved_transactions(database, tenants):
+    schema_a, schema_b = tenants
+    engine = create_engine(database, pool_size=2, max_overflow=0)
+    try:
+        session_a, session_b = session_for(engine, schema_a), session_for(engine, schema_b)
+        session_a.add(Contact(first_name="A", last_name="a1"))
+        session_a.flush()
+        session_b.add(Contact(first_name="B", last_name="b1"))
+        session_b.flush()
+        assert contact_names(session_a) == {"a1"}
+        assert contact_names(session_b) == {"b1"}
+        session_a.commit()
+        session_b.add(Contact(first_name="B", last_name="b2"))
+        session_b.commit()
+        # New transactions on the same sessions, connections swapped around
+        assert contact_names(session_b) == {"b1", "b2"}
+        assert contact_names(session_a) == {"a1"}
+        session_a.close()
+        session_b.close()
+    finally:
+        engine.dispose()
+
+def test_rollback_resets_search_path(pool, tenants):
+    schema_a, schema_b = tenants
+    with session_for(pool, schema_a) as session:
+        session.add(Contact(first_name="A", last_name="rolled-back"))
+        session.flush()
+        session.rollback()
+    with session_for(pool, schema_b) as session:
+        assert session.execute(text("SHOW search_path")).scalar() == schema_b
+        assert contact_names(session) == set()
+    with session_for(pool, schema_a) as session:
+        assert contact_names(session) == set()
+
+def test_checked_in_connection_has_default_search_path(pool, tenants):
+    schema_a, _ = tenants
+    with session_for(pool, schema_a) as session:
+        session.add(Contact(first_name="A", last_name="a"))
+        session.commit()
+    # A session without a tenant (e.g. the catalog) on the same connection
+    with Session(pool) as session:
+        assert schema_a not in session.execute(text("SHOW search_path")).scalar()
+        # Unqualified names resolve to public again, not to the last tenant
+        assert "a" not in contact_names(session)
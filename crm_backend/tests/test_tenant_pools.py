@@ -0,0 +1,75 @@
+"""LRU eviction and the global connection cap of the per-tenant pool registry.
+
+No database needed: engines connect lazily and sessions here never query.
+"""
+import gc
+import pytest
+from app.core.config import settings
+from app.db.shards import DEFAULT_SHARD
+from app.db.tenant import TenantCapacityError, TenantManager
+
+@pytest.fixture
+def manager(monkeypatch):
+    # Room for three pools of two connections each
+    monkeypatch.setattr(settings, "TENANT_POOL_MODE", "per_tenant")
+    monkeypatch.setattr(settings, "TENANT_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "TENANT_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(settings, "TENANT_MAX_TOTAL_CONNECTIONS", 6)
+    monkeypatch.setattr(settings, "TENANT_ENGINE_CACHE_SIZE", 10)
+    manager = TenantManager()
+    monkeypatch.setattr(manager, "ensure_provisioned", lambda schema_name: None)
+    monkeypatch.setattr(manager, "shard_of", lambda schema_name: DEFAULT_SHARD)
+    yield manager
+    manager.dispose_all()
+
+def open_sessions(manager, *schemas) -> list:
+    return [manager.get_tenant_session(schema_name) for schema_name in schemas]
+
+def close_all(sessions):
+    for session in sessions:
+        session.close()
+
+def test_pools_are_reused(manager):
+    first, second = open_sessions(manager, "tenant_a", "tenant_a")
+    assert first.get_bind() is second.get_bind()
+    assert manager._engines["tenant_a"].leases == 2
+    close_all([first, second])
+    assert manager._engines["tenant_a"].leases == 0
+    # A second close doesn't release twice
+    first.close()
+    assert manager._engines["tenant_a"].leases == 0
+
+def test_least_recently_used_idle_pool_is_evicted(manager):
+    for schema_name in ("tenant_a", "tenant_b", "tenant_c"):
+        close_all(open_sessions(manager, schema_name))
+    close_all(open_sessions(manager, "tenant_a"))
+    evicted = manager._engines["tenant_b"]
+    close_all(open_sessions(manager, "tenant_d"))
+    assert list(manager._engines) == ["tenant_c", "tenant_a", "tenant_d"]
+    assert evicted.engine not in [pool.engine for pool in manager._engines.values()]
+
+def test_pools_with_open_sessions_are_not_evicted(manager):
+    a, b, c = open_sessions(manager, "tenant_a", "tenant_b", "tenant_c")
+    # Every pool is leased: a fourth would exceed the connection cap
+    with pytest.raises(TenantCapacityError):
+        manager.get_tenant_session("tenant_d")
+    assert list(manager._engines) == ["tenant_a", "tenant_b", "tenant_c"]
+
+    b.close()
+    (d,) = open_sessions(manager, "tenant_d")
+    assert list(manager._engines) == ["tenant_a", "tenant_c", "tenant_d"]
+    assert a.get_bind() is manager._engines["tenant_a"].engine
+    close_all([a, c, d])
+
+def test_cache_size_limits_pools_below_the_connection_cap(manager, monkeypatch):
+    monkeypatch.setattr(settings, "TENANT_ENGINE_CACHE_SIZE", 2)
+    for schema_name in ("tenant_a", "tenant_b", "tenant_c"):
+        close_all(open_sessions(manager, schema_name))
+    assert list(manager._engines) == ["tenant_b", "tenant_c"]
+
+def test_unclosed_session_releases_its_lease_when_collected(manager):
+    session = manager.get_tenant_session("tenant_a")
+    assert manager._engines["tenant_a"].leases == 1
+    del session
+    gc.collect()
+    assert manager._engines["tenant_a"].leases == 0
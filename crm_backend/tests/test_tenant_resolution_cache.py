@@ -0,0 +1,74 @@
+"""The tenant ID -> schema resolution cache stays bounded: expired entries are
+dropped when looked up, and the least recently used go past the size limit.
+
+No database: resolve_tenant is given a stand-in session returning fake tenants.
+"""
+from types import SimpleNamespace
+import pytest
+from app.core.config import settings
+from app.db import tenant as tenant_module
+from app.db.tenant import TenantManager
+
+class FakeQuery:
+    def __init__(self, db):
+        self.db = db
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        self.db.reads += 1
+        return self.db.tenant
+
+class FakeDB:
+    """Answers every tenant lookup with the tenant it was last pointed at"""
+    def __init__(self):
+        self.reads = 0
+        self.tenant = None
+
+    def query(self, model):
+        return FakeQuery(self)
+
+def resolve(manager, db, tenant_id: int):
+    db.tenant = SimpleNamespace(id=tenant_id, schema_name=f"tenant_{tenant_id}", is_active=True, status="ready", shard="default")
+    return manager.resolve_tenant(db, str(tenant_id))
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(tenant_module.time, "monotonic", lambda: now[0])
+    return now
+
+@pytest.fixture
+def manager(monkeypatch, clock):
+    monkeypatch.setattr(settings, "TENANT_CACHE_TTL_SECONDS", 60)
+    monkeypatch.setattr(settings, "TENANT_CACHE_MAX_SIZE", 3)
+    return TenantManager()
+
+def test_least_recently_used_resolutions_are_dropped(manager):
+    db = FakeDB()
+    for tenant_id in (1, 2, 3):
+        resolve(manager, db, tenant_id)
+    resolve(manager, db, 1)  # a hit: 2 is now the least recently used
+    assert db.reads == 3
+    resolve(manager, db, 4)
+    assert list(manager._resolution_cache) == [3, 1, 4]
+
+    resolve(manager, db, 2)
+    assert db.reads == 5
+
+def test_expired_resolutions_are_dropped_on_lookup(manager, clock):
+    db = FakeDB()
+    resolve(manager, db, 1)
+    clock[0] += 61
+    assert manager._cached_resolution(1) is None
+    assert 1 not in manager._resolution_cache
+
+    resolve(manager, db, 1)
+    assert db.reads == 2
+
+def test_pending_tenants_are_not_cached(manager):
+    db = FakeDB()
+    db.tenant = SimpleNamespace(id=1, schema_name="tenant_1", is_active=True, status="provisioning", shard="default")
+    assert manager.resolve_tenant(db, "1").status == "provisioning"
+    assert not manager._resolution_cache
@@ -0,0 +1,87 @@
+"""Soft-deleted tenants: pending teardown, the reaper, and reuse of their names"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.api.v1.endpoints import admin_tenant
+from app.core.config import settings
+from app.core.security import Principal
+from app.db.shards import shard_registry
+from app.db.tenant import tenant_manager
+from app.main import app
+from app.models.tenant import Tenant, User
+from app.services.teardown import teardown_service
+from app.services.tenant import tenant_service
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[admin_tenant.get_current_admin_user] = lambda: Principal(0, "admin@example.com", None, True, True)
+    yield TestClient(app)
+    app.dependency_overrides.pop(admin_tenant.get_current_admin_user)
+
+@pytest.fixture
+def deleted(db, make_tenant):
+    """A tenant with one user, soft-deleted"""
+    tenant = make_tenant()
+    user = User(email=f"owner.{tenant.schema_name}@example.com", hashed_password="x", full_name="Owner", tenant_id=tenant.id)
+    db.add(user)
+    db.commit()
+    assert tenant_service.delete_tenant(db, tenant.id)
+    return tenant, user.email
+
+def schema_exists(schema_name: str) -> bool:
+    with shard_registry.engine("default").connect() as conn:
+        return bool(conn.execute(text("SELECT 1 FROM pg_namespace WHERE nspname = :schema"), {"schema": schema_name}).scalar())
+
+def pending_ids(client) -> list:
+    response = client.get("/api/v1/admin/tenants/teardown")
+    assert response.status_code == 200
+    return [tenant["id"] for tenant in response.json()["tenants"]]
+
+def test_soft_delete_hides_the_tenant_at_once(db, deleted, client):
+    tenant, _ = deleted
+    with pytest.raises(Exception, match="has been deleted"):
+        tenant_manager.get_schema_name_by_tenant_id(db, str(tenant.id))
+    assert tenant.id not in [t.id for t in tenant_service.get_all_tenants(db)]
+    # Still there until the reaper runs
+    assert schema_exists(tenant.schema_name)
+    assert tenant.id in pending_ids(client)
+
+def test_names_of_a_pending_teardown_are_refused_with_409(deleted, client):
+    tenant, email = deleted
+    response = client.post("/api/v1/auth/tenants/", json={"name": tenant.name})
+    assert response.status_code == 409
+    assert "teardown is pending" in response.json()["detail"]
+
+    response = client.post("/api/v1/auth/users/", json={
+        "email": email, "full_name": "Again", "password": "secret", "tenant_id": tenant.id,
+    })
+    assert response.status_code == 409
+
+def test_live_names_are_still_a_400(db, make_tenant, client):
+    tenant = make_tenant()
+    response = client.post("/api/v1/auth/tenants/", json={"name": tenant.name})
+    assert response.status_code == 400
+
+def test_reaper_drops_due_tenants(db, deleted, client, monkeypatch):
+    tenant, email = deleted
+    tenant_id, name, schema_name = tenant.id, tenant.name, tenant.schema_name
+    monkeypatch.setattr(settings, "TENANT_TEARDOWN_GRACE_SECONDS", 3600)
+    teardown_service.reap()
+    # Not due yet
+    assert schema_exists(schema_name)
+
+    monkeypatch.setattr(settings, "TENANT_TEARDOWN_GRACE_SECONDS", 0)
+    monkeypatch.setattr(settings, "TENANT_REAPER_BATCH_SIZE", 1000)
+    monkeypatch.setattr(settings, "TENANT_REAPER_TABLE_PAUSE_SECONDS", 0)
+    dropped = teardown_service.dropped
+    teardown_service.reap()
+    assert teardown_service.dropped > dropped
+    assert not schema_exists(schema_name)
+    db.expire_all()
+    assert db.get(Tenant, tenant_id) is None
+    assert tenant_service.get_user_by_email(db, email) is None
+    assert tenant_id not in pending_ids(client)
+
+    # The name and email are free again
+    tenant_service.check_tenant_name_free(db, name, schema_name)
+    tenant_service.check_email_free(db, email)
@@ -0,0 +1,95 @@
+"""Summary deltas and table versions are applied at commit, in a fixed order"""
+import pytest
+from sqlalchemy import text
+from app.db.tenant import tenant_manager
+from app.models.crm import Lead, Opportunity
+from app.models.stats import LeadStatusCount, OpportunityStageTotal, TableVersion
+
+@pytest.fixture
+def schema_name(make_tenant):
+    return make_tenant().schema_name
+
+@pytest.fixture
+def session(schema_name):
+    sessions = []
+
+    def open_session():
+        session = tenant_manager.get_tenant_session(schema_name)
+        # Fail instead of hanging if a write waits on another transaction
+        session.execute(text("SET LOCAL lock_timeout = '2s'"))
+        sessions.append(session)
+        return session
+
+    yield open_session
+    for session in sessions:
+        session.close()
+
+def lead_count(session, status: str) -> int:
+    return session.query(LeadStatusCount.lead_count).filter(LeadStatusCount.status == status).scalar() or 0
+
+def stage_count(session, stage: str) -> int:
+    row = session.query(OpportunityStageTotal.opportunity_count).filter(OpportunityStageTotal.stage == stage)
+    return row.scalar() or 0
+
+def version(session, table_name: str) -> int:
+    return session.query(TableVersion.version).filter(TableVersion.table_name == table_name).scalar() or 0
+
+def test_writers_in_opposite_table_order_do_not_block(session):
+    first, second = session(), session()
+    first.add(Lead(title="A", status="new"))
+    first.flush()
+    second.add(Opportunity(name="B", stage="proposal"))
+    second.flush()
+    # Before the flush moved to commit time, each of these waited on the
+    # other transaction's summary row: a deadlock
+    first.add(Opportunity(name="A", stage="proposal"))
+    first.flush()
+    second.add(Lead(title="B", status="new"))
+    second.flush()
+    first.commit()
+    second.commit()
+
+    reader = session()
+    assert lead_count(reader, "new") == 2
+    assert stage_count(reader, "proposal") == 2
+
+def test_summaries_and_versions_change_at_commit(session):
+    writer, reader = session(), session()
+    leads_before = version(reader, "leads")
+    reader.commit()
+
+    writer.add_all([Lead(title="One", status="contacted"), Lead(title="Two", status="contacted")])
+    writer.flush()
+    writer.add(Lead(title="Three", status="qualified"))
+    writer.flush()
+    assert lead_count(reader, "contacted") == 0
+    assert version(reader, "leads") == leads_before
+    reader.commit()
+
+    writer.commit()
+    assert lead_count(reader, "contacted") == 2
+    assert lead_count(reader, "qualified") == 1
+    # One bump per writing transaction, however many statements it ran
+    assert version(reader, "leads") == leads_before + 1
+
+def test_rolled_back_savepoint_is_not_counted(session):
+    writer = session()
+    writer.add(Lead(title="Kept", status="lost"))
+    writer.flush()
+    savepoint = writer.begin_nested()
+    writer.add(Lead(title="Undone", status="lost"))
+    writer.flush()
+    savepoint.rollback()
+    writer.commit()
+    assert lead_count(session(), "lost") == 1
+
+def test_flushes_again_after_set_constraints_immediate(session):
+    writer = session()
+    writer.add(Lead(title="Early", status="early"))
+    writer.flush()
+    writer.execute(text("SET CONSTRAINTS ALL IMMEDIATE"))
+    writer.execute(text("SET CONSTRAINTS ALL DEFERRED"))
+    writer.add(Lead(title="Late", status="early"))
+    writer.flush()
+    writer.commit()
+    assert lead_count(session(), "early") == 2
@@ -117,6 +117,7 @@ export default function TenantList() {
                   <th>ID</th>
                   <th>Name</th>
                   <th>Schema</th>
+                  <th>Shard</th>
                   <th>Status</th>
                   <th>Created</th>
                   <th>Actions</th>
@@ -130,6 +131,9 @@ export default function TenantList() {
                     <td>
                       <code className="text-muted">{tenant.schema_name}</code>
                     </td>
+                    <td>
+                      <code className="text-muted">{tenant.shard}</code>
+                    </td>
                     <td>
                       <Badge bg={tenant.is_active ? 'success' : 'secondary'}>
                         {tenant.is_active ? 'Active' : 'Inactive'}
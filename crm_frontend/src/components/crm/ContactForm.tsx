@@ -6,7 +6,7 @@ import { Card, Form, Button, Row, Col, Alert } from 'react-bootstrap';
 
 interface ContactFormProps {
   contact?: Contact;
-  onSubmit: (contact: Omit<Contact, 'id' | 'created_at' | 'updated_at'>) => Promise<void>;
+  onSubmit: (contact: Omit<Contact, 'id' | 'created_at' | 'updated_at' | 'version'>) => Promise<void>;
   onCancel?: () => void;
 }
 
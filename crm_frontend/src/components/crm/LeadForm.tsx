@@ -7,7 +7,7 @@ import { Card, Form, Button, Row, Col, Alert } from 'react-bootstrap';
 
 interface LeadFormProps {
   lead?: Lead;
-  onSubmit: (lead: Omit<Lead, 'id' | 'created_at' | 'updated_at'>) => Promise<void>;
+  onSubmit: (lead: Omit<Lead, 'id' | 'created_at' | 'updated_at' | 'version'>) => Promise<void>;
   onCancel?: () => void;
 }
 
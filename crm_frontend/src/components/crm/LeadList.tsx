@@ -143,7 +143,11 @@ const LeadList: React.FC = () => {
                     <Badge bg={getStatusVariant(lead.status)}>{lead.status}</Badge>
                   </td>
                   <td>{lead.source || '-'}</td>
-                  <td>{lead.contact_id || '-'}</td>
+                  <td>
+                    {lead.contact
+                      ? `${lead.contact.first_name} ${lead.contact.last_name}`
+                      : lead.contact_id || '-'}
+                  </td>
                   <td>{new Date(lead.created_at).toLocaleDateString()}</td>
                   <td>
                     <div className="d-flex gap-2">
@@ -7,7 +7,7 @@ import { Card, Form, Button, Row, Col, Alert } from 'react-bootstrap';
 
 interface OpportunityFormProps {
   opportunity?: Opportunity;
-  onSubmit: (opportunity: Omit<Opportunity, 'id' | 'created_at' | 'updated_at'>) => Promise<void>;
+  onSubmit: (opportunity: Omit<Opportunity, 'id' | 'created_at' | 'updated_at' | 'version'>) => Promise<void>;
   onCancel?: () => void;
 }
 
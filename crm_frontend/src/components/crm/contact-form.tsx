@@ -9,7 +9,7 @@ import { Card, CardHeader, CardContent } from '@/components/ui/card';
 
 interface ContactFormProps {
   contact?: Contact;
-  onSubmit: (contact: Omit<Contact, 'id' | 'created_at' | 'updated_at'>) => Promise<void>;
+  onSubmit: (contact: Omit<Contact, 'id' | 'created_at' | 'updated_at' | 'version'>) => Promise<void>;
   onCancel?: () => void;
 }
 
@@ -103,9 +103,24 @@ export interface Tenant {
   name: string;
   schema_name: string;
   is_active: boolean;
+  status: 'provisioning' | 'ready';
+  shard: string;
   created_at: string;
 }
 
+// Background creation of a tenant's schema; 'failed' means the tenant was rolled back
+export interface ProvisioningJob {
+  id: number;
+  tenant_id: number;
+  tenant_name: string;
+  schema_name: string;
+  status: 'pending' | 'running' | 'succeeded' | 'failed';
+  error?: string | null;
+  created_at: string;
+  started_at?: string | null;
+  finished_at?: string | null;
+}
+
 export interface Contact {
   id: number;
   first_name: string;
@@ -116,6 +131,7 @@ export interface Contact {
   title?: string;
   created_at: string;
   updated_at?: string;
+  version: number;
 }
 
 export interface Lead {
@@ -127,6 +143,7 @@ export interface Lead {
   contact_id?: number;
   created_at: string;
   updated_at?: string;
+  version: number;
   contact?: Contact;
 }
 
@@ -142,10 +159,37 @@ export interface Opportunity {
   lead_id?: number;
   created_at: string;
   updated_at?: string;
+  version: number;
   contact?: Contact;
   lead?: Lead;
 }
 
+// Keyset-paginated list envelope returned by the CRM list endpoints
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+// /crm/batch: ordered writes in one transaction; "$<ref>" stands for the id
+// created by an earlier operation with that ref
+export interface BatchOperation {
+  op: 'create' | 'update' | 'delete';
+  entity: 'contacts' | 'leads' | 'opportunities';
+  id?: number | string;
+  ref?: string;
+  data?: Record<string, unknown>;
+  version?: number;
+}
+
+export interface BatchResult {
+  index: number;
+  op: string;
+  entity: string;
+  id: number;
+  ref?: string | null;
+  data?: Record<string, unknown> | null;
+}
+
 export interface AuthResponse {
   access_token: string;
   token_type: string;
@@ -174,6 +218,11 @@ export const authApi = {
     return response.data;
   },
 
+  getProvisioningStatus: async (tenantId: number): Promise<ProvisioningJob> => {
+    const response = await api.get(`/auth/tenants/${tenantId}/provisioning`);
+    return response.data;
+  },
+
   registerUser: async (userData: {
     email: string;
     password: string;
@@ -267,8 +316,8 @@ export const adminApi = {
 export const crmApi = {
   // Contacts
   getContacts: async (): Promise<Contact[]> => {
-    const response = await api.get('/crm/contacts/');
-    return response.data;
+    const response = await api.get<Page<Contact>>('/crm/contacts/');
+    return response.data.items;
   },
 
   getContact: async (id: number): Promise<Contact> => {
@@ -277,7 +326,7 @@ export const crmApi = {
   },
 
   createContact: async (
-    contact: Omit<Contact, 'id' | 'created_at' | 'updated_at'>
+    contact: Omit<Contact, 'id' | 'created_at' | 'updated_at' | 'version'>
   ): Promise<Contact> => {
     const response = await api.post('/crm/contacts/', contact);
     return response.data;
@@ -288,14 +337,24 @@ export const crmApi = {
     return response.data;
   },
 
+  // Sends only the changed fields; with `version` the write fails with 412
+  // if someone else changed the record since it was read
+  patchContact: async (id: number, contact: Partial<Contact>, version?: number): Promise<Contact> => {
+    const headers = version === undefined ? undefined : { 'If-Match': `"${version}"` };
+    const response = await api.patch(`/crm/contacts/${id}`, contact, { headers });
+    return response.data;
+  },
+
   deleteContact: async (id: number): Promise<void> => {
     await api.delete(`/crm/contacts/${id}`);
   },
 
   // Leads
   getLeads: async (): Promise<Lead[]> => {
-    const response = await api.get('/crm/leads/');
-    return response.data;
+    const response = await api.get<Page<Lead>>('/crm/leads/', {
+      params: { include: 'contact' },
+    });
+    return response.data.items;
   },
 
   getLead: async (id: number): Promise<Lead> => {
@@ -304,7 +363,7 @@ export const crmApi = {
   },
 
   createLead: async (
-    lead: Omit<Lead, 'id' | 'created_at' | 'updated_at'>
+    lead: Omit<Lead, 'id' | 'created_at' | 'updated_at' | 'version'>
   ): Promise<Lead> => {
     const response = await api.post('/crm/leads/', lead);
     return response.data;
@@ -315,14 +374,24 @@ export const crmApi = {
     return response.data;
   },
 
+  // Sends only the changed fields; with `version` the write fails with 412
+  // if someone else changed the record since it was read
+  patchLead: async (id: number, lead: Partial<Lead>, version?: number): Promise<Lead> => {
+    const headers = version === undefined ? undefined : { 'If-Match': `"${version}"` };
+    const response = await api.patch(`/crm/leads/${id}`, lead, { headers });
+    return response.data;
+  },
+
   deleteLead: async (id: number): Promise<void> => {
     await api.delete(`/crm/leads/${id}`);
   },
 
   // Opportunities
   getOpportunities: async (): Promise<Opportunity[]> => {
-    const response = await api.get('/crm/opportunities/');
-    return response.data;
+    const response = await api.get<Page<Opportunity>>('/crm/opportunities/', {
+      params: { include: 'contact,lead' },
+    });
+    return response.data.items;
   },
 
   getOpportunity: async (id: number): Promise<Opportunity> => {
@@ -331,7 +400,7 @@ export const crmApi = {
   },
 
   createOpportunity: async (
-    opportunity: Omit<Opportunity, 'id' | 'created_at' | 'updated_at'>
+    opportunity: Omit<Opportunity, 'id' | 'created_at' | 'updated_at' | 'version'>
   ): Promise<Opportunity> => {
     const response = await api.post('/crm/opportunities/', opportunity);
     return response.data;
@@ -345,9 +414,23 @@ export const crmApi = {
     return response.data;
   },
 
+  // Sends only the changed fields; with `version` the write fails with 412
+  // if someone else changed the record since it was read
+  patchOpportunity: async (id: number, opportunity: Partial<Opportunity>, version?: number): Promise<Opportunity> => {
+    const headers = version === undefined ? undefined : { 'If-Match': `"${version}"` };
+    const response = await api.patch(`/crm/opportunities/${id}`, opportunity, { headers });
+    return response.data;
+  },
+
   deleteOpportunity: async (id: number): Promise<void> => {
     await api.delete(`/crm/opportunities/${id}`);
   },
+
+  // Batch
+  batch: async (operations: BatchOperation[]): Promise<BatchResult[]> => {
+    const response = await api.post('/crm/batch', { operations });
+    return response.data.results;
+  },
 };
 // --- types (add near other interfaces) ---
 